@@ -130,7 +130,7 @@ else:
 		dfpt_force_run.update()
 	else:
 
-		hessian = Hessian(dfpt_force_run.outcar)
+		hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 
 		eigen_structure = EigenStructure(reference_structure=relaxed_structure, hessian=hessian)
 		eigen_structure.print_eigen_components()
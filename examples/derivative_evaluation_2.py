@@ -185,7 +185,7 @@ else:
 
 	else:
 
-		hessian = Hessian(dfpt_force_run.outcar)
+		hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 		#hessian.print_eigen_components()
 		hessian.print_eigenvalues()
 
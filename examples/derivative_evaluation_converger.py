@@ -156,7 +156,7 @@ else:
 		dfpt_force_run.update()
 	else:
 
-		hessian = Hessian(dfpt_force_run.outcar)
+		hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 		hessian.print_eigen_components()
 
 
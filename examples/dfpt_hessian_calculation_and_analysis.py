@@ -60,7 +60,7 @@ dfpt_force_run.update()
 if not dfpt_force_run.complete:
     sys.exit()
 
-hessian = Hessian(dfpt_force_run.outcar)
+hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 
 if input_dictionary['write_hessian_data']:
     hessian.print_eigenvalues_to_file(Path.join(path, 'output_eigen_values'))
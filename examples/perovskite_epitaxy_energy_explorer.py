@@ -67,7 +67,7 @@ def run_misfit_strain(path, misfit_strain, input_dictionary, initial_relaxation_
 		dfpt_force_run.update()
 		return False
 	
-	hessian = Hessian(dfpt_force_run.outcar)
+	hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 
 	if input_dictionary['write_hessian_data']:
 		hessian.print_eigenvalues_to_file(Path.join(path, 'output_eigen_values'))
@@ -61,7 +61,7 @@ def run_misfit_strain(path, misfit_strain, input_dictionary, initial_relaxation_
 		dfpt_force_run.update()
 		return False
 	
-	hessian = Hessian(dfpt_force_run.outcar)
+	hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar)
 	hessian.print_eigenvalues_to_file(Path.join(path, 'output_eigen_values'))
 	hessian.print_eigen_components_to_file(Path.join(path, 'output_eigen_components'))
 
@@ -1,12 +1,24 @@
 #from fpctoolkit.io.vasp.outcar import Outcar
 
+import os
+import mmap
+
 import numpy as np
 
 from fpctoolkit.io.file import File
 import fpctoolkit.util.string_util as su
 
 class Outcar(File):
-	
+	"""
+	Read-only view of a vasp OUTCAR file. OUTCARs from long relaxations and DFPT calculations can be hundreds of MB, so
+	unlike the base File class, the lines of the file are not read into memory on load. Instead, the first time any data
+	is requested, the file is memory mapped and the byte offset of the start of every line containing one of the known
+	section header strings (forces, stresses, born effective charges, second derivatives, ...) is recorded. Each getter
+	then seeks to the offset of the section it needs and parses only those lines.
+
+	The lines attribute is still available for general File-style access, but is only loaded (in full) if it is used.
+	"""
+
 	run_complete_string = "Total CPU time used (sec):"
 	ionic_step_complete_string = "aborting loop because EDIFF is reached"
 	total_energy_string = "energy(sigma->0)"
@@ -15,34 +27,218 @@ class Outcar(File):
 	hessian_string = "SECOND DERIVATIVES (NOT SYMMETRIZED)"
 	forces_string = "POSITION                                       TOTAL-FORCE (eV/Angst)"
 	stresses_string = "FORCE on cell =-STRESS in cart. coord.  units (eV)"
+	ionic_step_energy_string = "FREE ENERGIE OF THE ION-ELECTRON SYSTEM"
 	chemical_shift_string = "SYMMETRIZED TENSORS"
 	isotropic_chemical_shift_string = "(absolute, valence and core)"
+	ionic_polarization_string = "Ionic dipole moment: p[ion]"
+	electronic_polarization_string = "Total electronic dipole moment: p[elc]"
+
+	indexed_section_strings = [run_complete_string, ionic_step_complete_string, total_energy_string, dielectric_tensor_string,
+		born_effective_charge_tensor_string, hessian_string, forces_string, stresses_string, ionic_step_energy_string, chemical_shift_string,
+		isotropic_chemical_shift_string, ionic_polarization_string, electronic_polarization_string]
+
+	completion_probe_byte_count = 16384 #roughly the last 200 lines of an outcar
+	completion_cache_dictionary = {} #maps path to ((mtime, size), complete) so unchanged files are only stat'ed
 
 	def __init__(self, file_path=None):
+		self._lines = []
+		self.section_offsets_dictionary = None
+
 		super(Outcar, self).__init__(file_path)
 
+	def __nonzero__(self):
+		if self.load_path:
+			return os.path.getsize(self.load_path) > 0
+		else:
+			return bool(self._lines)
+
+
+	@property
+	def lines(self):
+		"""Full list of lines, only read from the file the first time it is asked for."""
+
+		if self._lines == None:
+			super(Outcar, self).load_from_path(self.load_path)
+
+		return self._lines
+
+	@lines.setter
+	def lines(self, lines):
+		self._lines = lines
+
+
+	def load_from_path(self, file_path):
+		"""Records the path only - no lines are read and no sections are indexed until data is requested."""
+
+		if not os.path.isfile(file_path):
+			raise IOError('File does not exist at path ' + file_path)
+
+		self.load_path = file_path
+		self._lines = None
+		self.section_offsets_dictionary = None
 
 	def reload(self):
-		"""Reloads from original file_path to refresh lines"""
+		"""Reloads from original file_path to refresh lines and section offsets"""
+
+		self.load_from_path(self.load_path)
+
+
+	def index_sections(self):
+		"""
+		Memory maps the file and records the byte offsets of the start of every line containing one of the strings in
+		Outcar.indexed_section_strings. Each search is done by mmap in C, so no lines are held in memory.
+		"""
+
+		self.section_offsets_dictionary = {}
+
+		for section_string in Outcar.indexed_section_strings:
+			self.section_offsets_dictionary[section_string] = self.find_line_offsets_containing_string(section_string)
+
+	def find_line_offsets_containing_string(self, string, first_only=False):
+		"""
+		Returns a list of byte offsets of the start of each line containing string. If first_only is True, the search
+		stops after the first matching line.
+		"""
+
+		if (not self.load_path) or os.path.getsize(self.load_path) == 0:
+			return []
+
+		line_offsets = []
+
+		with open(self.load_path, 'rb') as file:
+			mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+			try:
+				match_position = mapped_file.find(string)
+
+				while match_position != -1:
+					line_start_offset = mapped_file.rfind('\n', 0, match_position) + 1
+					line_offsets.append(line_start_offset)
+
+					if first_only:
+						break
+
+					line_end_offset = mapped_file.find('\n', match_position)
+
+					if line_end_offset == -1:
+						break
+
+					match_position = mapped_file.find(string, line_end_offset)
+			finally:
+				mapped_file.close()
+
+		return line_offsets
+
+	def get_line_offsets_containing_string(self, string):
+		"""
+		Returns the byte offsets of all lines containing string. Offsets for the known section strings come from the
+		section index, anything else is searched for on demand and added to the index.
+		"""
+
+		if self.section_offsets_dictionary == None:
+			self.index_sections()
+
+		if string not in self.section_offsets_dictionary:
+			self.section_offsets_dictionary[string] = self.find_line_offsets_containing_string(string)
+
+		return self.section_offsets_dictionary[string]
+
+	def get_first_line_offset_containing_string(self, string):
+		"""Returns the byte offset of the first line containing string, or None if no line contains it."""
+
+		if self.section_offsets_dictionary != None and string in self.section_offsets_dictionary:
+			line_offsets = self.section_offsets_dictionary[string]
+		else:
+			line_offsets = self.find_line_offsets_containing_string(string, first_only=True)
+
+		return line_offsets[0] if line_offsets else None
+
+	def read_lines_at_offset(self, offset, count, skip=0):
+		"""
+		Seeks to offset, skips skip lines, and returns the next count lines (without eol characters).
+		Fewer lines are returned if the end of the file is reached.
+		"""
+
+		with open(self.load_path, 'rb') as file:
+			return Outcar.read_lines_from_open_file(file, offset, count, skip)
+
+	@staticmethod
+	def read_lines_from_open_file(file, offset, count, skip=0):
+		"""Same as read_lines_at_offset, but reads from an already open file object so that many sections can be read in one pass."""
+
+		lines = []
+
+		file.seek(offset)
+
+		for i in range(skip):
+			file.readline()
+
+		for i in range(count):
+			line = file.readline()
+
+			if not line:
+				break
+
+			lines.append(line.rstrip('\r\n'))
+
+		return lines
+
+	def read_line_at_offset(self, offset, skip=0):
+		lines = self.read_lines_at_offset(offset, 1, skip)
+
+		if len(lines) == 0:
+			raise Exception("Unexpected end of outcar file at", self.load_path)
+
+		return lines[0]
+
+
+	@staticmethod
+	def is_complete_at_path(file_path):
+		"""
+		Returns True if the outcar at file_path contains the tag 'Total CPU time used (sec):' in its last
+		Outcar.completion_probe_byte_count bytes. Only the tail of the file is read, and the result is cached
+		against the file's modification time and size, so repeated polling of an unchanged outcar costs one stat call.
+		Returns False if no file exists at file_path.
+		"""
+
+		try:
+			file_stat = os.stat(file_path)
+		except OSError:
+			return False
+
+		file_signature = (file_stat.st_mtime, file_stat.st_size)
+
+		cached_entry = Outcar.completion_cache_dictionary.get(file_path)
+
+		if cached_entry and cached_entry[0] == file_signature:
+			return cached_entry[1]
+
+		with open(file_path, 'rb') as file:
+			file.seek(max(0, file_stat.st_size - Outcar.completion_probe_byte_count))
+			tail_string = file.read()
+
+		complete = tail_string.find(Outcar.run_complete_string) != -1
 
-		super(Outcar, self).__init__()		
+		Outcar.completion_cache_dictionary[file_path] = (file_signature, complete)
+
+		return complete
 
 
 	@property
 	def complete(self):
-		"""Searches the last few lines for the tag 'Total CPU time used (sec):'
-		If this tag is present, returns True. Reverse traversing is done for
-		efficiency.
-		"""
+		"""Looks for the tag 'Total CPU time used (sec):' at the end of the file. If this tag is present, returns True."""
+
+		if not self.load_path:
+			return False
 
-		return bool(self.get_first_line_containing_string_from_bottom(Outcar.run_complete_string, stop_after=200))
+		return Outcar.is_complete_at_path(self.load_path)
 
 	@property
 	def energy(self):
 		if not self.complete:
 			raise Exception("Run does not have a final energy yet - not completed.")
 
-		total_energy_line = self.get_first_line_containing_string_from_bottom(Outcar.total_energy_string)
+		total_energy_line = self.read_line_at_offset(self.get_line_offsets_containing_string(Outcar.total_energy_string)[-1])
 		return float(total_energy_line.split('=')[-1].strip())
 
 
@@ -59,30 +255,21 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run not yet completed - cannot get forces list")
 
-		forces_start_indices = self.get_line_indices_containing_string(Outcar.forces_string)
+		forces_start_offsets = self.get_line_offsets_containing_string(Outcar.forces_string)
 
-		if len(forces_start_indices) == 0:
+		if len(forces_start_offsets) == 0:
 			raise Exception("No set of forces found in completed outcar file")
 
-		forces_start_index = forces_start_indices[-1] + 2
+		number_of_atoms = self.get_number_of_atoms()
 
-		final_forces_list = []
-
-		for line_index in range(self.get_number_of_atoms()):
-			line = self.lines[forces_start_index + line_index]
-				
-			row_number_list = su.get_number_list_from_string(line)
+		forces_lines = self.read_lines_at_offset(forces_start_offsets[-1], number_of_atoms, skip=2)
 
-			if not len(row_number_list) == 6:
-				raise Exception("Error reading row from forces data. Length should be 6 but is not. Row number list looks like", row_number_list)
+		if len(forces_lines) != number_of_atoms:
+			raise Exception("Incorrect number of forces rows obtained:", len(forces_lines))
 
-			final_forces_list += row_number_list[3:6]		
+		positions_and_forces_array = su.get_number_array_from_lines(forces_lines, column_count=6)
 
-
-		if len(final_forces_list) != self.get_number_of_atoms()*3:
-			raise Exception("Incorrect number of forces obtained:", final_forces_list)
-
-		return final_forces_list
+		return positions_and_forces_array[:, 3:6].flatten().tolist()
 
 	@property
 	def final_stresses_list(self):
@@ -98,33 +285,117 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run not yet completed - cannot get stresses list")
 
-		stresses_start_indices = self.get_line_indices_containing_string(Outcar.stresses_string)
+		stresses_start_offsets = self.get_line_offsets_containing_string(Outcar.stresses_string)
 
-		if len(stresses_start_indices) == 0:
+		if len(stresses_start_offsets) == 0:
 			raise Exception("No set of stresses found in completed outcar file")
 
-		stresses_start_index = stresses_start_indices[-1] + 13
+		return Outcar.get_stresses_list_from_total_line(self.read_line_at_offset(stresses_start_offsets[-1], skip=13))
 
-		line = self.lines[stresses_start_index]
+	@staticmethod
+	def get_stresses_list_from_total_line(line):
+		"""
+		Takes the '  Total   44.38304   -10.54023 ...' line of a stress block and returns the stresses with the sign and order conventions of final_stresses_list.
+		"""
 
 		line = ' '.join(line.split(' ')[3:])
 
-		final_stresses_list = su.get_number_list_from_string(line)
+		stresses_list = su.get_number_list_from_string(line)
 
-		if not len(final_stresses_list) == 6:
-			raise Exception("Error reading row from stresses data. Length should be 6 but is not. Row number list looks like", final_stresses_list)
+		if not len(stresses_list) == 6:
+			raise Exception("Error reading row from stresses data. Length should be 6 but is not. Row number list looks like", stresses_list)
 
 
-		new_stresses = [-1.0*x for x in final_stresses_list]
+		new_stresses = [-1.0*x for x in stresses_list]
 
 		return [new_stresses[0], new_stresses[1], new_stresses[2], new_stresses[4], new_stresses[5], new_stresses[3]]
 
+	@staticmethod
+	def get_energy_from_lines(lines):
+		"""Returns the energy(sigma->0) value from the first of lines containing it."""
+
+		for line in lines:
+			if line.find(Outcar.total_energy_string) != -1:
+				return float(line.split('=')[-1].strip())
+
+		raise Exception("No energy(sigma->0) line found in lines", lines)
+
 	def get_ionic_energies(self):
 		"""Returns list of energies (one for each ionic step) currently present in outcar"""
 
-		ionic_step_data_start_line_indices = self.get_line_indices_containing_string(Outcar.ionic_step_complete_string)
-		print ionic_step_data_start_line_indices
-		##########unfinished
+		ionic_energies = []
+
+		with open(self.load_path, 'rb') as file:
+			for energy_offset in self.get_line_offsets_containing_string(Outcar.ionic_step_energy_string):
+				ionic_energies.append(Outcar.get_energy_from_lines(Outcar.read_lines_from_open_file(file, energy_offset, 5)))
+
+		return ionic_energies
+
+	def get_ionic_step_generator(self, stride=1):
+		"""
+		Yields a dictionary for every stride-th ionic step currently present in the outcar, looking like:
+
+		{'energy': -100.75, 'positions': (N, 3) array, 'forces': (N, 3) array, 'stresses': [XX, YY, ZZ, YZ, XZ, XY] or None}
+
+		Positions are cartesian (Angstroms), forces are in eV/Angstrom, and stresses follow the conventions of final_stresses_list
+		(None if the outcar has no stress output). The file is read forward in a single pass, and only one ionic step is held
+		in memory at a time. An unfinished last ionic step (no energy written yet) is not included.
+		"""
+
+		if stride < 1:
+			raise Exception("Stride must be a positive integer. Stride is", stride)
+
+		number_of_atoms = self.get_number_of_atoms()
+
+		forces_offsets = self.get_line_offsets_containing_string(Outcar.forces_string)
+		energy_offsets = self.get_line_offsets_containing_string(Outcar.ionic_step_energy_string)
+		stresses_offsets = self.get_line_offsets_containing_string(Outcar.stresses_string)
+
+		ionic_step_count = min(len(forces_offsets), len(energy_offsets))
+		has_stresses = len(stresses_offsets) >= ionic_step_count
+
+		with open(self.load_path, 'rb') as file:
+			for step_index in range(0, ionic_step_count, stride):
+				stresses = None
+
+				if has_stresses:
+					stresses = Outcar.get_stresses_list_from_total_line(Outcar.read_lines_from_open_file(file, stresses_offsets[step_index], 1, skip=13)[0])
+
+				forces_lines = Outcar.read_lines_from_open_file(file, forces_offsets[step_index], number_of_atoms, skip=2)
+
+				if len(forces_lines) != number_of_atoms:
+					raise Exception("Incorrect number of forces rows obtained for ionic step", step_index, ":", len(forces_lines))
+
+				positions_and_forces_array = su.get_number_array_from_lines(forces_lines, column_count=6)
+
+				energy = Outcar.get_energy_from_lines(Outcar.read_lines_from_open_file(file, energy_offsets[step_index], 5))
+
+				yield {'energy': energy, 'positions': positions_and_forces_array[:, 0:3], 'forces': positions_and_forces_array[:, 3:6], 'stresses': stresses}
+
+	def get_ionic_trajectory(self, stride=1):
+		"""
+		Returns every stride-th ionic step stacked into arrays:
+
+		{'energies': (S,) array, 'positions': (S, N, 3) array, 'forces': (S, N, 3) array, 'stresses': (S, 6) array or None}
+
+		where S is the number of ionic steps returned and N is the number of atoms. See get_ionic_step_generator for units and
+		conventions - use the generator directly for outcars too long to hold all steps in memory.
+		"""
+
+		ionic_steps_list = list(self.get_ionic_step_generator(stride))
+		number_of_atoms = self.get_number_of_atoms()
+
+		ionic_trajectory = {}
+		ionic_trajectory['energies'] = np.array([ionic_step['energy'] for ionic_step in ionic_steps_list])
+		ionic_trajectory['positions'] = np.array([ionic_step['positions'] for ionic_step in ionic_steps_list]).reshape(len(ionic_steps_list), number_of_atoms, 3)
+		ionic_trajectory['forces'] = np.array([ionic_step['forces'] for ionic_step in ionic_steps_list]).reshape(len(ionic_steps_list), number_of_atoms, 3)
+
+		if ionic_steps_list and ionic_steps_list[0]['stresses'] != None:
+			ionic_trajectory['stresses'] = np.array([ionic_step['stresses'] for ionic_step in ionic_steps_list])
+		else:
+			ionic_trajectory['stresses'] = None
+
+		return ionic_trajectory
 
 	def get_number_of_atoms(self):
 		return self.get_incar_parameter_value("NIONS")
@@ -138,32 +409,32 @@ class Outcar(File):
 
 		if (not total_cpu_time) or (not number_of_cores):
 			return None
-			
+
 		cpu_hours = (total_cpu_time * number_of_cores) / 3600.0
-		
+
 		return round(cpu_hours, 2)
 
 	def get_number_of_cores(self):
 		"""Returns number of cores recorded in outcar"""
 
-		core_count_line = self.get_first_line_containing_string_from_top("total cores") #may be fenrir specific!
+		core_count_line_offset = self.get_first_line_offset_containing_string("total cores") #may be fenrir specific!
 
-		if not core_count_line:
+		if core_count_line_offset == None:
 			return None
 
-		core_count_line = su.remove_extra_spaces(core_count_line)
+		core_count_line = su.remove_extra_spaces(self.read_line_at_offset(core_count_line_offset))
 
 		return int(core_count_line.split(' ')[2])
 
 	def get_total_cpu_time(self):
 		"""Returns number after Total CPU time used (sec): string"""
 
-		cpu_time_line = self.get_first_line_containing_string_from_bottom("Total CPU time used (sec):")
+		cpu_time_line_offsets = self.get_line_offsets_containing_string(Outcar.run_complete_string)
 
-		if not cpu_time_line:
+		if not cpu_time_line_offsets:
 			return None
 
-		cpu_time_line = su.remove_extra_spaces(cpu_time_line).strip()
+		cpu_time_line = su.remove_extra_spaces(self.read_line_at_offset(cpu_time_line_offsets[-1])).strip()
 
 		return float(cpu_time_line.split(' ')[5])
 
@@ -175,12 +446,12 @@ class Outcar(File):
 		found in outcar. Looks for first thing with spaces around it after the key name.
 		"""
 
-		containing_lines = self.get_lines_containing_string(key)
+		line_offset = self.get_first_line_offset_containing_string(key)
 
-		if len(containing_lines) == 0:
+		if line_offset == None:
 			return None
 
-		line = containing_lines[0]
+		line = self.read_line_at_offset(line_offset)
 		line = su.remove_extra_spaces(line).strip() #'bla bla NIONS = 40 bla bla bla'
 		line = line.split(key)[1].strip() #get everything after key '= 40 bla bla bla'
 		value = line.split(" ")[1]
@@ -196,35 +467,23 @@ class Outcar(File):
 
 	def get_dielectric_tensor(self):
 		"""
-		Returns a 3x3 dielectric tensor with component (0, 0) as eps_xx and so forth.
+		Returns a 3x3 numpy array dielectric tensor with component (0, 0) as eps_xx and so forth.
 		"""
 
 		if not self.complete:
 			raise Exception("Run does not yet have a dielectric tensor - not completed")
 
-		tensor_start_indices = self.get_line_indices_containing_string(Outcar.dielectric_tensor_string)
+		tensor_start_offsets = self.get_line_offsets_containing_string(Outcar.dielectric_tensor_string)
 
-		if len(tensor_start_indices) == 0:
+		if len(tensor_start_offsets) == 0:
 			raise Exception("No dielectric tensor found in completed outcar file")
 
-		tensor_start_index = tensor_start_indices[-1] + 2
-
-		dielectric_tensor = []
-
-		for line in self.lines[tensor_start_index:tensor_start_index+3]:
-			row_number_list = su.get_number_list_from_string(line)
-
-			if not len(row_number_list) == 3:
-				raise Exception("Error reading row from dielectric tensor. Length should be 3 but is not. Row number list looks like", row_number_list)
-
-			dielectric_tensor.append(row_number_list)
-
-		return dielectric_tensor
+		return su.get_number_array_from_lines(self.read_lines_at_offset(tensor_start_offsets[-1], 3, skip=2), column_count=3)
 
 
 	def get_born_effective_charge_tensor(self):
 		"""
-		Returns an Nx3x3 tensor, where N is the number of atoms in the POSCAR of the calculation. The Born Effective Charge Tensor looks like:
+		Returns an Nx3x3 numpy array, where N is the number of atoms in the POSCAR of the calculation. The Born Effective Charge Tensor looks like:
 
 		BORN EFFECTIVE CHARGES (in e, cummulative output)
 		 -------------------------------------------------
@@ -250,36 +509,26 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run does not yet have a born effective charge tensor - not completed")
 
-		tensor_start_indices = self.get_line_indices_containing_string(Outcar.born_effective_charge_tensor_string)
+		tensor_start_offsets = self.get_line_offsets_containing_string(Outcar.born_effective_charge_tensor_string)
 
-		if len(tensor_start_indices) == 0:
+		if len(tensor_start_offsets) == 0:
 			raise Exception("No born effective charge tensor found in completed outcar file")
 
-		tensor_start_index = tensor_start_indices[-1] -1
-
-		born_effective_charge_tensor = []
-
-		for N in range(self.get_number_of_atoms()):
-			atomic_tensor = []
+		number_of_atoms = self.get_number_of_atoms()
 
-			tensor_start_index += 4
+		tensor_lines = self.read_lines_at_offset(tensor_start_offsets[-1], 4*number_of_atoms, skip=2) #skip header and dashes
 
-			for line in self.lines[tensor_start_index:tensor_start_index+3]:
-				row_number_list = su.get_number_list_from_string(line)[1:]
+		row_lines = [line for i, line in enumerate(tensor_lines) if i % 4 != 0] #drop the 'ion    N' lines
 
-				if not len(row_number_list) == 3:
-					raise Exception("Error reading row from born effect charge tensor. Length should be 3 but is not. Row number list looks like", row_number_list)
-					
-				atomic_tensor.append(row_number_list)
+		if len(row_lines) != 3*number_of_atoms:
+			raise Exception("Incorrect number of born effective charge tensor rows obtained:", len(row_lines))
 
-			born_effective_charge_tensor.append(atomic_tensor)			
+		return su.get_number_array_from_lines(row_lines, column_count=3, skipped_column_count=1).reshape(number_of_atoms, 3, 3)
 
-		return born_effective_charge_tensor
 
-	
 	def get_hessian_matrix(self):
 		"""
-		Returns an NxN matrix of second derivatives w.r.t. atomic displacements (force constant units are eV/Angstrom^2 in matrix), where N is the number of atoms in the POSCAR of the calculation. 
+		Returns an NxN matrix of second derivatives w.r.t. atomic displacements (force constant units are eV/Angstrom^2 in matrix), where N is the number of atoms in the POSCAR of the calculation.
 
 		The matrix of second derivatives is arranged as:
 			         atom_1_x     atom_1_y   atom_1_z  atom_2_x ... atom_N_z
@@ -292,47 +541,28 @@ class Outcar(File):
 		.
 		atom_N_z
 
-		The output is a list of lists, looking like [[d^2E/du_atom_1_x*du_atom_1_x, d^2/du_atom_1_x*du_atom_1_y, ...], [d^2/du_atom_1_y*du_atom_1_x, ...], ...]
+		The output is a 3Nx3N numpy array, looking like [[d^2E/du_atom_1_x*du_atom_1_x, d^2/du_atom_1_x*du_atom_1_y, ...], [d^2/du_atom_1_y*du_atom_1_x, ...], ...]
 
 		Here, atom_n is the nth atom in the poscar file.
 
 		NOTE: The negative of the components of the OUTCAR is taken because vasp puts derivatives in terms of forces, which are -dE/dx.
 		"""
 
-		hessian_matrix = []
+		hessian_matrix_offsets = self.get_line_offsets_containing_string(Outcar.hessian_string)
 
-		hessian_matrix_indices = self.get_line_indices_containing_string(Outcar.hessian_string)
-
-		if len(hessian_matrix_indices) == 0:
+		if len(hessian_matrix_offsets) == 0:
 			raise Exception("No hessian matrix found in completed outcar file")
 
 
-		hessian_matrix_starting_index = hessian_matrix_indices[-1] + 3
-
-
 		number_of_degrees_of_freedom = 3*self.get_number_of_atoms()
 
-		for i in range(number_of_degrees_of_freedom):
-			row_string = self[hessian_matrix_starting_index+i]
-
-			cleaned_row_string = su.remove_extra_spaces(row_string.strip())
+		row_strings_list = self.read_lines_at_offset(hessian_matrix_offsets[-1], number_of_degrees_of_freedom, skip=3)
 
-			cleaned_row_components_list = cleaned_row_string.strip().split(' ')
+		if len(row_strings_list) != number_of_degrees_of_freedom:
+			raise Exception("Number of degrees of freedom and number of rows in hessian matrix do not match. Matrix row count is", len(row_strings_list), "number of dofs is", number_of_degrees_of_freedom)
 
-			numerical_strings_list = cleaned_row_components_list[1:]
-
-			row_values_list = [-1.0*float(component_string) for component_string in numerical_strings_list] #must take the negative because vasp gives values in terms of changes in forces, which are negative of dEnergy terms
-
-			if not len(row_values_list) == number_of_degrees_of_freedom:
-				raise Exception("Number of degrees of freedom and number of columns in hessian row do not match. Row is", row_values_list, "number of dofs is", number_of_degrees_of_freedom)
-
-
-			hessian_matrix.append(row_values_list)
-
-		if len(hessian_matrix) != number_of_degrees_of_freedom:
-			raise Exception("Number of degrees of freedom and number of rows in hessian matrix do not match. Matrix row count is", len(hessian_matrix), "number of dofs is", number_of_degrees_of_freedom)
-
-		return hessian_matrix
+		#must take the negative because vasp gives values in terms of changes in forces, which are negative of dEnergy terms
+		return -1.0*su.get_number_array_from_lines(row_strings_list, column_count=number_of_degrees_of_freedom, skipped_column_count=1)
 
 	def get_ionic_and_electronic_polarization_vectors(self):
 		"""
@@ -340,25 +570,25 @@ class Outcar(File):
 		This return list looks like [vec_ionic, vec_electronic]
 		"""
 
-		ionic_polarization_indices = self.get_line_indices_containing_string('Ionic dipole moment: p[ion]')
+		ionic_polarization_offsets = self.get_line_offsets_containing_string(Outcar.ionic_polarization_string)
 
 
-		if len(ionic_polarization_indices) != 1:
-			raise Exception("There must be one line containing the ionic polarization information.", len(ionic_polarization_indices))
+		if len(ionic_polarization_offsets) != 1:
+			raise Exception("There must be one line containing the ionic polarization information.", len(ionic_polarization_offsets))
 
-		components_string = self[ionic_polarization_indices[0]].split('(')[1].split(')')[0]
+		components_string = self.read_line_at_offset(ionic_polarization_offsets[0]).split('(')[1].split(')')[0]
 		components_string = su.remove_extra_spaces(components_string)
 		component_strings_list = components_string.split(' ')
 
 		ionic_polarization_vector = [float(component) for component in component_strings_list]
 
 
-		electronic_polarization_indices = self.get_line_indices_containing_string('Total electronic dipole moment: p[elc]')
+		electronic_polarization_offsets = self.get_line_offsets_containing_string(Outcar.electronic_polarization_string)
 
-		if len(electronic_polarization_indices) != 1:
-			raise Exception("There must be one line containing the electronic polarization information.", len(electronic_polarization_indices))
+		if len(electronic_polarization_offsets) != 1:
+			raise Exception("There must be one line containing the electronic polarization information.", len(electronic_polarization_offsets))
 
-		components_string = self[electronic_polarization_indices[0]].split('(')[1].split(')')[0]
+		components_string = self.read_line_at_offset(electronic_polarization_offsets[0]).split('(')[1].split(')')[0]
 		components_string = su.remove_extra_spaces(components_string)
 		component_strings_list = components_string.split(' ')
 
@@ -368,7 +598,7 @@ class Outcar(File):
 
 	def get_symmetrized_chemical_shift_tensor(self):
 		"""
-		Returns an Nx3x3 tensor, where N is the number of atoms in the POSCAR of the calculation. The Born Effective Charge Tensor looks like:
+		Returns an Nx3x3 numpy array, where N is the number of atoms in the POSCAR of the calculation. The chemical shift tensor looks like:
 
 		 SYMMETRIZED TENSORS
 		 ion    1
@@ -387,31 +617,21 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run does not yet have a chemical shift tensor - not completed")
 
-		tensor_start_indices = self.get_line_indices_containing_string(Outcar.chemical_shift_string)
+		tensor_start_offsets = self.get_line_offsets_containing_string(Outcar.chemical_shift_string)
 
-		if len(tensor_start_indices) == 0:
+		if len(tensor_start_offsets) == 0:
 			raise Exception("No chemical shift tensor found in completed outcar file")
 
-		tensor_start_index = tensor_start_indices[-1] - 2
-
-		chemical_shift_tensor = []
-
-		for N in range(self.get_number_of_atoms()):
-			atomic_tensor = []
-
-			tensor_start_index += 4
+		number_of_atoms = self.get_number_of_atoms()
 
-			for line in self.lines[tensor_start_index:tensor_start_index+3]:
-				row_number_list = su.get_number_list_from_string(line)
+		tensor_lines = self.read_lines_at_offset(tensor_start_offsets[-1], 4*number_of_atoms-1, skip=2)
 
-				if not len(row_number_list) == 3:
-					raise Exception("Error reading row from chemical shift tensor. Length should be 3 but is not. Row number list looks like", row_number_list)
-					
-				atomic_tensor.append(row_number_list)
+		row_lines = [line for i, line in enumerate(tensor_lines) if i % 4 != 3] #drop the 'ion    N' lines
 
-			chemical_shift_tensor.append(atomic_tensor)			
+		if len(row_lines) != 3*number_of_atoms:
+			raise Exception("Incorrect number of chemical shift tensor rows obtained:", len(row_lines))
 
-		return chemical_shift_tensor
+		return su.get_number_array_from_lines(row_lines, column_count=3).reshape(number_of_atoms, 3, 3)
 
 	def get_isotropic_chemical_shifts(self):
 		"""
@@ -452,25 +672,18 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run does not yet have chemical shift information - not completed")
 
-		tensor_start_indices = self.get_line_indices_containing_string(Outcar.isotropic_chemical_shift_string)
+		tensor_start_offsets = self.get_line_offsets_containing_string(Outcar.isotropic_chemical_shift_string)
 
-		if len(tensor_start_indices) == 0:
+		if len(tensor_start_offsets) == 0:
 			raise Exception("No chemical shift information found in completed outcar file")
 
-		tensor_start_index = tensor_start_indices[-1]
-
 		chemical_shift_values = []
 
-		for N in range(self.get_number_of_atoms()):
-			atomic_tensor = []
-
-			tensor_start_index += 1
-
-			line = self.lines[tensor_start_index]
+		for line in self.read_lines_at_offset(tensor_start_offsets[-1], self.get_number_of_atoms(), skip=1):
 			row_number_list = su.get_number_list_from_string(line)
 			iso_shift = row_number_list[4]
 
-			chemical_shift_values.append(iso_shift)	
+			chemical_shift_values.append(iso_shift)
 
 		return chemical_shift_values
 
@@ -486,21 +699,13 @@ class Outcar(File):
 		if not self.complete:
 			raise Exception("Run does not yet have EFG information - not completed")
 
-		tensor_start_index = self.get_line_indices_containing_string(search_string)[-1] + jump + -1
+		tensor_start_offset = self.get_line_offsets_containing_string(search_string)[-1]
 
 		efg_tensors = []
 
-		for N in range(self.get_number_of_atoms()):
-			atomic_efg_tensor = []
-
-			tensor_start_index += 1
-
-			line = self.lines[tensor_start_index]
+		for line in self.read_lines_at_offset(tensor_start_offset, self.get_number_of_atoms(), skip=jump):
 			row_number_list = su.get_number_list_from_string(line)
 
 			efg_tensors.append(row_number_list[1:])
 
 		return efg_tensors
-
-
-
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from unittest2 import TestCase
+
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.util.path import Path
+import fpctoolkit.util.string_util as su
+
+class Test(TestCase):
+
+	class_title = 'Outcar'
+	data_dir_path = Path.clean(os.path.dirname(__file__), 'data_'+class_title)
+
+	def setUp(self):
+		self.data_path = Path.clean(self.__class__.data_dir_path)
+
+	def test_init(self):
+		with self.assertRaises(IOError):
+			outcar = Outcar(Path.clean(self.data_path, 'not_an_outcar'))
+
+		outcar = Outcar(Path.clean(self.data_path, 'outcar'))
+
+		self.assertEqual(outcar._lines, None) #nothing read on init
+		self.assertEqual(outcar.section_offsets_dictionary, None)
+		self.assertTrue(outcar)
+
+		self.assertEqual(len(outcar.lines), 93914)
+		self.assertEqual(outcar.lines[338], '   number of dos      NEDOS =    301   number of ions     NIONS =     20')
+
+	def test_section_index(self):
+		outcar = Outcar(Path.clean(self.data_path, 'outcar'))
+
+		self.assertTrue(outcar.complete)
+		self.assertEqual(outcar._lines, None) #index does not need lines
+
+		forces_offsets = outcar.get_line_offsets_containing_string(Outcar.forces_string)
+		self.assertEqual(len(forces_offsets), 72)
+		self.assertEqual(outcar.read_line_at_offset(forces_offsets[-1]), ' ' + Outcar.forces_string)
+		self.assertEqual(outcar.get_line_offsets_containing_string(Outcar.hessian_string), [])
+
+		energy_line_indices = outcar.get_line_indices_containing_string(Outcar.total_energy_string)
+		self.assertEqual(len(outcar.get_line_offsets_containing_string(Outcar.total_energy_string)), len(energy_line_indices))
+
+	def test_properties(self):
+		outcar = Outcar(Path.clean(self.data_path, 'outcar'))
+
+		self.assertEqual(outcar.get_number_of_atoms(), 20)
+		self.assertEqual(outcar.get_number_of_cores(), 8)
+		self.assertEqual(outcar.get_incar_parameter_value('ISIF'), 3)
+		self.assertEqual(outcar.get_incar_parameter_value('NOT_A_TAG'), None)
+		self.assertEqual(outcar.get_total_cpu_time(), 3326.547)
+		self.assertEqual(outcar.get_calculation_time_in_core_hours(), 7.39)
+		self.assertEqual(outcar.energy, -145.02135546)
+
+		final_forces_list = outcar.final_forces_list
+		self.assertEqual(len(final_forces_list), 60)
+		self.assertEqual(final_forces_list[0:3], [-0.017935, -0.00923, 0.059685])
+		self.assertEqual(final_forces_list[-3:], [-0.048565, 0.047848, -0.004338])
+
+		self.assertEqual(outcar.final_stresses_list, [-0.65934, -0.94122, -0.56613, 0.35615, 0.10671, -0.01731])
+
+	def test_dfpt_properties(self):
+		outcar = Outcar(Path.clean(self.data_path, 'dfpt_outcar'))
+
+		self.assertEqual(outcar.get_number_of_atoms(), 2)
+		self.assertEqual(outcar.get_dielectric_tensor().tolist(), [[6.191006, -0.0, 0.0], [-0.0, 6.191006, 0.0], [0.0, 0.0, 5.904211]])
+
+		born_effective_charge_tensor = outcar.get_born_effective_charge_tensor()
+		self.assertEqual(born_effective_charge_tensor.shape, (2, 3, 3))
+		self.assertEqual(born_effective_charge_tensor[0].tolist(), [[2.55248, 0.0, 0.00001], [0.0, 2.55247, 0.0], [0.00001, 0.0, 2.59358]])
+		self.assertEqual(born_effective_charge_tensor[1][2].tolist(), [-0.00001, 0.0, -2.59358])
+
+		hessian_matrix = outcar.get_hessian_matrix()
+		self.assertEqual(hessian_matrix.shape, (6, 6))
+		self.assertEqual(hessian_matrix[0].tolist(), [9.12, -0.0, -0.0, -9.12, -0.0, -0.0])
+		self.assertEqual(hessian_matrix[5][2], -7.5)
+
+	def test_is_complete_at_path(self):
+		file_path = Path.clean(self.data_path, 'outcar')
+
+		self.assertTrue(Outcar.is_complete_at_path(file_path))
+		self.assertTrue(Outcar.completion_cache_dictionary[file_path][1])
+		self.assertFalse(Outcar.is_complete_at_path(Path.clean(self.data_path, 'not_an_outcar')))
+
+		temporary_directory_path = tempfile.mkdtemp()
+		truncated_file_path = os.path.join(temporary_directory_path, 'truncated_outcar')
+		outcar = Outcar(file_path)
+
+		with open(truncated_file_path, 'wb') as file:
+			file.write("\n".join(outcar.lines[0:5000]) + "\n")
+
+		try:
+			self.assertFalse(Outcar.is_complete_at_path(truncated_file_path))
+			self.assertFalse(Outcar(truncated_file_path).complete)
+
+			with open(truncated_file_path, 'ab') as file:
+				file.write("                  Total CPU time used (sec):       36.000\n")
+
+			self.assertTrue(Outcar(truncated_file_path).complete)
+		finally:
+			shutil.rmtree(temporary_directory_path)
+
+	def test_get_number_array_from_lines(self):
+		number_array = su.get_number_array_from_lines(["  1X   -9.12   0.0", "  1Y   0.615E+02 -.934E+02"], column_count=2, skipped_column_count=1)
+		self.assertEqual(number_array.tolist(), [[-9.12, 0.0], [61.5, -93.4]])
+
+		with self.assertRaises(Exception):
+			su.get_number_array_from_lines(["1.0 2.0", "3.0"], column_count=2)
+
+	def test_ionic_trajectory(self):
+		outcar = Outcar(Path.clean(self.data_path, 'outcar'))
+
+		ionic_energies = outcar.get_ionic_energies()
+		self.assertEqual(len(ionic_energies), 72)
+		self.assertEqual(ionic_energies[0], -100.75494412)
+		self.assertEqual(ionic_energies[-1], outcar.energy)
+
+		ionic_trajectory = outcar.get_ionic_trajectory()
+		self.assertEqual(ionic_trajectory['energies'].tolist(), ionic_energies)
+		self.assertEqual(ionic_trajectory['positions'].shape, (72, 20, 3))
+		self.assertEqual(ionic_trajectory['forces'].shape, (72, 20, 3))
+		self.assertEqual(ionic_trajectory['stresses'].shape, (72, 6))
+		self.assertEqual(ionic_trajectory['positions'][0][0].tolist(), [-1.36736, 4.71455, 8.71026])
+		self.assertEqual(ionic_trajectory['forces'][0][0].tolist(), [-1.180720, 0.637057, 0.286361])
+		self.assertEqual(ionic_trajectory['forces'][-1].flatten().tolist(), outcar.final_forces_list)
+		self.assertEqual(ionic_trajectory['stresses'][-1].tolist(), outcar.final_stresses_list)
+
+		strided_trajectory = outcar.get_ionic_trajectory(stride=10)
+		self.assertEqual(strided_trajectory['energies'].tolist(), ionic_energies[::10])
+		self.assertEqual(strided_trajectory['forces'].shape, (8, 20, 3))
+
+		ionic_step_generator = outcar.get_ionic_step_generator(stride=71)
+		self.assertEqual(ionic_step_generator.next()['energy'], ionic_energies[0])
+		self.assertEqual(ionic_step_generator.next()['energy'], ionic_energies[71])
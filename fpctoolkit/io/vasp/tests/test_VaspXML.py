@@ -0,0 +1,51 @@
+import os
+from unittest2 import TestCase
+
+from fpctoolkit.io.vasp.vasp_xml import VaspXML
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	data_dir_path = Path.clean(os.path.dirname(__file__), '..', 'data')
+
+	def setUp(self):
+		self.data_path = Path.clean(self.__class__.data_dir_path)
+
+	def test_init(self):
+		vasp_xml = VaspXML(Path.clean(self.data_path, 'example.xml'))
+
+		self.assertEqual(len(vasp_xml.atom_types), 256)
+		self.assertEqual(vasp_xml.atom_types[0], 'Cu')
+		self.assertEqual(vasp_xml.lattices.shape, (5, 3, 3))
+		self.assertEqual(vasp_xml.positions.shape, (5, 256, 3))
+		self.assertEqual(vasp_xml.forces.shape, (5, 256, 3))
+		self.assertEqual(vasp_xml.lattices[0].tolist(), [[14.465628, 0.0, 0.0], [0.0, 14.465628, 0.0], [0.0, 0.0, 14.465628]])
+		self.assertEqual(vasp_xml.positions[0][1].tolist(), [0.0, 0.0, 0.25])
+		self.assertEqual(vasp_xml.forces[0][0].tolist(), [0.00000038, 0.00015345, -0.00021402])
+
+	def test_ionic_step_generator(self):
+		file_path = Path.clean(self.data_path, 'example.xml')
+		vasp_xml = VaspXML(file_path)
+
+		ionic_steps = list(VaspXML.get_ionic_step_generator(file_path))
+
+		self.assertEqual(len(ionic_steps), 5)
+
+		for i, (lattice, positions, forces) in enumerate(ionic_steps):
+			self.assertEqual(positions.tolist(), vasp_xml.positions[i].tolist())
+			self.assertEqual(forces.tolist(), vasp_xml.forces[i].tolist())
+
+	def test_structures(self):
+		vasp_xml = VaspXML(Path.clean(self.data_path, 'example.xml'))
+
+		self.assertEqual(len(vasp_xml.structures), 5)
+
+		structure = vasp_xml.structures[-1]
+
+		self.assertEqual(structure.site_count, 256)
+		self.assertEqual(structure.sites[4]['position'], vasp_xml.positions[4][4].tolist())
+		self.assertEqual(structure.sites[4]['force'], vasp_xml.forces[4][4].tolist())
+		self.assertEqual(len([structure for structure in vasp_xml.structures]), 5)
+
+		with self.assertRaises(IndexError):
+			vasp_xml.structures[5]
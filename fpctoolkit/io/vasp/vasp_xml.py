@@ -14,71 +14,162 @@ import xml.etree.ElementTree as ET
 
 
 class VaspXML(object):
-	
+	"""
+	Reads the atom types and the lattice, positions, and forces of every ionic step of a vasprun.xml file.
+
+	The file is read with iterparse, and elements are cleared as soon as they are consumed, so memory use does not scale with
+	the size of the xml tree. After construction:
+
+	self.atom_types is a list like ['Cu', 'Cu', ...]
+	self.lattices is an (S, 3, 3) numpy array, where S is the number of ionic steps
+	self.positions is an (S, N, 3) numpy array of direct coordinates, where N is the number of atoms
+	self.forces is an (S, N, 3) numpy array
+	self.structures is a list-like view that builds a Structure instance for a step only when it is indexed
+
+	For files too large to hold even these arrays, use VaspXML.get_ionic_step_generator directly.
+	"""
+
 	def __init__(self, xml_file_path):
 
-		self.tree = ET.parse(xml_file_path)
+		self.xml_file_path = xml_file_path
+
+		self.atom_types = VaspXML.get_atom_types(xml_file_path)
+
+		num_atoms = len(self.atom_types)
+
+		lattices = []
+		positions = []
+		forces = []
+
+		for lattice, positions_array, forces_array in VaspXML.get_ionic_step_generator(xml_file_path):
+			if len(positions_array) != num_atoms or len(forces_array) != num_atoms:
+				raise Exception("Not a consistent atom count in data.")
+
+			lattices.append(lattice)
+			positions.append(positions_array)
+			forces.append(forces_array)
+
+		self.lattices = np.array(lattices).reshape(len(lattices), 3, 3)
+		self.positions = np.array(positions).reshape(len(positions), num_atoms, 3)
+		self.forces = np.array(forces).reshape(len(forces), num_atoms, 3)
+
+		self.structures = VaspXMLStructureList(self)
 
-		root = self.tree.getroot()
 
-		self.atom_types = []
-		
-		for arr in root.find('atominfo'):
-			if arr.attrib.has_key('name') and arr.attrib['name'] == 'atoms':
+	@staticmethod
+	def get_atom_types(xml_file_path):
+		"""
+		Returns the list of atom types (like ['Ba', 'Ti', 'O', 'O', 'O']) from the atominfo block of the xml file. Parsing
+		stops as soon as the atominfo block is read.
+		"""
 
-				for atoms in arr.find('set'):
+		atom_types = []
+
+		for event, element in ET.iterparse(xml_file_path, events=('end',)):
+			if element.tag == 'array' and element.attrib.get('name') == 'atoms':
+				for atoms in element.find('set'):
 					for atom in atoms:
 						if not su.string_represents_integer(atom.text):
-							self.atom_types.append(atom.text.strip())
+							atom_types.append(atom.text.strip())
 
-		self.positions = []
-		self.lattices = []
-		self.forces = []
+			elif element.tag == 'atominfo':
+				break
 
-		#get forces and atom positions
-		for calculation in root.findall('calculation'):
+		return atom_types
 
-			for structure in calculation.findall('structure'):
+	@staticmethod
+	def get_ionic_step_generator(xml_file_path):
+		"""
+		Yields a (lattice, positions, forces) tuple of numpy arrays for each calculation block (ionic step) in the xml file, where lattice
+		is 3x3 and positions (direct coordinates) and forces are Nx3.
 
-				for v in structure.find('crystal'):
-					if v.attrib.has_key('name') and v.attrib['name'] == 'basis':
-						self.lattices.append([su.get_number_list_from_string(v[i].text) for i in range(len(v))])
+		Each calculation block is cleared from the tree once it has been yielded, along with any large arrays (eigenvalues, dos)
+		inside it, so only one ionic step is held in memory at a time.
+		"""
 
-				for v in structure.findall('varray'):
+		root = None
+		inside_calculation = False
+		lattice = None
+		positions = None
+		forces = None
 
-					if v.attrib.has_key('name') and v.attrib['name'] == 'positions':
-						self.positions.append([su.get_number_list_from_string(v[i].text) for i in range(len(v))])
+		for event, element in ET.iterparse(xml_file_path, events=('start', 'end')):
+			if event == 'start':
+				if root is None:
+					root = element
+				elif element.tag == 'calculation':
+					inside_calculation = True
+					lattice = positions = forces = None
 
-			for v in calculation:
+				continue
 
-				if v.attrib.has_key('name') and v.attrib['name'] == 'forces':
-					
-					self.forces.append([su.get_number_list_from_string(v[i].text) for i in range(len(v))])
+			if element.tag == 'varray':
+				if inside_calculation:
+					varray_name = element.attrib.get('name')
 
+					if varray_name in ['basis', 'positions', 'forces']:
+						varray_array = su.get_number_array_from_lines([v.text for v in element], column_count=3)
 
-		#make the list of structures, one for each ionic step
-		self.structures = []
+						if varray_name == 'basis':
+							lattice = varray_array
+						elif varray_name == 'positions':
+							positions = varray_array
+						else:
+							forces = varray_array
 
-		num_ionic_steps = len(self.positions)
-		num_atoms = len(self.atom_types)
+				element.clear()
 
-		if len(self.lattices) != num_ionic_steps or len(self.forces) != num_ionic_steps:
-			raise Exception("Inconsistent number of data.")
+			elif element.tag == 'array':
+				element.clear()
 
-		for i in range(num_ionic_steps):
+			elif element.tag == 'calculation':
+				inside_calculation = False
 
-			sites = []
+				if lattice is None or positions is None or forces is None:
+					raise Exception("Inconsistent number of data.")
 
-			if len(self.positions[i]) != num_atoms or len(self.forces[i]) != num_atoms:
-				raise Exception("Not a consistent atom count in data.")
+				yield (lattice, positions, forces)
+
+				root.clear()
+
+
+class VaspXMLStructureList(object):
+	"""
+	List-like view of the ionic step structures of a VaspXML instance. A Structure (with the forces stored on each site) is only
+	built when an index is accessed, and is not kept afterwards.
+	"""
+
+	def __init__(self, vasp_xml):
+		self.vasp_xml = vasp_xml
+
+	def __len__(self):
+		return len(self.vasp_xml.positions)
+
+	def __getitem__(self, index):
+		if not isinstance(index, int):
+			raise Exception("Structure list index must be an integer. Index given is", index)
+
+		if index < 0:
+			index += len(self)
+
+		if index < 0 or index >= len(self):
+			raise IndexError
+
+		sites = []
+
+		positions_list = self.vasp_xml.positions[index].tolist()
+		forces_list = self.vasp_xml.forces[index].tolist()
 
+		for j in range(len(self.vasp_xml.atom_types)):
+			site = Site({'position': positions_list[j], 'coordinate_mode': 'Direct', 'type': self.vasp_xml.atom_types[j], 'force': forces_list[j]}) ##########Assumes direct coords!!!!
 
-			for j in range(num_atoms):
-				site = Site({'position': self.positions[i][j], 'coordinate_mode': 'Direct', 'type': self.atom_types[j], 'force': self.forces[i][j]}) ##########Assumes direct coords!!!!
+			sites.append(site)
 
-				sites.append(site)
+		return Structure(lattice=self.vasp_xml.lattices[index].tolist(), sites=SiteCollection(sites))
 
-			self.structures.append(Structure(lattice=self.lattices[i], sites=SiteCollection(sites)))
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self[index]
 
 
 
@@ -104,4 +195,4 @@ class VaspXML(object):
 # 	for sample in samples:
 # 		output += " ".join([str(round(x, 5)) for x in sample[0:num_neighbors*3+3]])
 
-# output.write_to_path('C:/Users/Tom/Desktop/out.txt')
\ No newline at end of file
+# output.write_to_path('C:/Users/Tom/Desktop/out.txt')
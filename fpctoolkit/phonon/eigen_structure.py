@@ -1,14 +1,13 @@
 #from fpctoolkit.phonon.eigen_structure import EigenStructure
 
 import numpy as np
-import copy
 import random
 
 from fpctoolkit.util.path import Path
 import fpctoolkit.util.basic_validators as basic_validators
 from fpctoolkit.phonon.hessian import Hessian
 from fpctoolkit.structure.structure import Structure
-from fpctoolkit.structure.displacement_vector import DisplacementVector
+from fpctoolkit.util.math.vector import Vector
 from fpctoolkit.phonon.eigen_component import EigenComponent
 
 class EigenStructure(object):
@@ -34,6 +33,10 @@ class EigenStructure(object):
 	When distorting a structure, displacements are always applied first (so they're in Lagrangian coordinates) and then strains are applied.
 	When recovering the strains and eigen_component amplitudes from a structure, strains are removed first, then displacement amplitudes are determined.
 
+	Many chromosomes can be turned into structures at once with get_distorted_positions_and_lattices or get_distorted_structures_list, which take a
+	(K, chromosome length) array of chromosomes. All K displacement vectors come from one product of the amplitudes with self.eigenvector_matrix
+	(eigenvectors as rows, in sorted order), and all K strained lattices from one batched product with the strain tensors.
+
 	Note: if exx = 0.0, these means no strain in xx direction.
 	"""
 
@@ -65,6 +68,8 @@ class EigenStructure(object):
 
 		self.reference_structure = reference_structure
 
+		self.eigenvector_matrix = hessian.get_sorted_eigenvalues_and_eigenvectors()[1].T #eigenvectors as rows, shared (read only) with hessian
+
 
 		if distorted_structure:
 			self.set_strains_and_amplitudes_from_distorted_structure(distorted_structure)
@@ -100,17 +105,62 @@ class EigenStructure(object):
 		Apply the strains in voigt strains list and the displacements in the eigen_components list to the reference structure and return the new structure.
 		"""
 
-		total_displacement_vector = np.asarray([0.0]*3*self.reference_structure.site_count)
+		return self.get_distorted_structures_list([self.get_list_representation()])[0]
 
-		for eigen_component in self.eigen_components_list:
-			total_displacement_vector += eigen_component.get_displacement_vector()
+	def get_distorted_positions_and_lattices(self, eigen_chromosomes):
+		"""
+		eigen_chromosomes is a (K, L) array (or list of K lists) of chromosomes like [eta_xx, eta_yy, eta_zz, eta_yz, eta_xz, eta_xy, A_1, A_2, ...]. As in
+		set_eigen_chromosome, chromosomes shorter than the full length are padded with zeros.
+
+		Returns (positions, lattices), where positions is a (K, N, 3) array of the distorted site positions (in the coordinate mode of the reference
+		structure, ordered as its sites) and lattices is a (K, 3, 3) array of the strained lattice matrices. This gives the same structures as calling
+		set_eigen_chromosome and get_distorted_structure for each chromosome, without changing the chromosome stored in self.
+		"""
+
+		eigen_chromosomes = np.array(eigen_chromosomes, dtype=np.float64, ndmin=2)
+
+		if eigen_chromosomes.shape[1] > len(self.eigen_components_list) + 6:
+			raise Exception("Eigen chromosomes are longer than the number of strains plus eigen components.", eigen_chromosomes.shape[1], len(self.eigen_components_list) + 6)
+
+		if eigen_chromosomes.shape[1] < 6:
+			eigen_chromosomes = np.hstack([eigen_chromosomes, np.zeros((len(eigen_chromosomes), 6 - eigen_chromosomes.shape[1]))])
+
+		amplitudes = eigen_chromosomes[:, 6:]
+
+		displacement_vectors = np.dot(amplitudes, self.eigenvector_matrix[:amplitudes.shape[1]]) #Cartesian, (K, 3N)
+
+		reference_lattice = self.reference_structure.lattice
+		reference_coordinate_mode = self.reference_structure.sites.get_coordinate_mode()
+
+		cartesian_reference_positions = self.reference_structure.sites.get_positions_in_coordinate_mode('Cartesian', reference_lattice)
+
+		positions = cartesian_reference_positions[np.newaxis, :, :] + displacement_vectors.reshape(len(eigen_chromosomes), -1, 3)
+
+		if reference_coordinate_mode == 'Direct':
+			positions = np.dot(positions, reference_lattice.get_inverse_matrix())
+
+		lattices = np.matmul(reference_lattice.get_matrix(), np.transpose(EigenStructure.get_strain_tensors(eigen_chromosomes[:, :6]), (0, 2, 1)))
+
+		return (positions, lattices)
+
+	def get_distorted_structures_list(self, eigen_chromosomes):
+		"""
+		Returns the list of distorted structures for the (K, L) array of chromosomes eigen_chromosomes (see get_distorted_positions_and_lattices).
+		"""
 
+		positions, lattices = self.get_distorted_positions_and_lattices(eigen_chromosomes)
 
-		distorted_structure = DisplacementVector.displace_structure(reference_structure=self.reference_structure, displacement_vector=total_displacement_vector, displacement_coordinate_mode='Cartesian')
+		distorted_structures_list = []
 
-		distorted_structure.lattice.strain(self.get_strain_tensor())
+		for k in range(len(positions)):
+			distorted_structure = self.reference_structure.copy()
 
-		return distorted_structure
+			distorted_structure.sites.positions = positions[k]
+			distorted_structure.lattice.from_2D_array(lattices[k])
+
+			distorted_structures_list.append(distorted_structure)
+
+		return distorted_structures_list
 		
 
 	def get_decomposed_structures(self, distorted_structure, threshold=0.1, mult=1.0):
@@ -166,54 +216,96 @@ class EigenStructure(object):
 
 
 
+	@staticmethod
+	def get_strain_tensors(voigt_strains_array):
+		"""
+		Vectorized get_strain_tensor: converts a (K, 6) array of voigt strains to a (K, 3, 3) array of upper triangle strain tensors.
+		"""
+
+		e = np.array(voigt_strains_array, dtype=np.float64, ndmin=2)
+
+		strain_tensors = np.zeros((len(e), 3, 3))
+
+		strain_tensors[:, [0, 1, 2], [0, 1, 2]] = 1.0 + e[:, 0:3]
+		strain_tensors[:, 0, 1] = e[:, 5]
+		strain_tensors[:, 0, 2] = e[:, 4]
+		strain_tensors[:, 1, 2] = e[:, 3]
+
+		return strain_tensors
+
+
 	def set_strains_and_amplitudes_from_distorted_structure(self, input_displaced_structure):
 		"""
 		Modifies the passed in voigt strains and eigen_components list such that the strains and amplitudes would reproduce the input displaced_structure if 
 		get_displaced_structure were called.
 		"""
 
+		eigen_chromosome = self.get_eigen_chromosomes_from_distorted_structures([input_displaced_structure])[0]
 
-		displaced_structure = copy.deepcopy(input_displaced_structure)
+		self.voigt_strains_list = eigen_chromosome[:6].tolist()
 
-		strain_tensor = displaced_structure.lattice.get_strain_tensor_relative_to_reference(reference_lattice=self.reference_structure.lattice)
+		for i, eigen_component in enumerate(self.eigen_components_list):
+			eigen_component.amplitude = eigen_chromosome[i+6]
 
 
-		exx = strain_tensor[0][0] - 1.0
-		eyy = strain_tensor[1][1] - 1.0
-		ezz = strain_tensor[2][2] - 1.0
+		#self.set_translational_eigen_component_amplitudes_to_zero() #**do we want to do this always?**
 
-		eyz = strain_tensor[1][2] + strain_tensor[2][1] #be careful of this double summation, but should work fine
-		exz = strain_tensor[0][2] + strain_tensor[2][0]
-		exy = strain_tensor[0][1] + strain_tensor[1][0]
+	def get_eigen_chromosomes_from_distorted_structures(self, distorted_structures_list):
+		"""
+		Bulk version of set_strains_and_amplitudes_from_distorted_structure. Returns a (K, 6 + 3N) array whose rows are the eigen chromosomes
+		[eta_xx, eta_yy, eta_zz, eta_yz, eta_xz, eta_xy, A_1, ..., A_3N] of the K structures in distorted_structures_list, without changing self.
 
-		self.voigt_strains_list = [exx, eyy, ezz, eyz, exz, exy]
+		Strains come from the lattices relative to the reference lattice. Strains are then removed (positions are read against the reference lattice), the
+		displacements from the reference structure of all sites of all structures are found with one minimum image kernel call, and all amplitudes come from
+		one product with self.eigenvector_matrix. Amplitudes smaller than 1e-10 in magnitude are set to zero.
+		"""
 
+		reference_lattice = self.reference_structure.lattice
+		reference_types_list = self.reference_structure.sites.get_types_list()
+		site_count = self.reference_structure.site_count
 
-		displaced_structure.lattice = copy.deepcopy(self.reference_structure.lattice) #remove all strains before finding displacement amplitudes
+		eigen_chromosomes = np.zeros((len(distorted_structures_list), 6 + len(self.eigen_components_list)))
 
+		if len(distorted_structures_list) == 0:
+			return eigen_chromosomes
 
-		total_displacement_vector_instance = DisplacementVector.get_instance_from_displaced_structure_relative_to_reference_structure(reference_structure=self.reference_structure, 
-			displaced_structure=displaced_structure, coordinate_mode='Cartesian')
+		lattices = np.array([distorted_structure.lattice.get_matrix() for distorted_structure in distorted_structures_list])
+		distorted_direct_positions = np.zeros((len(distorted_structures_list), site_count, 3))
 
-		total_displacement_vector = total_displacement_vector_instance.to_numpy_array()
+		for k, distorted_structure in enumerate(distorted_structures_list):
+			Structure.validate(distorted_structure)
 
-		#print "total disp vec: "
-		#print str(total_displacement_vector)
+			if distorted_structure.site_count != site_count:
+				raise Exception("Site counts of two structures must be equal.", site_count, distorted_structure.site_count)
 
-		for eigen_component in self.eigen_components_list:
-			basis_vector = eigen_component.eigenvector
+			distorted_types_list = distorted_structure.sites.get_types_list()
 
-			projection = np.dot(basis_vector, total_displacement_vector)
+			if distorted_types_list != reference_types_list:
+				site_index = [reference_types_list[i] != distorted_types_list[i] for i in range(site_count)].index(True)
+				raise Exception("Types of two structures do not align.", reference_types_list[site_index], distorted_types_list[site_index])
 
-			# print "projection: ", projection, "     Basis Vector: ", " ".join(str(x) for x in basis_vector)
+			distorted_direct_positions[k] = distorted_structure.sites.get_positions_in_coordinate_mode('Direct', reference_lattice) #lattice strains removed
 
-			if abs(projection) < 1e-10:
-				projection = 0.0
+		strain_tensors = np.transpose(np.matmul(reference_lattice.get_inverse_matrix(), lattices), (0, 2, 1))
 
-			eigen_component.amplitude = projection
+		eigen_chromosomes[:, 0:3] = strain_tensors[:, [0, 1, 2], [0, 1, 2]] - 1.0
+		eigen_chromosomes[:, 3] = strain_tensors[:, 1, 2] + strain_tensors[:, 2, 1] #be careful of this double summation, but should work fine
+		eigen_chromosomes[:, 4] = strain_tensors[:, 0, 2] + strain_tensors[:, 2, 0]
+		eigen_chromosomes[:, 5] = strain_tensors[:, 0, 1] + strain_tensors[:, 1, 0]
 
+		reference_direct_positions = self.reference_structure.sites.get_positions_in_coordinate_mode('Direct', reference_lattice)
 
-		#self.set_translational_eigen_component_amplitudes_to_zero() #**do we want to do this always?**
+		direct_displacements = Vector.get_paired_minimum_image_distances_and_vectors(np.tile(reference_direct_positions, (len(distorted_structures_list), 1)),
+			distorted_direct_positions.reshape(-1, 3), reference_lattice)[1]
+
+		displacement_vectors = reference_lattice.get_cartesian_coordinates(direct_displacements).reshape(len(distorted_structures_list), 3*site_count)
+
+		amplitudes = np.dot(displacement_vectors, self.eigenvector_matrix.T)
+		amplitudes[np.abs(amplitudes) < 1e-10] = 0.0
+
+		eigen_chromosomes[:, 6:] = amplitudes
+
+		return eigen_chromosomes
 
 	def get_mode_distorted_structures_list(self, amplitude=0.5):
 		"""
@@ -1,5 +1,6 @@
 #from fpctoolkit.phonon.hessian import Hessian
 
+import os
 import numpy as np
 import copy
 
@@ -7,13 +8,27 @@ import fpctoolkit.util.string_util as su
 import fpctoolkit.util.basic_validators as basic_validators
 from fpctoolkit.phonon.hessian_eigen_pair import HessianEigenPair
 from fpctoolkit.io.file import File
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.util.path import Path
 
 
 class Hessian(object):
 	"""
 	Represents the second derivative matrix of the energy as a function of atomic displacements.
+
+	The eigendecomposition of the matrix is computed (and validated) once, on first use, and cached. It is available as arrays through
+	get_sorted_eigenvalues_and_eigenvectors or as HessianEigenPair instances through get_sorted_hessian_eigen_pairs_list.
+
+	A Hessian can be saved to a store directory of .npy files (hermitian matrix, sorted eigenvalues and eigenvectors, born effective charge
+	tensor, dielectric tensor, and the modification time and size of the source OUTCAR) and loaded back memory mapped, which skips parsing
+	the OUTCAR. Hessian.get_instance_from_outcar does this automatically with a store next to the OUTCAR:
+
+		hessian = Hessian.get_instance_from_outcar(dfpt_force_run.outcar) #parses the OUTCAR only the first time
 	"""
 
+	store_directory_basename = '.hessian_store'
+	stored_array_names = ['hermitian_matrix', 'sorted_eigenvalues', 'sorted_eigenvectors', 'born_effective_charge_tensor', 'dielectric_tensor']
+
 	def __init__(self, outcar):
 		"""
 		outcar should be an initialized Outcar instance from a force constants calculation.
@@ -27,39 +42,220 @@ class Hessian(object):
 
 		self.hermitian_matrix = Hessian.get_hermitian_matrix(original_matrix)
 
+		self.sorted_eigenvalues = None
+		self.sorted_eigenvectors = None
+		self.sorted_hessian_eigen_pairs_list = None
+
+		self.born_effective_charge_tensor = None
+		self.dielectric_tensor = None
+
+
+	@staticmethod
+	def get_instance_from_outcar(outcar, store_path=None):
+		"""
+		Returns a Hessian for outcar (an Outcar instance read from a path), loaded from the store at store_path if the store was made from the
+		OUTCAR as it is now. Otherwise, the Hessian is built from the OUTCAR and saved to store_path. store_path defaults to a
+		'.hessian_store' directory next to the OUTCAR. If the store cannot be written (like in a read only run directory), the built Hessian
+		is returned without one.
+		"""
+
+		if store_path == None:
+			store_path = Path.join(os.path.dirname(os.path.abspath(outcar.load_path)), Hessian.store_directory_basename)
+
+		source_signature = Hessian.get_source_signature(outcar.load_path)
+
+		if Hessian.get_stored_source_signature(store_path) == source_signature:
+			return Hessian.load(store_path, outcar=outcar)
 
+		hessian = Hessian(outcar)
+
+		try:
+			hessian.save(store_path, source_signature)
+		except (IOError, OSError): #the store is only a cache
+			pass
+
+		return hessian
+
+	@staticmethod
+	def get_source_signature(outcar_path):
+		"""
+		Returns [mtime, size] of the OUTCAR at outcar_path.
+		"""
+
+		file_stat = os.stat(outcar_path)
+
+		return [float(file_stat.st_mtime), float(file_stat.st_size)]
+
+	@staticmethod
+	def get_stored_source_signature(store_path):
+		"""
+		Returns the source signature of the store at store_path as a list, or None if there is no complete store there.
+		"""
 
+		signature_path = Path.join(store_path, 'source_signature.npy')
+
+		if not Path.exists(signature_path):
+			return None
+
+		return np.load(signature_path).tolist()
+
+	def save(self, store_path, source_signature=None):
+		"""
+		Writes the arrays of this Hessian to the store directory at store_path, computing the eigendecomposition and (if the OUTCAR has them) the born
+		effective charge and dielectric tensors first. source_signature defaults to that of self.outcar. The signature is written last, so an
+		interrupted save leaves a store that is not loaded.
+		"""
+
+		if not Path.exists(store_path):
+			Path.make(store_path)
+
+		signature_path = Path.join(store_path, 'source_signature.npy')
+
+		if Path.exists(signature_path):
+			os.remove(signature_path)
+
+		if source_signature == None:
+			source_signature = Hessian.get_source_signature(self.outcar.load_path)
+
+		self.get_sorted_eigenvalues_and_eigenvectors()
+
+		for array_name, tensor_getter, section_string in [('born_effective_charge_tensor', self.get_born_effective_charge_tensor, Outcar.born_effective_charge_tensor_string),
+			('dielectric_tensor', self.get_dielectric_tensor, Outcar.dielectric_tensor_string)]:
+
+			if getattr(self, array_name) is None and (self.outcar == None or len(self.outcar.get_line_offsets_containing_string(section_string)) == 0):
+				continue #not a calculation with this tensor
+
+			tensor_getter()
+
+		for array_name in Hessian.stored_array_names:
+			array_path = Path.join(store_path, array_name + '.npy')
+			array = getattr(self, array_name)
+
+			if array is None:
+				if Path.exists(array_path):
+					os.remove(array_path)
+			else:
+				Hessian.save_array_by_replacing(array_path, array)
+
+		Hessian.save_array_by_replacing(signature_path, np.array(source_signature, dtype=np.float64))
+
+	@staticmethod
+	def save_array_by_replacing(array_path, array):
+		"""
+		Saves array to a temporary file and renames it to array_path, so arrays still memory mapped from an older file at array_path are not disturbed.
+		"""
+
+		temporary_path = array_path + '.tmp'
+
+		with open(temporary_path, 'wb') as array_file:
+			np.save(array_file, np.asarray(array))
+
+		os.rename(temporary_path, array_path)
+
+	@staticmethod
+	def load(store_path, outcar=None):
+		"""
+		Returns a Hessian whose arrays are memory mapped (read only) from the store at store_path. outcar, if given, is kept as self.outcar but is not read.
+		"""
+
+		if Hessian.get_stored_source_signature(store_path) == None:
+			raise Exception("No complete hessian store exists at path", store_path)
+
+		hessian = Hessian.__new__(Hessian)
+		hessian.outcar = outcar
+		hessian.sorted_hessian_eigen_pairs_list = None
+
+		for array_name in Hessian.stored_array_names:
+			array_path = Path.join(store_path, array_name + '.npy')
+
+			setattr(hessian, array_name, np.load(array_path, mmap_mode='r') if Path.exists(array_path) else None)
+
+		return hessian
+
+
+	def get_born_effective_charge_tensor(self):
+		"""
+		Returns the (N, 3, 3) born effective charge tensor (see Outcar.get_born_effective_charge_tensor), read from the OUTCAR only once.
+		"""
+
+		if getattr(self, 'born_effective_charge_tensor', None) is None:
+			if self.outcar == None:
+				raise Exception("Hessian has no born effective charge tensor stored and no outcar to read it from.")
+
+			self.born_effective_charge_tensor = np.asarray(self.outcar.get_born_effective_charge_tensor())
+
+		return self.born_effective_charge_tensor
+
+	def get_dielectric_tensor(self):
+		"""
+		Returns the 3x3 dielectric tensor (see Outcar.get_dielectric_tensor), read from the OUTCAR only once.
+		"""
+
+		if getattr(self, 'dielectric_tensor', None) is None:
+			if self.outcar == None:
+				raise Exception("Hessian has no dielectric tensor stored and no outcar to read it from.")
+
+			self.dielectric_tensor = np.asarray(self.outcar.get_dielectric_tensor())
+
+		return self.dielectric_tensor
+
+
+
+
+	def get_sorted_eigenvalues_and_eigenvectors(self):
+		"""
+		Returns (eigenvalues, eigenvectors) of the hermitian matrix as read only numpy arrays, sorted from lowest to highest eigenvalue.
+		As with np.linalg.eigh, eigenvectors[:, i] is the eigenvector of eigenvalues[i].
+
+		The decomposition is only done the first time this is called. The eigenvectors are checked to form an orthonormal basis then.
+		"""
+
+		if getattr(self, 'sorted_eigenvalues', None) is None: #also covers instances pickled before the cache existed
+			eigenvalues, eigenvectors = np.linalg.eigh(self.hermitian_matrix)
+
+			sorted_order = np.argsort(eigenvalues, kind='mergesort')
+
+			eigenvalues = eigenvalues[sorted_order]
+			eigenvectors = eigenvectors[:, sorted_order]
+
+			Hessian.validate_eigenvectors_are_orthonormal(eigenvectors)
+
+			eigenvalues.flags.writeable = False
+			eigenvectors.flags.writeable = False
+
+			self.sorted_eigenvalues = eigenvalues
+			self.sorted_eigenvectors = eigenvectors
+
+		return (self.sorted_eigenvalues, self.sorted_eigenvectors)
 
 	def get_sorted_hessian_eigen_pairs_list(self):
 		"""
-		Returns a list of HessianEigenPair instances.
+		Returns a list of HessianEigenPair instances, sorted from lowest to highest eigenvalue. The instances are made once and shared between calls.
 		The eigen vectors are checked to make sure they form a proper orthonormal basis for displacements in the structure:
 			Each vector must be orthogonal with each other
 			Each vector must have a magnitude of one
 			There must be exactly three translational modes
 		"""
 
-		eigenvalues, eigenvectors = np.linalg.eigh(self.hermitian_matrix)
-
-		hessian_eigen_pairs_list = []
+		if getattr(self, 'sorted_hessian_eigen_pairs_list', None) == None:
+			eigenvalues, eigenvectors = self.get_sorted_eigenvalues_and_eigenvectors()
 
-		for i in range(len(eigenvalues)):
-			hessian_eigen_pairs_list.append(HessianEigenPair(eigenvalue=eigenvalues[i], eigenvector=eigenvectors[:, i]))
+			sorted_hessian_eigen_pairs_list = []
 
+			for i in range(len(eigenvalues)):
+				sorted_hessian_eigen_pairs_list.append(HessianEigenPair(eigenvalue=eigenvalues[i], eigenvector=eigenvectors[:, i]))
 
-		Hessian.validate_translational_modes_in_eigen_pair_list(hessian_eigen_pairs_list)
-		Hessian.validate_eigen_pairs_are_orthonormal(hessian_eigen_pairs_list)
+			Hessian.validate_translational_modes_in_eigen_pair_list(sorted_hessian_eigen_pairs_list)
 
-		sorted_hessian_eigen_pairs_list = Hessian.get_sorted_eigen_pairs_list(hessian_eigen_pairs_list)
+			self.translational_mode_indices = []
 
+			for i, eigen_pair in enumerate(sorted_hessian_eigen_pairs_list):
+				if eigen_pair.is_translational_mode():
+					self.translational_mode_indices.append(i)
 
-		self.translational_mode_indices = []
+			self.sorted_hessian_eigen_pairs_list = sorted_hessian_eigen_pairs_list
 
-		for i, eigen_pair in enumerate(sorted_hessian_eigen_pairs_list):
-			if eigen_pair.is_translational_mode():
-				self.translational_mode_indices.append(i)
-
-		return sorted_hessian_eigen_pairs_list
+		return list(self.sorted_hessian_eigen_pairs_list)
 
 
 	def get_mode_effective_charge_vector(self, displacement_mode_vector, reference_structure):
@@ -72,17 +268,25 @@ class Hessian(object):
 
 		"""
 
-		polarization_vector = [0.0, 0.0, 0.0]
+		return self.get_mode_effective_charge_vectors(reference_structure, displacement_mode_vectors=[displacement_mode_vector])[0].tolist()
+
+	def get_mode_effective_charge_vectors(self, reference_structure, displacement_mode_vectors=None):
+		"""
+		Bulk version of get_mode_effective_charge_vector. Returns an (M, 3) array whose row m is the polarization vector of displacement_mode_vectors[m],
+		computed for all modes with one einsum over the cached (N, 3, 3) born effective charge tensor.
+
+		displacement_mode_vectors is an (M, 3N) array of mode vectors. If None, the sorted eigenvectors of this Hessian are used, giving a (3N, 3) array
+		ordered as get_sorted_hessian_eigen_pairs_list.
+		"""
 
-		bec_tensor = self.outcar.get_born_effective_charge_tensor() #NEED TO DIVIDE BY VOLUME IN ANGSTROMS^3 first then mult by Angstroms with displacements, then convert to C/m^2 from e/A^2
+		if displacement_mode_vectors is None:
+			displacement_mode_vectors = self.get_sorted_eigenvalues_and_eigenvectors()[1].T
 
-		for atom_index in range(len(bec_tensor)):
-			ion_3x3_tensor = bec_tensor[atom_index]
+		bec_tensor = self.get_born_effective_charge_tensor() #NEED TO DIVIDE BY VOLUME IN ANGSTROMS^3 first then mult by Angstroms with displacements, then convert to C/m^2 from e/A^2
 
-			for cartesian_direction_index in range(3):
-				for polarization_direction_index in range(3):
-					polarization_vector[polarization_direction_index] += displacement_mode_vector[cartesian_direction_index+atom_index*3]*ion_3x3_tensor[polarization_direction_index][cartesian_direction_index]
+		displacement_mode_vectors = np.asarray(displacement_mode_vectors, dtype=np.float64).reshape(-1, len(bec_tensor), 3)
 
+		polarization_vectors = np.einsum('mac,apc->mp', displacement_mode_vectors, bec_tensor) #sum over atoms a and displacement directions c
 
 		cell_volume = reference_structure.get_volume()
 		e = 1.6021766209*10**-19 #in coulombs
@@ -90,7 +294,7 @@ class Hessian(object):
 		conversion_factor = e*(1/cell_volume)*angstroms_sq_per_meter_sq
 
 		###watch units!
-		return [conversion_factor*component for component in polarization_vector]
+		return conversion_factor*polarization_vectors
 
 	def print_mode_effective_charge_vectors_to_file(self, file_path, reference_structure):
 		file = File()
@@ -99,13 +303,15 @@ class Hessian(object):
 		rnd = 4
 		pad = 7
 
+		mode_effective_charge_vectors = self.get_mode_effective_charge_vectors(reference_structure)
+
 		for i, eigen_pair in enumerate(self.get_sorted_hessian_eigen_pairs_list()):
 			index_string = str(i+1)
 
 			while len(index_string) < 3:
 				index_string += ' '
 
-			file += "u_" + index_string + '   ' + f(eigen_pair.eigenvalue, 2, pad) + '      ' + " ".join(f(x, rnd, pad) for x in self.get_mode_effective_charge_vector(eigen_pair.eigenvector, reference_structure))
+			file += "u_" + index_string + '   ' + f(eigen_pair.eigenvalue, 2, pad) + '      ' + " ".join(f(x, rnd, pad) for x in mode_effective_charge_vectors[i])
 			#file += ''
 
 		file.write_to_path(file_path)
@@ -154,11 +360,19 @@ class Hessian(object):
 
 	@staticmethod
 	def validate_eigen_pairs_are_orthonormal(eigen_pairs_list):
-		for i in range(0, len(eigen_pairs_list)):
-			eigen_pairs_list[i].validate_eigenvector_is_normalized()
+		Hessian.validate_eigenvectors_are_orthonormal(np.array([eigen_pair.eigenvector for eigen_pair in eigen_pairs_list]).T)
+
+	@staticmethod
+	def validate_eigenvectors_are_orthonormal(eigenvectors, tolerance=1e-8):
+		"""
+		Raises an exception unless the columns of eigenvectors are orthonormal, checking every dot product at once with eigenvectors.T*eigenvectors.
+		"""
+
+		deviation_matrix = np.abs(np.dot(eigenvectors.T, eigenvectors) - np.eye(eigenvectors.shape[1]))
+		i, j = np.unravel_index(np.argmax(deviation_matrix), deviation_matrix.shape)
 
-			for j in range(i+1, len(eigen_pairs_list)):
-				eigen_pairs_list[i].validate_eigen_pair_is_orthogonal_to(eigen_pairs_list[j])
+		if deviation_matrix[i][j] > tolerance:
+			raise Exception("Eigenvectors are not orthonormal. Dot product of eigenvectors", i, j, "deviates from the identity by", deviation_matrix[i][j])
 
 	@staticmethod
 	def get_sorted_eigen_pairs_list(eigen_pairs_list):
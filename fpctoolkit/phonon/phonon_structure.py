@@ -20,6 +20,8 @@ class PhononStructure(object):
 	Represents a structure whose distortions are characterized by a set of 'complex normal coordinates', Q_q,j (see around page 298 of Born and Huang and pages preceding).
 	"""
 
+	basis_independence_tolerance = 1e-10 #a candidate basis vector whose (normalized) component outside the span of the vectors before it is smaller than this is redundant
+
 	def __init__(self, primitive_cell_structure, phonon_band_structure, supercell_dimensions_list, distorted_structure=None):
 		"""
 		primitive_cell_structure should be the primitive cell Structure class instance that was used to generate the phonon band structure.
@@ -57,31 +59,32 @@ class PhononStructure(object):
 
 	def set_normal_coordinates_list_from_distorted_structure(self, distorted_structure):
 		"""
-		Determines the set of unique normal coordinates required to distort a reference structure to the distorted structure state. This function works by getting the displacement
-		vector instance, and then projecting this vector onto the normal mode basis.
+		Determines the set of unique normal coordinates required to distort a reference structure to the distorted structure state. The displacement
+		field of distorted_structure is solved against the whole basis at once (see get_normal_coordinate_coefficients_from_distorted_structures), giving
+		one normal coordinate per basis vector, in basis order.
 		"""
 
-		reference_structure = self.reference_supercell_structure
-
-		displacement_vector_instance = DisplacementVector.get_instance_from_distorted_structure_relative_to_reference_structure(reference_structure, distorted_structure, coordinate_mode='Cartesian')
-
-		displacement_vector_np_array = np.array(displacement_vector_instance.to_list())
+		coefficients = self.get_normal_coordinate_coefficients_from_distorted_structures([distorted_structure])[0]
 
 		self.normal_coordinates_list = []
 
-		while np.linalg.norm(displacement_vector_np_array) > 1e-3:
-			for basis_phonon_displacment_vector in self.basis_phonon_displacement_vector_list:
-				basis_vector_np_array = np.array(basis_phonon_displacment_vector.to_list())
-
-				projection_component = np.dot(displacement_vector_np_array, basis_vector_np_array)
+		for basis_phonon_displacment_vector, coefficient in zip(self.basis_phonon_displacement_vector_list, coefficients):
+			normal_coordinate = NormalCoordinate(normal_mode_instance=basis_phonon_displacment_vector.normal_mode, lambda_index=basis_phonon_displacment_vector.lambda_index, 
+				coefficient=float(coefficient), phonon_super_displacement_vector_instance=basis_phonon_displacment_vector)
 
-				displacement_vector_np_array += -1.0*projection_component*basis_vector_np_array
+			self.normal_coordinates_list.append(normal_coordinate)
 
-				normal_coordinate = NormalCoordinate(normal_mode_instance=basis_phonon_displacment_vector.normal_mode, lambda_index=basis_phonon_displacment_vector.lambda_index, 
-					coefficient=projection_component, phonon_super_displacement_vector_instance=basis_phonon_displacment_vector)
+	def get_normal_coordinate_coefficients_from_distorted_structures(self, distorted_structures_list):
+		"""
+		Returns a (K, dof_count) array whose row k holds the coefficients of the basis vectors (in self.basis_phonon_displacement_vector_list order) that
+		sum to the Cartesian displacements of distorted_structures_list[k] from the reference supercell. The K displacement fields are found with one
+		minimum image call (see DisplacementVector.get_displacement_fields) and solved with one product against self.basis_projection_matrix, which is
+		computed once when the basis is built.
+		"""
 
-				self.normal_coordinates_list.append(normal_coordinate)
+		displacement_vectors = DisplacementVector.get_displacement_fields(self.reference_supercell_structure, distorted_structures_list, coordinate_mode='Cartesian')
 
+		return np.dot(displacement_vectors.reshape(len(distorted_structures_list), self.dof_count), self.basis_projection_matrix.T)
 
 
 	def __str__(self):
@@ -118,15 +121,17 @@ class PhononStructure(object):
 		sorted_superfluous_basis = sorted(superfluous_basis, key=lambda x: x.normal_mode.eigenvalue)
 
 
-		for i in range(0, len(sorted_superfluous_basis)):
+		for superfluous_basis_vector in sorted_superfluous_basis:
+			if len(superfluous_basis_vector) != self.dof_count:
+				raise Exception("Basis vector does not have the correct number of degrees of freedom", len(superfluous_basis_vector), " should be", self.dof_count)
 
-			if len(sorted_superfluous_basis[i]) != self.dof_count:
-				raise Exception("Basis vector does not have the correct number of degrees of freedom", len(sorted_superfluous_basis[i]), " should be", self.dof_count)
+		candidate_vectors = np.array([superfluous_basis_vector.displacement_vector for superfluous_basis_vector in sorted_superfluous_basis]).reshape(-1, self.dof_count)
 
-			total_displacement_vector_set = self.basis_phonon_displacement_vector_list + [sorted_superfluous_basis[i]]
+		#orthonormal_vectors (rows) and triangular_matrix are the QR factors of the pruned basis: basis matrix (vectors as columns) = orthonormal_vectors.T*triangular_matrix
+		independent_indices, self.basis_orthonormal_vectors, self.basis_triangular_matrix = PhononStructure.get_independent_vectors_factorization(candidate_vectors,
+			PhononStructure.basis_independence_tolerance)
 
-			if DisplacementVector.no_vector_in_set_is_in_span_of_others(total_displacement_vector_set):
-				self.basis_phonon_displacement_vector_list.append(sorted_superfluous_basis[i])
+		self.basis_phonon_displacement_vector_list = [sorted_superfluous_basis[i] for i in independent_indices]
 
 		#print "Length of basis is:", len(self.basis_phonon_displacement_vector_list)
 		
@@ -139,6 +144,56 @@ class PhononStructure(object):
 		if len(translational_vectors_in_basis_list) != 3:
 			raise Exception("Number of translational vectors is not equal to three. This may be a sign of an incomplete basis. Count is", len(translational_vectors_in_basis_list))
 
+		#maps a displacement vector d to the basis coefficients c solving basis_matrix*c = d - that is, triangular_matrix^-1*orthonormal_vectors*d
+		self.basis_projection_matrix = np.linalg.solve(self.basis_triangular_matrix, self.basis_orthonormal_vectors)
+
+
+	@staticmethod
+	def get_independent_vectors_factorization(candidate_vectors, tolerance):
+		"""
+		Walks through the rows of candidate_vectors (K, D) in order, keeping each one that is not (to within tolerance, relative to its norm) in the span
+		of the rows kept before it. This is the same selection as checking the rank of the growing set at every step, but each candidate is only
+		orthogonalized against the kept vectors - incremental Gram-Schmidt, with a second pass for numerical stability - so the cost is
+		O(K*D*rank) instead of an SVD per candidate. Stops early once D vectors are kept.
+
+		Returns (independent_indices, orthonormal_vectors, triangular_matrix), where orthonormal_vectors is (rank, D) with orthonormal rows and
+		triangular_matrix is (rank, rank) upper triangular such that candidate_vectors[independent_indices].T = orthonormal_vectors.T*triangular_matrix.
+		"""
+
+		candidate_vectors = np.asarray(candidate_vectors, dtype=np.float64)
+		dimension = candidate_vectors.shape[1]
+
+		orthonormal_vectors = np.zeros((dimension, dimension))
+		triangular_matrix = np.zeros((dimension, dimension))
+		independent_indices = []
+
+		for i, candidate_vector in enumerate(candidate_vectors):
+			rank = len(independent_indices)
+
+			if rank == dimension:
+				break
+
+			residual_vector = candidate_vector.copy()
+			projection_coefficients = np.zeros(rank)
+
+			for orthogonalization_pass in range(2):
+				pass_coefficients = np.dot(orthonormal_vectors[:rank], residual_vector)
+				residual_vector -= np.dot(pass_coefficients, orthonormal_vectors[:rank])
+				projection_coefficients += pass_coefficients
+
+			residual_norm = np.linalg.norm(residual_vector)
+
+			if residual_norm > tolerance*np.linalg.norm(candidate_vector):
+				orthonormal_vectors[rank] = residual_vector/residual_norm
+				triangular_matrix[:rank, rank] = projection_coefficients
+				triangular_matrix[rank, rank] = residual_norm
+
+				independent_indices.append(i)
+
+		rank = len(independent_indices)
+
+		return (independent_indices, orthonormal_vectors[:rank], triangular_matrix[:rank, :rank])
+
 
 	def initialize_normal_coordinates_list(self):
 		"""
@@ -2,7 +2,6 @@
 
 import numpy as np
 from collections import OrderedDict
-import cmath
 
 import fpctoolkit.util.basic_validators as basic_validators
 from fpctoolkit.structure.displacement_vector import DisplacementVector
@@ -62,21 +61,16 @@ class PhononSuperDisplacementVector(DisplacementVector):
 
 		self.reference_structure.convert_sites_to_direct_coordinates()
 
+		site_supercell_positions = self.reference_structure.sites.get_read_only_positions()*self.supercell_dimensions_list
+		atom_indices = np.arange(self.reference_structure.site_count)//self.cell_count
 
-		for i, site in enumerate(self.reference_structure.sites):
+		phase_factors = np.exp(2.0*np.pi*1.0j*np.dot(site_supercell_positions, q_vector))
+		atomic_displacements = np.asarray(eigen_displacements_vector).reshape(-1, 3)[atom_indices]*phase_factors[:, np.newaxis]
 
-		
-			atom_index = int(i/(self.cell_count))
-
-			site_supercell_position = [site['position'][x]*self.supercell_dimensions_list[x] for x in range(3)] 
-
-			atomic_displacement = eigen_displacements_vector[3*atom_index:3*atom_index+3]*cmath.exp(2.0*cmath.pi*1.0j*np.dot(q_vector, site_supercell_position))
-
-			for j in range(3):
-				if self.lambda_index == 1:
-					self.displacement_vector[i*3+j] = atomic_displacement[j].real
-				elif self.lambda_index == 2:
-					self.displacement_vector[i*3+j] = -1.0*atomic_displacement[j].imag
+		if self.lambda_index == 1:
+			self.displacement_vector = atomic_displacements.real.flatten()
+		elif self.lambda_index == 2:
+			self.displacement_vector = -1.0*atomic_displacements.imag.flatten()
 
 		if self.magnitude > PhononSuperDisplacementVector.zero_vector_magnitude_tolerance:
 			self.normalize()
@@ -0,0 +1,105 @@
+import os
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.phonon.hessian import Hessian
+from fpctoolkit.phonon.eigen_structure import EigenStructure
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.displacement_vector import DisplacementVector
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	outcar_data_path = Path.clean(os.path.dirname(__file__), '..', '..', 'io', 'vasp', 'tests', 'data_Outcar')
+
+	def setUp(self):
+		self.hessian = Hessian(Outcar(Path.join(self.__class__.outcar_data_path, 'dfpt_outcar')))
+
+		lattice = [[4.0, 0.1, 0.0], [-0.2, 4.1, 0.0], [0.3, 0.0, 4.2]]
+		self.direct_reference_structure = Structure(lattice=lattice, sites=SiteCollection.get_instance_from_arrays([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]], ['Ga', 'As'], 'Direct'))
+
+		self.cartesian_reference_structure = self.direct_reference_structure.copy()
+		self.cartesian_reference_structure.convert_sites_to_cartesian_coordinates()
+
+		random_state = np.random.RandomState(8)
+
+		self.eigen_chromosomes = np.hstack([random_state.uniform(-0.05, 0.05, size=(4, 6)), random_state.uniform(-0.3, 0.3, size=(4, 6))])
+
+	def get_distorted_structure_by_components(self, eigen_structure, eigen_chromosome):
+		"""
+		Builds the structure of one chromosome by summing each eigen component's displacement, displacing, then straining the lattice.
+		"""
+
+		eigen_structure.set_eigen_chromosome(eigen_chromosome)
+
+		total_displacement_vector = np.zeros(3*eigen_structure.reference_structure.site_count)
+
+		for eigen_component in eigen_structure.eigen_components_list:
+			total_displacement_vector += eigen_component.get_displacement_vector()
+
+		distorted_structure = DisplacementVector.displace_structure(reference_structure=eigen_structure.reference_structure, displacement_vector=total_displacement_vector,
+			displacement_coordinate_mode='Cartesian')
+		distorted_structure.lattice.strain(eigen_structure.get_strain_tensor())
+
+		return distorted_structure
+
+	def test_distorted_structures(self):
+		short_eigen_chromosomes = [[0.01, 0.0, -0.02, 0.0, 0.03, 0.0, 0.2, -0.1], [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.25]] #padded with zero amplitudes
+		strain_only_eigen_chromosomes = [[0.02, -0.01, 0.0]]
+
+		for reference_structure in [self.direct_reference_structure, self.cartesian_reference_structure]:
+			eigen_structure = EigenStructure(reference_structure, self.hessian)
+
+			for eigen_chromosomes in [self.eigen_chromosomes, short_eigen_chromosomes, strain_only_eigen_chromosomes]:
+				positions, lattices = eigen_structure.get_distorted_positions_and_lattices(eigen_chromosomes)
+				distorted_structures_list = eigen_structure.get_distorted_structures_list(eigen_chromosomes)
+
+				self.assertEqual(positions.shape, (len(eigen_chromosomes), 2, 3))
+				self.assertEqual(lattices.shape, (len(eigen_chromosomes), 3, 3))
+
+				for k, eigen_chromosome in enumerate(eigen_chromosomes):
+					expected_structure = self.get_distorted_structure_by_components(eigen_structure, eigen_chromosome)
+
+					self.assertTrue(np.allclose(positions[k], expected_structure.sites.positions, rtol=0.0, atol=1e-12))
+					self.assertTrue(np.allclose(lattices[k], expected_structure.lattice.get_matrix(), rtol=0.0, atol=1e-12))
+
+					self.assertEqual(distorted_structures_list[k].sites.get_coordinate_mode(), reference_structure.sites.get_coordinate_mode())
+					self.assertEqual(distorted_structures_list[k].sites.get_types_list(), ['Ga', 'As'])
+					self.assertTrue(np.allclose(distorted_structures_list[k].sites.positions, expected_structure.sites.positions, rtol=0.0, atol=1e-12))
+					self.assertTrue(np.allclose(distorted_structures_list[k].lattice.get_matrix(), expected_structure.lattice.get_matrix(), rtol=0.0, atol=1e-12))
+
+			self.assertTrue(np.allclose(reference_structure.lattice.get_matrix(), [[4.0, 0.1, 0.0], [-0.2, 4.1, 0.0], [0.3, 0.0, 4.2]])) #reference is not changed
+
+		with self.assertRaises(Exception):
+			eigen_structure.get_distorted_positions_and_lattices(np.zeros((1, 13)))
+
+	def test_eigen_chromosomes_from_distorted_structures(self):
+		for reference_structure in [self.direct_reference_structure, self.cartesian_reference_structure]:
+			eigen_structure = EigenStructure(reference_structure, self.hessian)
+
+			distorted_structures_list = eigen_structure.get_distorted_structures_list(self.eigen_chromosomes)
+			eigen_chromosomes = eigen_structure.get_eigen_chromosomes_from_distorted_structures(distorted_structures_list)
+
+			self.assertEqual(eigen_chromosomes.shape, (4, 12))
+			self.assertTrue(np.allclose(eigen_chromosomes, self.eigen_chromosomes, rtol=0.0, atol=1e-12))
+
+			eigen_structure.set_strains_and_amplitudes_from_distorted_structure(distorted_structures_list[2])
+			self.assertTrue(np.allclose(eigen_structure.get_list_representation(), self.eigen_chromosomes[2], rtol=0.0, atol=1e-12))
+
+		self.assertEqual(eigen_structure.get_eigen_chromosomes_from_distorted_structures([]).shape, (0, 12))
+
+		too_many_sites_structure = Structure(lattice=self.direct_reference_structure.lattice, sites=SiteCollection.get_instance_from_arrays([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5],
+			[0.25, 0.25, 0.25]], ['Ga', 'As', 'As'], 'Direct'))
+
+		with self.assertRaises(Exception) as context:
+			eigen_structure.get_eigen_chromosomes_from_distorted_structures([distorted_structures_list[0], too_many_sites_structure])
+		self.assertEqual(context.exception.args, ("Site counts of two structures must be equal.", 2, 3))
+
+		swapped_types_structure = Structure(lattice=self.direct_reference_structure.lattice, sites=SiteCollection.get_instance_from_arrays([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]],
+			['As', 'Ga'], 'Direct'))
+
+		with self.assertRaises(Exception) as context:
+			eigen_structure.get_eigen_chromosomes_from_distorted_structures([swapped_types_structure])
+		self.assertEqual(context.exception.args, ("Types of two structures do not align.", 'Ga', 'As'))
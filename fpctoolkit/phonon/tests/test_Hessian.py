@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.phonon.hessian import Hessian
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	outcar_data_path = Path.clean(os.path.dirname(__file__), '..', '..', 'io', 'vasp', 'tests', 'data_Outcar')
+
+	def setUp(self):
+		self.run_path = tempfile.mkdtemp()
+		self.outcar_path = Path.join(self.run_path, 'OUTCAR')
+		self.store_path = Path.join(self.run_path, Hessian.store_directory_basename)
+
+		shutil.copy(Path.join(self.__class__.outcar_data_path, 'dfpt_outcar'), self.outcar_path)
+
+	def tearDown(self):
+		shutil.rmtree(self.run_path)
+
+	def test_eigen_decomposition(self):
+		hessian = Hessian(Outcar(self.outcar_path))
+
+		eigh_call_count = [0]
+		original_eigh = np.linalg.eigh
+
+		def counting_eigh(matrix):
+			eigh_call_count[0] += 1
+			return original_eigh(matrix)
+
+		np.linalg.eigh = counting_eigh
+
+		try:
+			eigenvalues, eigenvectors = hessian.get_sorted_eigenvalues_and_eigenvectors()
+			eigen_pairs_list = hessian.get_sorted_hessian_eigen_pairs_list()
+
+			self.assertTrue(hessian.get_sorted_eigenvalues_and_eigenvectors()[1] is eigenvectors)
+			self.assertEqual(hessian.get_sorted_hessian_eigen_pairs_list(), eigen_pairs_list)
+		finally:
+			np.linalg.eigh = original_eigh
+
+		self.assertEqual(eigh_call_count[0], 1)
+
+		self.assertTrue(np.allclose(eigenvalues, [0.0, 0.0, 0.0, 15.0, 18.24, 18.24]))
+		self.assertTrue(np.all(np.diff(eigenvalues) >= 0.0))
+		self.assertFalse(eigenvalues.flags.writeable)
+		self.assertFalse(eigenvectors.flags.writeable)
+
+		self.assertTrue(np.allclose(np.dot(hessian.hermitian_matrix, eigenvectors), eigenvectors*eigenvalues))
+
+		for i, eigen_pair in enumerate(eigen_pairs_list):
+			self.assertEqual(eigen_pair.eigenvalue, eigenvalues[i])
+			self.assertTrue(np.allclose(eigen_pair.eigenvector, eigenvectors[:, i]))
+
+		self.assertEqual(hessian.translational_mode_indices, [0, 1, 2])
+
+		Hessian.validate_eigenvectors_are_orthonormal(eigenvectors)
+
+		non_orthonormal_vectors = np.array(eigenvectors)
+		non_orthonormal_vectors[:, 4] += 1e-3*non_orthonormal_vectors[:, 1]
+
+		with self.assertRaises(Exception):
+			Hessian.validate_eigenvectors_are_orthonormal(non_orthonormal_vectors)
+
+	def test_mode_effective_charge_vectors(self):
+		hessian = Hessian(Outcar(self.outcar_path))
+		reference_structure = Structure(lattice=[[4.0, 0.0, 0.0], [0.0, 4.0, 0.0], [0.0, 0.0, 4.2]], sites=SiteCollection.get_instance_from_arrays([[0.0, 0.0, 0.0],
+			[0.5, 0.5, 0.5]], ['Ga', 'As'], 'Direct'))
+
+		bec_tensor = hessian.get_born_effective_charge_tensor()
+		eigenvectors = hessian.get_sorted_eigenvalues_and_eigenvectors()[1]
+		conversion_factor = 1.6021766209*10**-19*10**20/reference_structure.get_volume()
+
+		mode_effective_charge_vectors = hessian.get_mode_effective_charge_vectors(reference_structure)
+
+		self.assertEqual(mode_effective_charge_vectors.shape, (6, 3))
+
+		for m in range(6):
+			expected_vector = [conversion_factor*sum(eigenvectors[3*a + c, m]*bec_tensor[a][p][c] for a in range(2) for c in range(3)) for p in range(3)]
+
+			self.assertTrue(np.allclose(mode_effective_charge_vectors[m], expected_vector, rtol=1e-12, atol=0.0))
+			self.assertTrue(np.allclose(hessian.get_mode_effective_charge_vector(eigenvectors[:, m], reference_structure), mode_effective_charge_vectors[m], rtol=1e-12, atol=0.0))
+
+		displacement_mode_vectors = np.random.RandomState(1).normal(size=(4, 6))
+		self.assertTrue(np.allclose(hessian.get_mode_effective_charge_vectors(reference_structure, displacement_mode_vectors)[3],
+			hessian.get_mode_effective_charge_vector(displacement_mode_vectors[3].tolist(), reference_structure), rtol=1e-12, atol=0.0))
+
+	def test_store(self):
+		hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+		eigenvalues, eigenvectors = hessian.get_sorted_eigenvalues_and_eigenvectors()
+
+		self.assertTrue(Path.exists(Path.join(self.store_path, 'source_signature.npy')))
+		self.assertEqual(Hessian.get_stored_source_signature(self.store_path), Hessian.get_source_signature(self.outcar_path))
+
+		stored_hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+
+		for array_name in Hessian.stored_array_names:
+			stored_array = getattr(stored_hessian, array_name)
+
+			self.assertTrue(isinstance(stored_array, np.memmap))
+			self.assertFalse(stored_array.flags.writeable)
+			self.assertTrue(np.allclose(stored_array, getattr(hessian, array_name)))
+
+		self.assertTrue(np.allclose(stored_hessian.get_born_effective_charge_tensor()[1], [[-2.55248, 0.0, -0.00001], [0.0, -2.55247, 0.0], [-0.00001, 0.0, -2.59358]]))
+		self.assertTrue(np.allclose(stored_hessian.get_dielectric_tensor(), [[6.191006, 0.0, 0.0], [0.0, 6.191006, 0.0], [0.0, 0.0, 5.904211]]))
+
+		stored_eigenvalues, stored_eigenvectors = stored_hessian.get_sorted_eigenvalues_and_eigenvectors()
+		self.assertTrue(np.allclose(stored_eigenvalues, eigenvalues))
+		self.assertTrue(np.allclose(stored_eigenvectors, eigenvectors))
+
+		#touching the OUTCAR changes its signature, so the store is rebuilt from it
+		file_stat = os.stat(self.outcar_path)
+		os.utime(self.outcar_path, (file_stat.st_atime, file_stat.st_mtime + 10.0))
+
+		rebuilt_hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+
+		self.assertFalse(isinstance(rebuilt_hessian.hermitian_matrix, np.memmap))
+		self.assertEqual(Hessian.get_stored_source_signature(self.store_path), Hessian.get_source_signature(self.outcar_path))
+		self.assertTrue(np.allclose(rebuilt_hessian.hermitian_matrix, hessian.hermitian_matrix))
+
+	def test_store_without_tensors(self):
+		outcar_lines = open(self.outcar_path).read().split('\n')
+		del outcar_lines[5:22] #the dielectric and born effective charge tensors
+
+		with open(self.outcar_path, 'w') as outcar_file:
+			outcar_file.write('\n'.join(outcar_lines))
+
+		hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+
+		self.assertEqual(hessian.born_effective_charge_tensor, None)
+		self.assertFalse(Path.exists(Path.join(self.store_path, 'dielectric_tensor.npy')))
+
+		stored_hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+
+		self.assertTrue(isinstance(stored_hessian.hermitian_matrix, np.memmap))
+		self.assertEqual(stored_hessian.dielectric_tensor, None)
+
+	def test_unwritable_store(self):
+		open(self.store_path, 'w').close() #a file where the store directory should be
+
+		hessian = Hessian.get_instance_from_outcar(Outcar(self.outcar_path))
+
+		self.assertFalse(isinstance(hessian.hermitian_matrix, np.memmap))
+		self.assertTrue(np.allclose(hessian.get_dielectric_tensor(), [[6.191006, 0.0, 0.0], [0.0, 6.191006, 0.0], [0.0, 0.0, 5.904211]]))
+		self.assertEqual(Hessian.get_stored_source_signature(self.store_path), None)
+
+		with self.assertRaises((IOError, OSError)):
+			hessian.save(self.store_path)
@@ -0,0 +1,73 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.phonon.phonon_structure import PhononStructure
+
+class Test(TestCase):
+
+	def setUp(self):
+		random_state = np.random.RandomState(2)
+
+		#rows 2, 5, 6 and 8 are (planted) combinations of the rows before them
+		independent_vectors = random_state.normal(size=(6, 8))
+
+		self.candidate_vectors = np.array([independent_vectors[0], independent_vectors[1], 2.0*independent_vectors[0] - 0.5*independent_vectors[1],
+			independent_vectors[2], independent_vectors[3] - independent_vectors[2] + 3.0*independent_vectors[0], independent_vectors[3],
+			np.zeros(8), independent_vectors[4], -independent_vectors[4] + independent_vectors[1], independent_vectors[5]])
+
+	def get_independent_indices_by_rank(self, candidate_vectors):
+		independent_indices = []
+
+		for i in range(len(candidate_vectors)):
+			if np.linalg.matrix_rank(candidate_vectors[independent_indices + [i]]) > len(independent_indices):
+				independent_indices.append(i)
+
+		return independent_indices
+
+	def test_independent_indices(self):
+		independent_indices = PhononStructure.get_independent_vectors_factorization(self.candidate_vectors, PhononStructure.basis_independence_tolerance)[0]
+
+		self.assertEqual(independent_indices, [0, 1, 3, 4, 7, 9])
+		self.assertEqual(independent_indices, self.get_independent_indices_by_rank(self.candidate_vectors))
+
+	def test_factorization(self):
+		independent_indices, orthonormal_vectors, triangular_matrix = PhononStructure.get_independent_vectors_factorization(self.candidate_vectors,
+			PhononStructure.basis_independence_tolerance)
+
+		self.assertEqual(orthonormal_vectors.shape, (6, 8))
+		self.assertEqual(triangular_matrix.shape, (6, 6))
+
+		self.assertTrue(np.allclose(np.dot(orthonormal_vectors, orthonormal_vectors.T), np.eye(6)))
+		self.assertTrue(np.all(np.tril(triangular_matrix, -1) == 0.0))
+		self.assertTrue(np.allclose(self.candidate_vectors[independent_indices].T, np.dot(orthonormal_vectors.T, triangular_matrix)))
+
+	def test_stops_at_full_rank(self):
+		random_state = np.random.RandomState(4)
+
+		candidate_vectors = np.concatenate([random_state.normal(size=(4, 4)), np.full((3, 4), np.nan)]) #rows past a full basis must never be looked at
+
+		independent_indices, orthonormal_vectors, triangular_matrix = PhononStructure.get_independent_vectors_factorization(candidate_vectors,
+			PhononStructure.basis_independence_tolerance)
+
+		self.assertEqual(independent_indices, [0, 1, 2, 3])
+		self.assertTrue(np.allclose(np.dot(orthonormal_vectors.T, orthonormal_vectors), np.eye(4)))
+		self.assertTrue(np.allclose(candidate_vectors[:4].T, np.dot(orthonormal_vectors.T, triangular_matrix)))
+
+	def test_projection_reconstructs_displacements(self):
+		random_state = np.random.RandomState(6)
+
+		#a non-orthogonal basis with redundant candidates mixed in, pruned and solved against as PhononStructure does
+		basis_vectors = random_state.normal(size=(5, 5)) + 2.0*np.eye(5)
+		candidate_vectors = np.array([basis_vectors[0], basis_vectors[1], basis_vectors[0] + basis_vectors[1], basis_vectors[2], basis_vectors[3], 0.5*basis_vectors[2], basis_vectors[4]])
+
+		independent_indices, orthonormal_vectors, triangular_matrix = PhononStructure.get_independent_vectors_factorization(candidate_vectors,
+			PhononStructure.basis_independence_tolerance)
+		projection_matrix = np.linalg.solve(triangular_matrix, orthonormal_vectors)
+
+		basis_matrix = candidate_vectors[independent_indices].T #basis vectors as columns
+		displacement_vectors = random_state.normal(size=(4, 5))
+
+		coefficients = np.dot(displacement_vectors, projection_matrix.T)
+
+		self.assertTrue(np.allclose(np.dot(basis_matrix, coefficients.T).T, displacement_vectors))
+		self.assertTrue(np.allclose(coefficients, np.linalg.solve(basis_matrix, displacement_vectors.T).T))
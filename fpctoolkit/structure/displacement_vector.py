@@ -11,6 +11,9 @@ class DisplacementVector(object):
 	"""
 	Represents a displacement vector for a supercell. This vector has an x, y, and z 
 	component of displacement for each atom in the cell (can be a supercel). It is thus of length 3*Nat*Ncell.
+
+	The components are stored in self.displacement_vector as a flat numpy array. Copies made by arithmetic share the reference structure
+	instead of deep copying it.
 	"""
 
 	def __init__(self, reference_structure, coordinate_mode='Cartesian'):
@@ -25,7 +28,7 @@ class DisplacementVector(object):
 
 		self.reference_structure = reference_structure
 
-		self.displacement_vector = [0.0]*3*reference_structure.site_count
+		self.displacement_vector = np.zeros(3*reference_structure.site_count)
 
 		self.coordinate_mode = coordinate_mode
 
@@ -52,23 +55,15 @@ class DisplacementVector(object):
 		if len(displacement_vector) != len(self.displacement_vector):
 			raise Exception("To add two displacement vectors, their lengths must be equal.", displacement_vector, self.displacement_vector)
 
-		added_displacement_vector = copy.deepcopy(displacement_vector)
-
-		for i in range(len(added_displacement_vector)):
-			added_displacement_vector[i] += self.displacement_vector[i]
+		if isinstance(displacement_vector, DisplacementVector):
+			added_displacement_vector = displacement_vector.copy()
+			added_displacement_vector.displacement_vector = displacement_vector.displacement_vector + self.displacement_vector
+		else:
+			added_displacement_vector = (np.asarray(displacement_vector) + self.displacement_vector).tolist()
 
 		return added_displacement_vector
 
-	def __radd__(self, displacement_vector):
-		if len(displacement_vector) != len(self.displacement_vector):
-			raise Exception("To add two displacement vectors, their lengths must be equal.", displacement_vector, self.displacement_vector)
-
-		added_displacement_vector = copy.deepcopy(displacement_vector)
-
-		for i in range(len(added_displacement_vector)):
-			added_displacement_vector[i] += self.displacement_vector[i]
-
-		return added_displacement_vector
+	__radd__ = __iadd__
 
 	def __imul__(self, scalar):
 		if isinstance(scalar, complex):
@@ -76,16 +71,24 @@ class DisplacementVector(object):
 		else:
 			basic_validators.validate_real_number(scalar)
 
-		multiplied_displacement_vector = copy.deepcopy(self)
-
-
-		for i in range(len(multiplied_displacement_vector)):
-			multiplied_displacement_vector[i] *= scalar
+		multiplied_displacement_vector = self.copy()
+		multiplied_displacement_vector.displacement_vector = self.displacement_vector*scalar
 
 		return multiplied_displacement_vector
 
 	__rmul__ = __imul__
 
+	def copy(self):
+		"""
+		Returns a copy of this instance (including subclass attributes) with its own component array. The reference structure and any other
+		attributes are shared, not copied.
+		"""
+
+		displacement_vector_copy = copy.copy(self)
+		displacement_vector_copy.displacement_vector = self.displacement_vector.copy()
+
+		return displacement_vector_copy
+
 
 	def set(self, displacement_vector_list):
 		"""
@@ -95,7 +98,7 @@ class DisplacementVector(object):
 		if len(displacement_vector_list) != self.reference_structure.site_count*3:
 			raise Exception("Length of displacement vector inputted and number of displacement degrees of freedom in reference structure do not match", len(displacement_vector_list) , 3*self.reference_structure.site_count)
 
-		self.displacement_vector = copy.deepcopy(displacement_vector_list)
+		self.displacement_vector = np.array(displacement_vector_list, dtype=(np.complex128 if np.iscomplexobj(displacement_vector_list) else np.float64)).ravel()
 
 
 	def is_zero_vector(self, zero_tolerance=1e-12):
@@ -121,8 +124,7 @@ class DisplacementVector(object):
 			factor = (new_magnitude/self.magnitude)
 
 
-		for i in range(len(self.displacement_vector)):
-			self.displacement_vector[i] *= factor
+		self.displacement_vector *= factor
 
 		basic_validators.validate_approximately_equal(self.magnitude, new_magnitude, tolerance=1e-8)
 
@@ -139,10 +141,10 @@ class DisplacementVector(object):
 		Returns the stored displacement vector as a list of values [0.2, 0.5, ...].
 		"""
 
-		return self.displacement_vector
+		return self.displacement_vector.tolist()
 
 	def to_numpy_array(self):
-		return np.asarray(self.displacement_vector)
+		return self.displacement_vector.copy()
 
 	@property
 	def magnitude(self):
@@ -172,53 +174,70 @@ class DisplacementVector(object):
 		The vector connecting two sites is the shortest one possible under periodic boundary conditions.
 
 		The coordinate_mode argument determines whether direct fractional coordinates (unitless) or Cartesian coordinates (in Angstroms) are used to describe the displacements.
+
+		Neither structure is copied - the returned instance refers to reference_structure itself.
 		"""
 
-		Structure.validate(reference_structure)
-		Structure.validate(displaced_structure)
+		displacement_vector = DisplacementVector(reference_structure=reference_structure, coordinate_mode=coordinate_mode)
 
-		if reference_structure.site_count != displaced_structure.site_count:
-			raise Exception("Site counts of two structures must be equal.", reference_structure.site_count, displaced_structure.site_count)
+		displacement_vector.displacement_vector = DisplacementVector.get_displacement_field(reference_structure, displaced_structure, coordinate_mode).ravel()
 
+		return displacement_vector
+
+	@staticmethod
+	def get_displacement_field(reference_structure, displaced_structure, coordinate_mode='Cartesian'):
+		"""
+		Returns the (N, 3) array of shortest periodic vectors from each site of reference_structure to the site at the same index in displaced_structure,
+		in coordinate_mode coordinates. Computed from the two position arrays in one call, without copying either structure.
+		"""
+
+		return DisplacementVector.get_displacement_fields(reference_structure, [displaced_structure], coordinate_mode)[0]
+
+	@staticmethod
+	def get_displacement_fields(reference_structure, displaced_structures_list, coordinate_mode='Cartesian'):
+		"""
+		Returns the (K, N, 3) array whose entry k is the displacement field (see get_displacement_field) of displaced_structures_list[k] relative to
+		reference_structure. Each structure is validated in turn, then the shortest periodic vectors of all K*N site pairs are found in one call.
+		"""
 
-		lattice_1_np_array = reference_structure.lattice.to_np_array().flatten()
-		lattice_2_np_array = displaced_structure.lattice.to_np_array().flatten()
+		Structure.validate(reference_structure)
 
-		difference_array = lattice_2_np_array - lattice_1_np_array
+		if not coordinate_mode in ['Cartesian', 'Direct']:
+			raise Exception("Invalid coordinate mode given:", coordinate_mode)
 
-		if np.linalg.norm(difference_array) > 1e-8:
-			raise Exception("Lattice for reference and displaced structure are not equivalent. This will break the pbc shortest vector portion of this call.", difference_array)
+		reference_types_list = reference_structure.sites.get_types_list()
+		displaced_direct_positions = np.zeros((len(displaced_structures_list), reference_structure.site_count, 3))
 
+		for k, displaced_structure in enumerate(displaced_structures_list):
+			Structure.validate(displaced_structure)
 
-		reference_structure = copy.deepcopy(reference_structure)
-		displaced_structure = copy.deepcopy(displaced_structure)
+			if reference_structure.site_count != displaced_structure.site_count:
+				raise Exception("Site counts of two structures must be equal.", reference_structure.site_count, displaced_structure.site_count)
 
-		reference_structure.convert_sites_to_coordinate_mode('Direct')
-		displaced_structure.convert_sites_to_coordinate_mode('Direct')
 
-		displacement_vector = DisplacementVector(reference_structure=reference_structure, coordinate_mode=coordinate_mode)
+			difference_array = displaced_structure.lattice.get_matrix() - reference_structure.lattice.get_matrix()
 
-		for site_index in range(reference_structure.site_count):
-			reference_site = reference_structure.sites[site_index]
-			displaced_site = displaced_structure.sites[site_index]
+			if np.linalg.norm(difference_array) > 1e-8:
+				raise Exception("Lattice for reference and displaced structure are not equivalent. This will break the pbc shortest vector portion of this call.", difference_array.flatten())
 
-			if reference_site['type'] != displaced_site['type']:
-				raise Exception("Types of two structures do not align.", reference_site['type'], displaced_site['type'])
 
-			#if lattices of displaced and reference and not the same at this point, problems will arise here!!!!
-			shortest_pbc_vector_between_sites = Vector.get_minimum_distance_between_two_periodic_points(fractional_coordinate_1=reference_site['position'], ###############setting N_max to 2 - may need to be larger for heavily sheared systems!!!
-				fractional_coordinate_2=displaced_site['position'], lattice=reference_structure.lattice, N_max=2, return_vector=True)[1]
+			displaced_types_list = displaced_structure.sites.get_types_list()
 
-			if coordinate_mode =='Cartesian':
-				shortest_pbc_vector_between_sites = Vector.get_in_cartesian_coordinates(direct_vector=shortest_pbc_vector_between_sites, lattice=reference_structure.lattice)
+			if reference_types_list != displaced_types_list:
+				site_index = [reference_types_list[i] != displaced_types_list[i] for i in range(len(reference_types_list))].index(True)
+				raise Exception("Types of two structures do not align.", reference_types_list[site_index], displaced_types_list[site_index])
 
-			for i in range(3):
-				displacement_vector[site_index*3+i] = shortest_pbc_vector_between_sites[i]
+			displaced_direct_positions[k] = displaced_structure.sites.get_positions_in_coordinate_mode('Direct', displaced_structure.lattice)
 
+		reference_positions = reference_structure.sites.get_positions_in_coordinate_mode('Direct', reference_structure.lattice)
 
-		return displacement_vector
+		shortest_pbc_vectors_between_sites = Vector.get_paired_minimum_image_distances_and_vectors(np.tile(reference_positions, (len(displaced_structures_list), 1)),
+			displaced_direct_positions.reshape(-1, 3), reference_structure.lattice)[1]
 
+		if coordinate_mode == 'Cartesian':
+			shortest_pbc_vectors_between_sites = reference_structure.lattice.get_cartesian_coordinates(shortest_pbc_vectors_between_sites)
 
+		return shortest_pbc_vectors_between_sites.reshape(len(displaced_structures_list), reference_structure.site_count, 3)
 
 
 	@staticmethod
@@ -236,22 +255,17 @@ class DisplacementVector(object):
 			raise Exception("Invalid coordinate mode given:", displacement_coordinate_mode)
 
 
-		displaced_structure = copy.deepcopy(reference_structure)
-
-		original_reference_coordinate_mode = reference_structure.sites.get_coordinate_mode()
-		original_displaced_coordinate_mode = displaced_structure.sites.get_coordinate_mode()
-
-		reference_structure.convert_sites_to_coordinate_mode(displacement_coordinate_mode)
-		displaced_structure.convert_sites_to_coordinate_mode(displacement_coordinate_mode)
-
+		if isinstance(displacement_vector, DisplacementVector):
+			displacement_vector = displacement_vector.displacement_vector
 
-		for i, reference_site in enumerate(reference_structure.sites):
-			for j in range(3):
-				displaced_structure.sites[i]['position'][j] = reference_site['position'][j] + displacement_vector[j + i*3]
+		reference_positions = reference_structure.sites.get_positions_in_coordinate_mode(displacement_coordinate_mode, reference_structure.lattice)
+		displaced_positions = reference_positions + np.asarray(displacement_vector, dtype=np.float64).reshape(-1, 3)
 
+		displaced_structure = reference_structure.copy()
+		displaced_structure.sites.positions = displaced_positions #replaces the shared buffer, so the reference positions are never copied
+		displaced_structure.sites.coordinate_mode = displacement_coordinate_mode
 
-		displaced_structure.convert_sites_to_coordinate_mode(original_displaced_coordinate_mode)
-		reference_structure.convert_sites_to_coordinate_mode(original_reference_coordinate_mode)
+		displaced_structure.convert_sites_to_coordinate_mode(reference_structure.sites.get_coordinate_mode())
 
 		return displaced_structure
 
@@ -272,7 +286,7 @@ class DisplacementVector(object):
 		vector_matrix = []
 
 		for displacement_vector_instance in displacement_vector_instances_list:
-			vector_matrix.append(np.array(displacement_vector_instance.to_list()))
+			vector_matrix.append(displacement_vector_instance.displacement_vector)
 
 		np_vector_matrix = np.transpose(vector_matrix)
 
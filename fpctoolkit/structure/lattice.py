@@ -19,6 +19,9 @@ class Lattice(object):
 	To get a 2D array representation, one can use lattice.to_array() or lattice.to_np_array()
 
 	To modify, for example, a_y, one can use lattice[0][1] = 0.2.
+
+	The lattice matrix (lattice vectors as rows), its inverse, and the minimum image shift table are cached as numpy arrays. The cache is
+	dropped by from_2D_array (and so by strain), and is also rebuilt if a component was changed in place through lattice[i][j].
 	"""
 
 	def __init__(self, lattice_representation=None):
@@ -61,6 +64,35 @@ class Lattice(object):
 			lattice_vector = lattice_representation[i]
 			Vector.validate_3D_vector_representation(lattice_vector)
 
+	@staticmethod
+	def get_instance(lattice_representation):
+		"""
+		Returns lattice_representation itself if it is a Lattice instance (so its matrix cache is reused), otherwise a new Lattice made from it.
+		"""
+
+		if isinstance(lattice_representation, Lattice):
+			return lattice_representation
+		else:
+			return Lattice(lattice_representation)
+
+	def copy(self):
+		"""
+		Returns a copy of this lattice. The lattice vectors are copied, and the (read only) cached matrices are shared with the copy.
+		"""
+
+		lattice_copy = Lattice.__new__(Lattice)
+
+		lattice_copy.a = copy.copy(self.a)
+		lattice_copy.b = copy.copy(self.b)
+		lattice_copy.c = copy.copy(self.c)
+
+		lattice_copy.matrix_cache_key = getattr(self, 'matrix_cache_key', None)
+		lattice_copy.matrix = getattr(self, 'matrix', None)
+		lattice_copy.inverse_matrix = getattr(self, 'inverse_matrix', None)
+		lattice_copy.image_shift_table = getattr(self, 'image_shift_table', None)
+
+		return lattice_copy
+
 	def from_2D_array(self, array):
 		"""
 		Load a 2D list (array) into self.a, self.b, and self.c. Input array should have the form:
@@ -74,6 +106,71 @@ class Lattice(object):
 		self.b = copy.deepcopy(array[1])
 		self.c = copy.deepcopy(array[2])
 
+		self.invalidate_matrix_cache()
+
+	def invalidate_matrix_cache(self):
+		self.matrix_cache_key = None
+		self.matrix = None
+		self.inverse_matrix = None
+		self.image_shift_table = None
+
+	def get_matrix(self):
+		"""
+		Returns the (read only) cached 3x3 numpy array with the lattice vectors as rows.
+		"""
+
+		matrix_cache_key = (tuple(self.a), tuple(self.b), tuple(self.c))
+
+		if getattr(self, 'matrix_cache_key', None) != matrix_cache_key: #also covers instances pickled before the cache existed
+			self.matrix = np.array(matrix_cache_key, dtype=np.float64)
+			self.matrix.flags.writeable = False
+			self.inverse_matrix = None
+			self.image_shift_table = None
+			self.matrix_cache_key = matrix_cache_key
+
+		return self.matrix
+
+	def get_inverse_matrix(self):
+		"""
+		Returns the (read only) cached inverse of the lattice matrix. The inverse is only computed once per lattice change.
+		"""
+
+		matrix = self.get_matrix()
+
+		if self.inverse_matrix is None:
+			self.inverse_matrix = np.linalg.inv(matrix)
+			self.inverse_matrix.flags.writeable = False
+
+		return self.inverse_matrix
+
+	def get_image_shift_table(self):
+		"""
+		Returns the cached table of lattice translations searched for minimum images (see Vector.get_image_shift_table).
+		"""
+
+		matrix = self.get_matrix()
+
+		if self.image_shift_table is None:
+			self.image_shift_table = Vector.get_image_shift_table(matrix)
+
+		return self.image_shift_table
+
+	def get_cartesian_coordinates(self, direct_coordinates):
+		"""
+		Converts direct coordinates to cartesian coordinates. direct_coordinates can be a single 3D vector or an (N, 3) array - a numpy
+		array of the same shape is returned.
+		"""
+
+		return np.dot(np.asarray(direct_coordinates, dtype=np.float64), self.get_matrix())
+
+	def get_direct_coordinates(self, cartesian_coordinates):
+		"""
+		Converts cartesian coordinates to direct coordinates. cartesian_coordinates can be a single 3D vector or an (N, 3) array - a numpy
+		array of the same shape is returned.
+		"""
+
+		return np.dot(np.asarray(cartesian_coordinates, dtype=np.float64), self.get_inverse_matrix())
+
 
 	def __str__(self):
 		return " ".join(str(x) for x in self.a) + '\n' + " ".join(str(x) for x in self.b) + '\n' + " ".join(str(x) for x in self.c) + '\n'
@@ -116,7 +213,7 @@ class Lattice(object):
 		Returns lattice as a 3x3 numpy array
 		"""
 
-		return np.array(self.to_array())
+		return self.get_matrix().copy()
 
 	def equals(self, other_lattice):
 		"""
@@ -135,7 +232,7 @@ class Lattice(object):
 		Returns the volume of the lattice in Angstroms cubed.
 		"""
 
-		np_array = self.to_np_array()
+		np_array = self.get_matrix()
 
 		volume = np.dot(np_array[2], np.cross(np_array[0], np_array[1]))
 
@@ -193,7 +290,7 @@ class Lattice(object):
 		For out of plane only, specify e13, e23, and e33 as non-zero.
 		"""
 
-		original_lattice_matrix = self.to_np_array()
+		original_lattice_matrix = self.get_matrix()
 		strain_tensor = np.array(strain_tensor)
 		
 		if strain_tensor.ndim == 1:
@@ -234,10 +331,9 @@ class Lattice(object):
 		Returns a 3x3 tensor describing the strain needed to go from the reference_lattice to the current lattice.
 		"""
 
-		reference_lattice_matrix = reference_lattice.to_np_array()
-		distorted_lattice_matrix = self.to_np_array()
+		distorted_lattice_matrix = self.get_matrix()
 
-		reference_lattice_matrix_inverse = np.linalg.inv(reference_lattice_matrix)
+		reference_lattice_matrix_inverse = reference_lattice.get_inverse_matrix()
 
 		strain_tensor_transpose = np.dot(reference_lattice_matrix_inverse, distorted_lattice_matrix)
 
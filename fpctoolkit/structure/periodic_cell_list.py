@@ -0,0 +1,149 @@
+#from fpctoolkit.structure.periodic_cell_list import PeriodicCellList
+
+import numpy as np
+
+from fpctoolkit.util.math.vector import Vector
+
+
+class PeriodicCellList(object):
+	"""
+	Linked-cell neighbor search over the sites of a periodic structure. Finds all site pairs closer than a cutoff (under periodic boundary
+	conditions) in O(N) instead of testing every pair.
+
+	The cell is divided into a grid of bins along the lattice directions, each at least cutoff thick (measured between lattice planes, so
+	this holds for sheared cells too). Any pair within cutoff then sits in the same or adjacent bins, and only those candidates have their
+	minimum image distance computed.
+
+	Sites are read from the structure when binned. After moving some sites, call update_sites with their indices to re-bin only those
+	sites, then query only those sites with get_pairs_within_cutoff(site_index_list=...).
+
+	Usage:
+		cell_list = PeriodicCellList(structure, cutoff=2.0)
+		pairs, distances = cell_list.get_pairs_within_cutoff()
+		...move sites 3 and 7 of structure...
+		cell_list.update_sites([3, 7])
+		pairs, distances = cell_list.get_pairs_within_cutoff(site_index_list=[3, 7])
+	"""
+
+	def __init__(self, structure, cutoff):
+		"""
+		structure's lattice should not change while this cell list is in use - make a new cell list if it does.
+		"""
+
+		if cutoff <= 0.0:
+			raise Exception("Cutoff must be positive.", cutoff)
+
+		self.structure = structure
+		self.cutoff = float(cutoff)
+
+		site_count = len(structure.sites)
+		plane_spacings = 1.0/np.linalg.norm(structure.lattice.get_inverse_matrix(), axis=0)
+
+		self.bin_counts = np.maximum(1, np.floor(plane_spacings/self.cutoff)).astype(int)
+
+		maximum_bin_count = max(27, 2*site_count) #bins thicker than the cutoff are still correct - this just keeps the grid from outgrowing the site count
+
+		if np.prod(self.bin_counts) > maximum_bin_count:
+			scale_factor = (float(maximum_bin_count)/np.prod(self.bin_counts))**(1.0/3.0)
+			self.bin_counts = np.maximum(1, np.floor(self.bin_counts*scale_factor)).astype(int)
+
+		#adjacent bin offsets, with duplicates removed when there are fewer than three bins along a direction
+		offsets_by_direction = [sorted(set([offset % bin_count for offset in [-1, 0, 1]])) for bin_count in self.bin_counts]
+		self.neighbor_bin_offsets = np.array([[a, b, c] for a in offsets_by_direction[0] for b in offsets_by_direction[1] for c in offsets_by_direction[2]], dtype=int)
+
+		self.direct_positions = np.zeros((site_count, 3))
+		self.site_bin_indices = np.zeros((site_count, 3), dtype=int)
+
+		self.update_sites()
+
+
+	def update_sites(self, site_index_list=None):
+		"""
+		Re-reads the positions of the sites in site_index_list (all sites if None) from the structure and re-bins them.
+		"""
+
+		if site_index_list is None:
+			site_index_list = np.arange(len(self.structure.sites))
+		else:
+			site_index_list = np.asarray(site_index_list, dtype=int)
+
+		positions = self.structure.sites.get_read_only_positions()[site_index_list]
+
+		if self.structure.sites.get_coordinate_mode() == 'Cartesian':
+			positions = self.structure.lattice.get_direct_coordinates(positions)
+
+		positions = positions - np.floor(positions)
+
+		self.direct_positions[site_index_list] = positions
+		self.site_bin_indices[site_index_list] = np.minimum(np.floor(positions*self.bin_counts).astype(int), self.bin_counts-1)
+
+		flat_bin_indices = self.get_flat_bin_indices(self.site_bin_indices)
+
+		self.sites_sorted_by_bin = np.argsort(flat_bin_indices, kind='mergesort')
+		self.bin_site_counts = np.bincount(flat_bin_indices, minlength=np.prod(self.bin_counts))
+		self.bin_start_indices = np.concatenate([[0], np.cumsum(self.bin_site_counts)[:-1]])
+
+	def get_flat_bin_indices(self, bin_indices):
+		return (bin_indices[..., 0]*self.bin_counts[1] + bin_indices[..., 1])*self.bin_counts[2] + bin_indices[..., 2]
+
+	def get_candidate_pairs(self, site_index_list):
+		"""
+		Returns (first_indices, second_indices) arrays pairing each site in site_index_list with every other site in its own and adjacent bins.
+		"""
+
+		site_index_list = np.asarray(site_index_list, dtype=int)
+
+		neighbor_bin_indices = (self.site_bin_indices[site_index_list][:, np.newaxis, :] + self.neighbor_bin_offsets[np.newaxis, :, :]) % self.bin_counts
+		neighbor_flat_bin_indices = self.get_flat_bin_indices(neighbor_bin_indices).ravel()
+
+		candidate_counts = self.bin_site_counts[neighbor_flat_bin_indices]
+		candidate_count = np.sum(candidate_counts)
+
+		first_indices = np.repeat(np.repeat(site_index_list, len(self.neighbor_bin_offsets)), candidate_counts)
+
+		#position within each bin's block of sorted sites, for every candidate
+		offsets_within_bins = np.arange(candidate_count) - np.repeat(np.cumsum(candidate_counts) - candidate_counts, candidate_counts)
+		second_indices = self.sites_sorted_by_bin[np.repeat(self.bin_start_indices[neighbor_flat_bin_indices], candidate_counts) + offsets_within_bins]
+
+		not_self = (first_indices != second_indices)
+
+		return (first_indices[not_self], second_indices[not_self])
+
+	def get_pairs_within_cutoff(self, site_index_list=None, species_pair_cutoffs=None):
+		"""
+		Returns (pairs, distances), where pairs is a (P, 2) integer array of [i, j] site index pairs with i in site_index_list (all sites if
+		None) and j any other site, closer than the cutoff under periodic boundary conditions, and distances is the (P,) array of their minimum
+		image distances. Pairs are sorted by i (in site_index_list order), then by j. Both [i, j] and [j, i] appear if both are queried.
+
+		If species_pair_cutoffs is given, it should be an (S, S) array of per-type-pair cutoffs indexed by structure.sites.species_indices,
+		none larger than self.cutoff. Pairs are then kept only if closer than their type pair's cutoff.
+		"""
+
+		if site_index_list is None:
+			site_index_list = np.arange(len(self.structure.sites))
+
+		if len(site_index_list) == 0:
+			return (np.zeros((0, 2), dtype=int), np.zeros(0))
+
+		first_indices, second_indices = self.get_candidate_pairs(site_index_list)
+
+		distances = Vector.get_paired_minimum_image_distances_and_vectors(self.direct_positions[first_indices], self.direct_positions[second_indices], self.structure.lattice)[0]
+
+		if species_pair_cutoffs is None:
+			cutoffs = self.cutoff
+		else:
+			species_indices = self.structure.sites.species_indices
+			cutoffs = np.asarray(species_pair_cutoffs)[species_indices[first_indices], species_indices[second_indices]]
+
+		within_cutoff = (distances < cutoffs)
+
+		first_indices = first_indices[within_cutoff]
+		second_indices = second_indices[within_cutoff]
+		distances = distances[within_cutoff]
+
+		query_order = np.empty(len(self.structure.sites), dtype=int)
+		query_order[np.asarray(site_index_list, dtype=int)] = np.arange(len(site_index_list))
+
+		sorted_order = np.lexsort((second_indices, query_order[first_indices]))
+
+		return (np.column_stack([first_indices[sorted_order], second_indices[sorted_order]]), distances[sorted_order])
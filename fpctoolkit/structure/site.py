@@ -1,6 +1,7 @@
 #from fpctoolkit.structure.site import Site
 
 import numpy as np
+import copy
 
 from fpctoolkit.util.math.vector import Vector
 
@@ -20,9 +21,17 @@ class Site(object):
 	del site['magmom']
 
 	can also do: site['position'] = [0.1, 0.2, 0.0, 'cart']
+
+	Once a site is added to a SiteCollection, it becomes a view onto one row of that collection's arrays: its position, coordinate
+	mode, and type are read from and written to the collection, and site['position'] returns a SitePositionView that writes through
+	(site['position'][2] += 0.1 moves the site in the collection). Only other properties (like 'force') stay in self._properties.
 	"""
 
 	accepted_keys = ['position', 'coordinate_mode', 'type', 'force']
+	site_collection_keys = ['position', 'coordinate_mode', 'type']
+
+	_site_collection = None #set when this site is a view onto a row of a SiteCollection
+	_index = None
 
 	def __init__(self, properties=None):
 		self._properties = {}
@@ -51,12 +60,15 @@ class Site(object):
 			raise Exception("A valid site must define a type, and this must be a string. Site is:", site)
 
 	def __nonzero__(self):
-		return bool(self._properties)
+		return self.is_in_site_collection() or bool(self._properties)
 
 	def __str__(self):
-		return str(self._properties)
+		return str(self.get_properties_dictionary())
 
 	def __getitem__(self, key):
+		if self.is_in_site_collection() and key in Site.site_collection_keys:
+			return self._site_collection.get_site_property(self._index, key)
+
 		if key not in self._properties:
 			raise Exception("Site does not have property " + str(key))
 		else:
@@ -66,7 +78,7 @@ class Site(object):
 		if key in Site.accepted_keys:
 			if key == 'position':
 				if len(value) == 4: #has coord mode string at end [0.1, 0.1, 0.2, 'cart']
-					self._properties['coordinate_mode'] = Site.get_coordinate_mode_string(value.pop())
+					self['coordinate_mode'] = value.pop()
 				Vector.validate_3D_vector_representation(value)
 			elif key == 'coordinate_mode':
 				value = Site.get_coordinate_mode_string(value)
@@ -74,25 +86,97 @@ class Site(object):
 				if not isinstance(value, basestring):
 					raise Exception("Type must be of type string")
 
-			self._properties[key] = value
+			if self.is_in_site_collection() and key in Site.site_collection_keys:
+				self._site_collection.set_site_property(self._index, key, value)
+			else:
+				self._properties[key] = value
 		else:
 			raise Exception("Key " + str(key) + " is not an accepted site property")
 
 	def __delitem__(self, key):
+			if self.is_in_site_collection() and key in Site.site_collection_keys:
+				raise Exception("Cannot delete property " + str(key) + " of a site in a site collection")
+
 			del self._properties[key]
 
 	def __contains__(self, key):
-		return key in self._properties
+		return self.has_key(key)
 
 	def has_key(self, key):
+		if self.is_in_site_collection() and key in Site.site_collection_keys:
+			return True
+
 		return key in self._properties
 
+	def __deepcopy__(self, memo):
+		"""
+		A site in a site collection is copied along with its collection (once per deepcopy call), so the copy is the matching
+		view in the copied collection. A free site is copied property by property.
+		"""
+
+		if self.is_in_site_collection():
+			return copy.deepcopy(self._site_collection, memo).get_site_view(self._index)
+
+		site_copy = Site()
+		site_copy._properties = copy.deepcopy(self._properties, memo)
+
+		return site_copy
+
+
+	def is_in_site_collection(self):
+		return self._site_collection != None
+
+	def attach_to_site_collection(self, site_collection, index):
+		"""
+		Makes this site a view onto row index of site_collection. Position, coordinate mode, and type are dropped from
+		self._properties - site_collection is expected to already hold them in its arrays.
+		"""
+
+		for key in Site.site_collection_keys:
+			if key in self._properties:
+				del self._properties[key]
+
+		self._site_collection = site_collection
+		self._index = index
+
+	def detach_from_site_collection(self):
+		"""
+		Copies position, coordinate mode, and type out of the site collection into self._properties, after which this site
+		is a free site again.
+		"""
+
+		if self.is_in_site_collection():
+			self._properties['position'] = self['position'].to_list()
+			self._properties['coordinate_mode'] = self['coordinate_mode']
+			self._properties['type'] = self['type']
+
+			self._site_collection = None
+			self._index = None
+
+	def get_extra_properties_dictionary(self):
+		"""
+		Returns the dictionary of properties not stored in a site collection's arrays (like 'force').
+		"""
+
+		return dict((key, value) for key, value in self._properties.items() if key not in Site.site_collection_keys)
 
 	def get_properties_dictionary(self):
+		if self.is_in_site_collection():
+			properties_dictionary = self.get_extra_properties_dictionary()
+
+			for key in Site.site_collection_keys:
+				properties_dictionary[key] = self[key]
+
+			return properties_dictionary
+
 		return self._properties
 
 	def convert_to_coordinate_mode(self, coordinate_mode, lattice):
 
+		if self.is_in_site_collection():
+			self._site_collection.convert_to_coordinate_mode(coordinate_mode, lattice)
+			return
+
 		if coordinate_mode != self['coordinate_mode']:
 			self['coordinate_mode'] = coordinate_mode
 
@@ -108,9 +192,13 @@ class Site(object):
 		"""
 		Takes site in direct coordinates and changes
 		its position and coordinate mode to be in cartesian coordinate system
+
+		A site in a site collection shares its coordinate mode with the whole collection, so the whole collection is converted.
 		"""
 
-		if self['coordinate_mode'] == 'Direct':
+		if self.is_in_site_collection():
+			self._site_collection.convert_to_cartesian_coordinates(lattice)
+		elif self['coordinate_mode'] == 'Direct':
 			self['coordinate_mode'] = 'Cartesian'
 			self['position'] = Vector.get_in_cartesian_coordinates(self['position'], lattice).to_list()
 
@@ -118,9 +206,13 @@ class Site(object):
 		"""
 		Takes site in cartesian coordinates and changes
 		its position and coordinate mode to be in direct coordinate system
+
+		A site in a site collection shares its coordinate mode with the whole collection, so the whole collection is converted.
 		"""
 
-		if self['coordinate_mode'] == 'Cartesian':
+		if self.is_in_site_collection():
+			self._site_collection.convert_to_direct_coordinates(lattice)
+		elif self['coordinate_mode'] == 'Cartesian':
 			self['coordinate_mode'] = 'Direct'
 			self['position'] = Vector.get_in_direct_coordinates(self['position'], lattice).to_list()
 
@@ -131,8 +223,10 @@ class Site(object):
 
 		Vector.validate_3D_vector_representation(vector)
 
+		position = self['position']
+
 		for i in range(3):
-			self._properties['position'][i] += vector[i]
+			position[i] += vector[i]
 
 	def randomly_displace(self, displacement_vector_distribution_function, lattice, displacement_vector_coordinate_mode='Cartesian'):
 		"""
@@ -170,3 +264,64 @@ class Site(object):
 		for component in range(3):
 			if (site_1['position'][component] - site_2['position'][component]) > 0.0000000001:
 				return False
+
+
+
+class SitePositionView(object):
+	"""
+	List-like view of the position of a site in a SiteCollection. Reads and writes go straight to the collection's positions array,
+	so site['position'][0] += 0.1 moves the site. Reads do not unshare a position array shared copy on write with a copy of the collection. The view always looks up the site's current row, so it stays valid if the
+	collection reallocates its arrays.
+
+	Compares equal to a list holding the same three values, and copy.copy/copy.deepcopy give a plain list.
+	"""
+
+	def __init__(self, site):
+		self.site = site
+
+	def get_row(self):
+		return self.site._site_collection.positions[self.site._index]
+
+	def get_read_only_row(self):
+		return self.site._site_collection.get_read_only_positions()[self.site._index]
+
+	def __len__(self):
+		return 3
+
+	def __getitem__(self, key):
+		if isinstance(key, slice):
+			return self.to_list()[key]
+
+		return self.get_read_only_row()[key]
+
+	def __setitem__(self, key, value):
+		self.get_row()[key] = value
+
+	def __iter__(self):
+		return iter(self.to_list())
+
+	def __eq__(self, other):
+		try:
+			return self.to_list() == [other[i] for i in range(len(other))]
+		except TypeError:
+			return False
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __str__(self):
+		return str(self.to_list())
+
+	__repr__ = __str__
+
+	def __copy__(self):
+		return self.to_list()
+
+	def __deepcopy__(self, memo):
+		return self.to_list()
+
+	def __array__(self, dtype=None):
+		return np.array(self.get_read_only_row(), dtype=dtype)
+
+	def to_list(self):
+		return self.get_read_only_row().tolist()
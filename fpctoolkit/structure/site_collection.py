@@ -1,17 +1,31 @@
 #from fpctoolkit.structure.site_collection import SiteCollection
 
-from collections import OrderedDict
+import numpy as np
 import copy
+import weakref
 
-from fpctoolkit.structure.site import Site
+from fpctoolkit.structure.site import Site, SitePositionView
+from fpctoolkit.structure.lattice import Lattice
 from fpctoolkit.util.math.vector import Vector
 
 class SiteCollection(object):
 	"""
 	Collection of Site objects. The objects are validated to at minimum have a position, coordinate mode, and type.
 
-	self.sites is an ordered dictionary that looks like:   {'Ba': [Ba_site_1, Ba_site_2], 'Ti': [Ti_site_1, ...]}
+	Storage is array based:
 
+	self.positions is an (N, 3) float64 numpy array of site positions, sorted so that sites of the same type are contiguous
+	self.coordinate_mode is the single coordinate mode ('Direct' or 'Cartesian') of every position in the collection
+	self.species_list is the list of types in order of first insertion, like ['Ba', 'Ti', 'O']
+	self.species_indices is an (N,) integer numpy array - self.species_list[self.species_indices[i]] is the type of site i
+
+	Whole-collection operations (coordinate conversions, shifts) are single array operations on self.positions.
+
+	site_collection.copy() shares the position buffer with the copy (copy on write): the buffer is only copied when one of the collections
+	still sharing it asks for self.positions. Code that only reads positions should use get_read_only_positions to avoid that copy.
+
+	Site objects act as views onto rows of these arrays. Views are created only when a site is accessed (and then kept), so
+	building a collection from arrays costs no per-site Python objects.
 
 	sites['Ba'] will return a list of all sites where site['type'] is 'Ba'. This list will retain the original order of insertion.
 
@@ -21,7 +35,8 @@ class SiteCollection(object):
 
 	sites.keys() returns a list of all site sypes present in the colleciton (['Ba', 'Ti'])
 
-	sites.append(Site(...)) will add the given Site instance to the site colleciotn.
+	sites.append(Site(...)) will add the given Site instance to the site colleciotn. The site instance becomes a view onto the new
+	row, unless it is already a view in another collection, in which case a new view is made for the copied values.
 
 	sites.remove(Site) will remove the (address equivalent) site in the collection.
 
@@ -36,7 +51,7 @@ class SiteCollection(object):
 		"""
 		sites must be either None, a list of Site instances, or a SiteCollection instance.
 
-		Only shallow copies are made of the input sites.
+		Free sites in the input list become views in this collection. The arrays of an input SiteCollection instance are copied.
 		"""
 
 		if sites == None:
@@ -44,11 +59,110 @@ class SiteCollection(object):
 
 		SiteCollection.validate_constuctor_arguments(sites)
 
-		self.sites = OrderedDict()
+		self.positions = np.zeros((0, 3), dtype=np.float64)
+		self.coordinate_mode = None
+		self.species_list = []
+		self.species_indices = np.zeros(0, dtype=int)
+		self.site_views = []
+
+		if isinstance(sites, SiteCollection):
+			self.positions = sites._positions.copy()
+			self.coordinate_mode = sites.coordinate_mode
+			self.species_list = list(sites.species_list)
+			self.species_indices = sites.species_indices.copy()
+			self.site_views = [None]*len(self.positions)
+
+			for index, site in enumerate(sites.site_views):
+				extra_properties_dictionary = site.get_extra_properties_dictionary() if site != None else None
+
+				if extra_properties_dictionary:
+					self.get_site_view(index)._properties.update(extra_properties_dictionary)
+		elif sites:
+			self.extend(sites)
+
+	@property
+	def positions(self):
+		"""
+		The (N, 3) position array. If the array is shared with copies of this collection, this collection gets its own copy of it first,
+		so the returned array is always safe to modify in place.
+		"""
+
+		if len(self._positions_sharing_collections) > 1:
+			self.positions = self._positions.copy()
 
-		if sites:
-			for site in sites:
-				self.append(site)
+		return self._positions
+
+	@positions.setter
+	def positions(self, positions):
+		if getattr(self, '_positions_sharing_collections', None) != None:
+			self._positions_sharing_collections.discard(self)
+
+		self._positions = positions
+		self._positions_sharing_collections = weakref.WeakSet([self]) #shared between all live collections holding self._positions
+
+	def get_read_only_positions(self):
+		"""
+		Returns a read only view of the position array without copying it, even if it is shared with a copy of this collection.
+		"""
+
+		positions = self._positions.view()
+		positions.flags.writeable = False
+
+		return positions
+
+	def get_positions_in_coordinate_mode(self, coordinate_mode, lattice):
+		"""
+		Returns a (read only) array of the positions in coordinate_mode ('Direct' or 'Cartesian') without changing the coordinate mode
+		of the collection. lattice can be a Lattice instance or a 3x3 2D array.
+		"""
+
+		if coordinate_mode not in ['Direct', 'Cartesian']:
+			raise Exception("Given coordinate mode is not valid:", coordinate_mode)
+
+		if len(self) == 0 or coordinate_mode == self.coordinate_mode:
+			return self.get_read_only_positions()
+		elif coordinate_mode == 'Direct':
+			return Lattice.get_instance(lattice).get_direct_coordinates(self._positions)
+		else:
+			return Lattice.get_instance(lattice).get_cartesian_coordinates(self._positions)
+
+	def copy(self):
+		"""
+		Returns a copy of this collection. The position array is shared copy on write (see self.positions), the species index array is
+		shared (it is never modified in place), and only sites with properties beyond position, coordinate mode, and type get views in the copy
+		(with their extra properties deep copied).
+		"""
+
+		site_collection = SiteCollection.__new__(SiteCollection)
+
+		site_collection._positions = self._positions
+		site_collection._positions_sharing_collections = self._positions_sharing_collections
+		self._positions_sharing_collections.add(site_collection)
+
+		site_collection.coordinate_mode = self.coordinate_mode
+		site_collection.species_list = list(self.species_list)
+		site_collection.species_indices = self.species_indices
+		site_collection.site_views = [None]*len(self._positions)
+
+		for index, site in enumerate(self.site_views):
+			extra_properties_dictionary = site.get_extra_properties_dictionary() if site != None else None
+
+			if extra_properties_dictionary:
+				site_collection.get_site_view(index)._properties.update(copy.deepcopy(extra_properties_dictionary))
+
+		return site_collection
+
+	@staticmethod
+	def get_instance_from_arrays(positions, types_list, coordinate_mode):
+		"""
+		Returns a new SiteCollection holding a site at each row of positions (Nx3) with type types_list[i], without
+		making any Site objects.
+		"""
+
+		site_collection = SiteCollection()
+		site_collection.add_rows(positions, types_list, Site.get_coordinate_mode_string(coordinate_mode))
+
+		return site_collection
 
 	@staticmethod
 	def validate_constuctor_arguments(sites):
@@ -58,9 +172,13 @@ class SiteCollection(object):
 	def validate_sites(sites):
 		"""
 		sites must be either a list of instances of the Site class or a SiteCollection instance.
+
+		The sites in a SiteCollection instance were validated when they were added, so they are not checked again.
 		"""
 
-		if isinstance(sites, list) or isinstance(sites, SiteCollection):
+		if isinstance(sites, SiteCollection):
+			return
+		elif isinstance(sites, list):
 			for site in sites:
 				Site.validate_site(site)
 		else:
@@ -72,7 +190,7 @@ class SiteCollection(object):
 		Raises an exception if one or more sites have a coordinate mode different from the other sites.
 		"""
 
-		if len(sites) == 0:
+		if isinstance(sites, SiteCollection) or len(sites) == 0: #a site collection has a single coordinate mode
 			return
 
 		first_coordinate_mode = sites[0]['coordinate_mode']
@@ -87,18 +205,18 @@ class SiteCollection(object):
 
 	def __getitem__(self, key):
 		if isinstance(key, basestring): #access by type, like site_collection['Ba']
-			if key in self.sites:
-				return self.sites[key]
+			if key in self.species_list:
+				start_index, end_index = self.get_type_index_range(key)
+
+				return [self.get_site_view(index) for index in range(start_index, end_index)]
 			else:
 				raise Exception("Species type", key, "does not exist in SiteCollection instance.")
 
-		elif isinstance(key, int):
-			sites_list = self.get_sorted_list()
-
-			if key < 0 or key >= len(sites_list):
+		elif isinstance(key, (int, np.integer)):
+			if key < 0 or key >= len(self):
 				raise IndexError
 			else:
-				return sites_list[key]
+				return self.get_site_view(key)
 		else:
 			raise Exception("Site collection key must be an integer or string. Key given is", key)
 		
@@ -108,35 +226,182 @@ class SiteCollection(object):
 		Returns the total number of sites in the collection.
 		"""
 
-		return len(self.get_sorted_list())
+		return len(self._positions)
 
 	def keys(self):
 		"""
 		Returns list of all keys of self.sites (like ['Ba', 'Ti'])
 		"""
 
-		return self.sites.keys()
+		return list(self.species_list)
 
 	def __contains__(self, key):
 		if not isinstance(key, basestring):
 			raise Exception("SiteCollection instance cannot contain non-string key:", key)
 
-		return key in self.sites
+		return key in self.species_list
+
+	def __deepcopy__(self, memo):
+		site_collection = SiteCollection(self)
+		memo[id(self)] = site_collection
+
+		for index, site in enumerate(site_collection.site_views):
+			if site != None:
+				site._properties = copy.deepcopy(site._properties, memo)
+
+		return site_collection
+
+	def __getstate__(self):
+		state = dict(self.__dict__)
+		state['_positions'] = self._positions.copy() #a shared buffer must not stay shared between unpickled collections
+		del state['_positions_sharing_collections']
+
+		return state
+
+	def __setstate__(self, state):
+		"""
+		Pickles made before site collections were array based hold an ordered dictionary of type -> list of sites in 'sites'.
+		These are rebuilt into the array storage on load.
+		"""
+
+		if 'sites' in state:
+			self.__init__()
+
+			for site_list in state['sites'].values():
+				self.extend(site_list)
+		else:
+			if 'positions' in state: #pickled before positions were copy on write
+				state['_positions'] = state.pop('positions')
+
+			state.pop('_positions_share_count', None) #pickled when sharing was counted
+			self.__dict__.update(state)
+			self._positions_sharing_collections = weakref.WeakSet([self])
+
+
+	def get_site_view(self, index):
+		"""
+		Returns the Site instance that views row index, making it if it does not yet exist.
+		"""
+
+		site = self.site_views[index]
+
+		if site == None:
+			site = Site()
+			site.attach_to_site_collection(self, index)
+			self.site_views[index] = site
+
+		return site
+
+	def get_site_property(self, index, key):
+		if key == 'position':
+			return SitePositionView(self.get_site_view(index))
+		elif key == 'coordinate_mode':
+			return self.coordinate_mode
+		elif key == 'type':
+			return self.species_list[self.species_indices[index]]
+
+	def set_site_property(self, index, key, value):
+		if key == 'position':
+			self.positions[index] = [value[0], value[1], value[2]]
+		elif key == 'coordinate_mode':
+			if value != self.coordinate_mode:
+				raise Exception("All sites in a site collection share one coordinate mode. Convert the whole collection instead of setting the mode of one site.", value, self.coordinate_mode)
+		elif key == 'type':
+			if value != self.get_site_property(index, 'type'):
+				raise Exception("Cannot change the type of a site in a site collection. Remove the site and append a site of the new type instead.", value)
+
+	def get_type_index_range(self, type_string):
+		"""
+		Returns (start, end) such that rows start through end-1 are the sites of type type_string.
+		"""
+
+		species_index = self.species_list.index(type_string)
+
+		return (int(np.searchsorted(self.species_indices, species_index, side='left')), int(np.searchsorted(self.species_indices, species_index, side='right')))
 
 
 	def append(self, site):
 		"""
-		Appends a shallow copy of site to self.sites.
+		Appends site to the collection. A free site becomes the view onto its new row. A site that is already in a site
+		collection is left alone, and a new view is made (with a shallow copy of its other properties).
 		"""
 
-		Site.validate_site(site)
+		self.extend([site])
 
-		site_type = site['type']
+	def extend(self, sites):
+		"""
+		Appends each site in sites (see append) with a single update of the arrays.
+		"""
 
-		if site_type not in self.sites:
-			self.sites[site_type] = [site] #start a new list for this specie
-		else:
-			self.sites[site_type].append(site) #add to an existing list of these species
+		if len(sites) == 0:
+			return
+
+		new_site_views = []
+
+		for site in sites:
+			Site.validate_site(site)
+
+			if site.is_in_site_collection():
+				new_site = Site(site.get_extra_properties_dictionary())
+				new_site._properties.update(dict((key, site[key]) for key in Site.site_collection_keys))
+				new_site_views.append(new_site)
+			else:
+				new_site_views.append(site)
+
+		coordinate_mode = new_site_views[0]['coordinate_mode']
+		SiteCollection.validate_sites_all_have_same_coordinate_mode(new_site_views)
+
+		positions = [[site['position'][0], site['position'][1], site['position'][2]] for site in new_site_views]
+		types_list = [site['type'] for site in new_site_views]
+
+		self.add_rows(positions, types_list, coordinate_mode, new_site_views)
+
+	def add_rows(self, positions, types_list, coordinate_mode, new_site_views=None):
+		"""
+		Adds a row to the arrays for each position in positions (Nx3) of type types_list[i]. new_site_views, if given, is the list
+		of free sites to attach as views onto the new rows.
+
+		Rows are kept sorted by type (in type insertion order) with a stable sort, so within a type, sites stay in insertion order.
+		"""
+
+		positions = np.array(positions, dtype=np.float64).reshape(-1, 3)
+
+		if len(positions) != len(types_list):
+			raise Exception("Number of positions and number of types do not match.", len(positions), len(types_list))
+
+		if len(positions) == 0:
+			return
+
+		if len(self) == 0:
+			self.coordinate_mode = coordinate_mode
+		elif coordinate_mode != self.coordinate_mode:
+			raise Exception("Site coordinate modes are not all consistent.", coordinate_mode, self.coordinate_mode)
+
+		new_species_indices = []
+
+		for type_string in types_list:
+			if not isinstance(type_string, basestring):
+				raise Exception("Type must be of type string")
+
+			if type_string not in self.species_list:
+				self.species_list.append(type_string)
+
+			new_species_indices.append(self.species_list.index(type_string))
+
+		if new_site_views == None:
+			new_site_views = [None]*len(positions)
+
+		species_indices = np.concatenate([self.species_indices, np.array(new_species_indices, dtype=int)])
+		sorted_order = np.argsort(species_indices, kind='mergesort')
+		site_views = self.site_views + new_site_views
+
+		self.positions = np.concatenate([self._positions, positions])[sorted_order]
+		self.species_indices = species_indices[sorted_order]
+		self.site_views = [site_views[index] for index in sorted_order]
+
+		for index, site in enumerate(self.site_views):
+			if site != None:
+				site.attach_to_site_collection(self, index)
 
 
 	def remove(self, site):
@@ -144,13 +409,30 @@ class SiteCollection(object):
 
 		site_type = site['type']
 
-		if site_type not in self.sites:
+		if site_type not in self.species_list:
 			raise Exception("Site type not present in site collection:", str(site_type))
+		elif site._site_collection is not self:
+			raise Exception("Site is not in this site collection:", str(site))
 		else:
-			self.sites[site_type].remove(site)
+			index = site._index
+			species_index = self.species_indices[index]
+
+			site.detach_from_site_collection()
+
+			self.positions = np.delete(self._positions, index, axis=0)
+			self.species_indices = np.delete(self.species_indices, index)
+			del self.site_views[index]
+
+			if species_index not in self.species_indices: #this type no longer appears in the collection - remove it from the species list.
+				del self.species_list[species_index]
+				self.species_indices[self.species_indices > species_index] -= 1
 
-			if len(self.sites[site_type]) == 0: #this type no longer appears in the collection - remove the dictionary key for this type in sites.
-				del sites[site_type]
+			for view_index in range(index, len(self.site_views)):
+				if self.site_views[view_index] != None:
+					self.site_views[view_index]._index = view_index
+
+			if len(self) == 0:
+				self.coordinate_mode = None
 
 	def get_sorted_list(self):
 		"""
@@ -159,44 +441,74 @@ class SiteCollection(object):
 			The first type to appear in the list is the first type that was added, second is second type added, ...etc.
 		"""
 
-		sorted_list = []
-
-		for species_type, species_site_list in self.sites.items():
-			sorted_list += species_site_list
-
-		return sorted_list
+		return [self.get_site_view(index) for index in range(len(self))]
 
 
 	def get_species_list(self):
 		"""
 		Returns list of types like: ['Ba', 'Ti', 'O']
 		"""
-		return self.sites.keys()
+		return list(self.species_list)
 
 	def get_species_count_list(self):
 		"""
 		Returns list of counts of each type in the collection like [1, 1, 3]
 		"""
 
-		return [len(self.sites[species_type]) for species_type in self.sites]
+		return np.bincount(self.species_indices, minlength=len(self.species_list)).tolist()
+
+	def get_types_list(self):
+		"""
+		Returns the type of each site in sorted order, like ['Ba', 'Ti', 'O', 'O', 'O']
+		"""
+
+		return [self.species_list[species_index] for species_index in self.species_indices]
 
 	def get_coordinates_list(self):
 		"""
 		Returns a list of 3D vectors representing the coordinates of each site. This list is sorted by type and site insertion.
 		"""
 
-		return [site['position'] for site in self.get_sorted_list()]
+		return self._positions.tolist()
 
 	def get_coordinate_mode(self):
 
-		sites_list = self.get_sorted_list()
-
-		SiteCollection.validate_sites_all_have_same_coordinate_mode(self.get_sorted_list())
-
-		if len(sites_list) == 0:
+		if len(self) == 0:
 			raise Exception("There are no sites in this site collection. Cannot determine the coordinate mode")
 		else:
-			return sites_list[0]['coordinate_mode']
+			return self.coordinate_mode
+
+	def convert_to_coordinate_mode(self, coordinate_mode, lattice):
+		if coordinate_mode == 'Direct':
+			self.convert_to_direct_coordinates(lattice)
+		elif coordinate_mode == 'Cartesian':
+			self.convert_to_cartesian_coordinates(lattice)
+		else:
+			raise Exception("Given coordinate mode is not valid:", coordinate_mode)
+
+	def convert_to_cartesian_coordinates(self, lattice):
+		"""
+		Converts every position from direct to cartesian coordinates if the collection is in direct coordinates.
+		lattice can be a Lattice instance (its cached matrix is used) or a 3x3 2D array.
+		"""
+
+		if self.coordinate_mode == 'Direct':
+			self.positions = Lattice.get_instance(lattice).get_cartesian_coordinates(self._positions)
+
+		if len(self) > 0:
+			self.coordinate_mode = 'Cartesian'
+
+	def convert_to_direct_coordinates(self, lattice):
+		"""
+		Converts every position from cartesian to direct coordinates if the collection is in cartesian coordinates.
+		lattice can be a Lattice instance (its cached inverse matrix is used) or a 3x3 2D array.
+		"""
+
+		if self.coordinate_mode == 'Cartesian':
+			self.positions = Lattice.get_instance(lattice).get_direct_coordinates(self._positions)
+
+		if len(self) > 0:
+			self.coordinate_mode = 'Direct'
 
 
 	###################################################################################################################
@@ -211,15 +523,15 @@ class SiteCollection(object):
 
 		Vector.validate_3D_vector_representation(direct_displacement_vector)
 
-		if reverse:
-			for j in range(3):
-				direct_displacement_vector[j] = -direct_displacement_vector[j]
+		if len(self) > 0 and self.coordinate_mode != 'Direct':
+			raise Exception("Site not in direct coordinate mode: cannot shift all sites in this SiteCollection.")
 
-		for site in self:
-			if not (site['coordinate_mode'] == 'Direct'):
-				raise Exception("Site not in direct coordinate mode: cannot shift all sites in this SiteCollection.")
+		shift_vector = np.array([direct_displacement_vector[0], direct_displacement_vector[1], direct_displacement_vector[2]], dtype=np.float64)
 
-			site.displace(direct_displacement_vector)
+		if reverse:
+			shift_vector = -shift_vector
+
+		self.positions += shift_vector
 
 	def shift_direct_coordinates_by_type(self, shift_vector_dictionary, reverse=False):
 		"""
@@ -229,18 +541,17 @@ class SiteCollection(object):
 		if len(self.keys()) != len(shift_vector_dictionary.keys()):
 			raise Exception("Shift vector dictionary is not commensurate with sites")
 
+		if self.coordinate_mode != 'Direct':
+			raise Exception("Site not in direct coordinate mode - cannot shift")
+
 		for type_string in shift_vector_dictionary.keys():
-			for i, site in enumerate(self[type_string]):
-				site = self[type_string][i]
+			start_index, end_index = self.get_type_index_range(type_string)
+			shift_vector = np.array(shift_vector_dictionary[type_string][0:3], dtype=np.float64)
 
-				if not (site['coordinate_mode'] == 'Direct'):
-					raise Exception("Site not in direct coordinate mode - cannot shift")
-				else:
-					for j in range(3):
-						if reverse:
-							site['position'][j] += -shift_vector_dictionary[type_string][j]
-						else:
-							site['position'][j] += shift_vector_dictionary[type_string][j]
+			if reverse:
+				self.positions[start_index:end_index] -= shift_vector
+			else:
+				self.positions[start_index:end_index] += shift_vector
 
 
 	@staticmethod
@@ -256,4 +567,4 @@ class SiteCollection(object):
 				if len(site_collection_1[key]) != len(site_collection_2[key]):
 					return False
 
-		return True
\ No newline at end of file
+		return True
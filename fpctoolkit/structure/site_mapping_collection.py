@@ -1,8 +1,13 @@
 #from fpctoolkit.structure.site_mapping_collection import SiteMappingCollection
 
-import copy
+import numpy as np
 from collections import OrderedDict
-from munkres import Munkres
+
+try:
+	from scipy.optimize import linear_sum_assignment
+except ImportError:
+	linear_sum_assignment = None
+	from munkres import Munkres
 
 from fpctoolkit.structure.site_collection import SiteCollection
 from fpctoolkit.structure.site_mapping import SiteMapping
@@ -27,29 +32,63 @@ class SiteMappingCollection(object):
 
 
 	def get_site_mapping_dictionary(self):
-		
-		munk = Munkres()
+		"""
+		For each species, solves the assignment problem on the matrix of minimum image distances between initial and final sites of that species,
+		then builds SiteMapping instances for the matched pairs only.
+		"""
 
 		site_mapping_lists_dictionary = OrderedDict() #will look like {'Ba':[site_mapping_1, site_mapping_2, ...], 'Ti':...}
 
 		for type_string in self.site_collection_initial.keys():
-			# print type_string
-			site_mapping_matrix = self.get_site_mapping_matrix(type_string)
+			distance_matrix, displacement_vector_matrix = self.get_distance_and_displacement_vector_matrices(type_string)
 
-			distance_matrix = [[site_mapping.distance for site_mapping in site_mapping_row] for site_mapping_row in site_mapping_matrix]
+			initial_indices, final_indices = SiteMappingCollection.get_optimal_assignment(distance_matrix)
 
-			# print distance_matrix
+			sites_list_initial = self.site_collection_initial[type_string]
+			sites_list_final = self.site_collection_final[type_string]
 
-			mapping_indices = munk.compute(distance_matrix) #looks like [(0, 4), (1, 2), (2, 7), ...] where first in each tuple is row index in site_mapping_matrix
-			# print mapping_indices
+			site_mapping_list = []
 
-			site_mapping_list = [site_mapping_matrix[i][j] for i, j in mapping_indices]
+			for i, j in zip(initial_indices, final_indices):
+				site_mapping = SiteMapping(sites_list_initial[i], sites_list_final[j], initial_index=i, final_index=j)
+				site_mapping.distance = distance_matrix[i][j]
+				site_mapping.displacement_vector = displacement_vector_matrix[i][j].tolist()
+
+				site_mapping_list.append(site_mapping)
 
 			site_mapping_lists_dictionary[type_string] = site_mapping_list
 
-		# print site_mapping_lists_dictionary
 		return site_mapping_lists_dictionary
 
+	@staticmethod
+	def get_optimal_assignment(distance_matrix):
+		"""
+		Returns (row_indices, column_indices) pairing each row of the square distance_matrix with a column so the summed distance is minimal.
+		Rows come back in increasing order. Uses scipy's linear_sum_assignment, or the munkres package if scipy is not available.
+		"""
+
+		if linear_sum_assignment != None:
+			return linear_sum_assignment(np.asarray(distance_matrix))
+
+		mapping_indices = Munkres().compute(np.asarray(distance_matrix).tolist()) #looks like [(0, 4), (1, 2), (2, 7), ...]
+
+		return (np.array([i for i, j in mapping_indices], dtype=int), np.array([j for i, j in mapping_indices], dtype=int))
+
+	def get_distance_and_displacement_vector_matrices(self, type_string):
+		"""
+		Returns (distance_matrix, displacement_vector_matrix) for species type_string, where distance_matrix[i][j] (N, N) is the minimum image distance
+		from initial site i to final site j of that species and displacement_vector_matrix[i][j] (N, N, 3) is the direct coordinates vector between them.
+		"""
+
+		if self.site_collection_initial.get_coordinate_mode() != 'Direct' or self.site_collection_final.get_coordinate_mode() != 'Direct':
+			raise Exception("Sites must be in direct coordinate mode")
+
+		initial_start_index, initial_end_index = self.site_collection_initial.get_type_index_range(type_string)
+		final_start_index, final_end_index = self.site_collection_final.get_type_index_range(type_string)
+
+		return Vector.get_all_pairs_minimum_image_distances_and_vectors(self.site_collection_initial.get_read_only_positions()[initial_start_index:initial_end_index],
+			self.site_collection_final.get_read_only_positions()[final_start_index:final_end_index], self.lattice)
+
 	def get_site_mapping_matrix(self, type_string):
 		"""
 		Returns an NxN matrix (where N is number of sites in site_colleciton initial and final) of site_mapping objects for a given species type
@@ -60,11 +99,14 @@ class SiteMappingCollection(object):
 		sites_list_initial = self.site_collection_initial[type_string]
 		sites_list_final = self.site_collection_final[type_string]
 
-		for initial_site in sites_list_initial:
+		distance_matrix, displacement_vector_matrix = self.get_distance_and_displacement_vector_matrices(type_string)
+
+		for i, initial_site in enumerate(sites_list_initial):
 			mapping_row = []
-			for final_site in sites_list_final:
-				site_mapping = SiteMapping(initial_site, final_site, self.lattice)
-				# print site_mapping
+			for j, final_site in enumerate(sites_list_final):
+				site_mapping = SiteMapping(initial_site, final_site, initial_index=i, final_index=j)
+				site_mapping.distance = distance_matrix[i][j]
+				site_mapping.displacement_vector = displacement_vector_matrix[i][j].tolist()
 				mapping_row.append(site_mapping)
 
 			mapping_matrix.append(mapping_row)
@@ -113,6 +155,27 @@ class SiteMappingCollection(object):
 			for site_mapping in self.mapping_dictionary[type_string]:
 				site_mapping.calculate_distance_and_displacement_vector(self.lattice)
 
+	def get_displacement_field(self):
+		"""
+		Returns the (N, 3) array of direct coordinates minimum image vectors from each site of site_collection_initial (in its row order) to the final
+		site it is mapped to, computed from the current positions in one call.
+		"""
+
+		if self.site_collection_initial.get_coordinate_mode() != 'Direct' or self.site_collection_final.get_coordinate_mode() != 'Direct':
+			raise Exception("Sites must be in direct coordinate mode")
+
+		final_row_indices = np.zeros(len(self.site_collection_initial), dtype=int)
+
+		for type_string in self.site_collection_initial.keys():
+			initial_start_index = self.site_collection_initial.get_type_index_range(type_string)[0]
+			final_start_index = self.site_collection_final.get_type_index_range(type_string)[0]
+
+			for site_mapping in self.mapping_dictionary[type_string]:
+				final_row_indices[initial_start_index + site_mapping.initial_index] = final_start_index + site_mapping.final_index
+
+		return Vector.get_paired_minimum_image_distances_and_vectors(self.site_collection_initial.get_read_only_positions(),
+			self.site_collection_final.get_read_only_positions()[final_row_indices], self.lattice)[1]
+
 	def get_interpolated_site_collection(self, sites_to_be_interpolated, interpolation_function):
 		"""
 		This takes sites_to_be_interpolated and interpolates them between self.site_collection_initial and self.site_collection_final
@@ -122,36 +185,43 @@ class SiteMappingCollection(object):
 		if not SiteCollection.are_commensurate(self.site_collection_initial, sites_to_be_interpolated):
 			raise Exception("Site collections are not commensurate: they have different types or counts of each type. Cannot interpolate")
 
-		interpolated_sites = copy.deepcopy(sites_to_be_interpolated)
-
-		self.recalculate_distances_and_displacements()
+		interpolated_sites = sites_to_be_interpolated.copy()
 
-		for type_string in self.site_collection_initial.keys():
-			for i, reference_site in enumerate(self.site_collection_initial[type_string]):
-				interpolation_value = interpolation_function(reference_site['position'][0], reference_site['position'][1], reference_site['position'][2])
-				interpolated_displacement_vector = interpolation_value*Vector(self.mapping_dictionary[type_string][i].displacement_vector)
+		reference_positions = self.site_collection_initial.get_read_only_positions()
+		interpolation_values = np.array([interpolation_function(position[0], position[1], position[2]) for position in reference_positions])
 
-				interpolated_sites[type_string][i].displace(interpolated_displacement_vector)
+		interpolated_sites.positions += interpolation_values[:, np.newaxis]*self.get_displacement_field()
 
 		return interpolated_sites
 
+	def get_interpolated_structures_generator(self, interpolation_values, chunk_size=100):
+		"""
+		Yields one structure per value t in interpolation_values, with every initial site moved the fraction t of the way along its mapped displacement
+		(t=0 gives the initial sites, t=1 the final sites up to periodic images). Uses the lattice of this collection.
 
+		The displacement field is computed once. Positions for chunk_size images at a time are made with one broadcast, and structures are only
+		built as they are asked for, so long paths can be streamed.
+		"""
 
+		interpolation_values = np.asarray(interpolation_values, dtype=np.float64).ravel()
 
-	def get_interpolated_structure_list(self, interpolation_increment=0.2):
+		displacement_field = self.get_displacement_field()
+		reference_positions = self.site_collection_initial.get_read_only_positions()
 
-		structure_list = []
+		template_structure = Structure(lattice=self.lattice, sites=self.site_collection_initial)
 
-		for i in range(0,1 + int(1/interpolation_increment)):
+		for start in range(0, len(interpolation_values), chunk_size):
+			positions = reference_positions[np.newaxis, :, :] + interpolation_values[start:start+chunk_size, np.newaxis, np.newaxis]*displacement_field[np.newaxis, :, :]
 
-			def interpolation_function(da, db, dc):
-				return interpolation_increment*(i+0.01)
+			for image_positions in positions:
+				interpolated_structure = template_structure.copy()
+				interpolated_structure.sites.positions = image_positions
 
-			interpolated_sites = self.get_interpolated_site_collection(self.site_collection_initial, interpolation_function)
+				yield interpolated_structure
 
-			structure_list.append(Structure(lattice=self.lattice, sites=interpolated_sites))
+	def get_interpolated_structure_list(self, interpolation_increment=0.2):
 
-		return structure_list
+		return list(self.get_interpolated_structures_generator([interpolation_increment*(i+0.01) for i in range(0, 1 + int(1/interpolation_increment))]))
 
 
 
@@ -0,0 +1,188 @@
+#from fpctoolkit.structure.spacegroup_analyzer import SpacegroupAnalyzer
+
+import os
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+try:
+	import spglib
+except ImportError:
+	from phonopy.structure import spglib #phonopy ships its own copy of spglib
+
+
+
+class SpacegroupAnalyzer(object):
+	"""
+	Finds the space group of structures by calling spglib directly, without building a Phonopy instance.
+
+	Results are memoized in an in-memory LRU cache keyed on a fingerprint of the structure (rounded lattice, rounded and wrapped direct positions,
+	and species) together with symprec, so asking again for the same structure - at the same or a different symprec - only repeats the spglib
+	call for symprecs not seen before.
+
+	If a disk cache path is set with set_disk_cache_path, results are also appended to (and read back from) a plain text file there, so they
+	survive between processes. Each line of that file looks like:
+
+		<fingerprint> <symprec> Pm-3m (221)
+
+	Each line is appended with a single write, so processes sharing the file do not interleave within lines. Lines that are still cut short
+	or otherwise do not parse are skipped on load.
+
+	Usage:
+		spacegroup_strings = SpacegroupAnalyzer.get_spacegroup_strings(structure, symprec_list=[0.1, 0.01, 0.001]) #['Pm-3m (221)', ...]
+	"""
+
+	maximum_cache_size = 20000
+	fingerprint_decimals = 6
+
+	cache = OrderedDict() #maps (fingerprint, symprec) to spacegroup string, least recently used first
+	disk_cache_path = None
+	disk_cache_loaded = False
+
+
+	@staticmethod
+	def get_spacegroup_string(structure, symprec=0.001):
+		"""
+		Returns string of spacegroup information like Imma (74).
+
+		symprec controls the symmetry tolerance for atomic positions (in Angstroms)
+		"""
+
+		return SpacegroupAnalyzer.get_spacegroup_strings(structure, [symprec])[0]
+
+	@staticmethod
+	def get_spacegroup_strings(structure, symprec_list):
+		"""
+		Returns a list of spacegroup strings (like Imma (74)) for structure, one for each symprec in symprec_list. The structure is converted to
+		spglib's representation once, and spglib is only called for symprecs not already in the cache.
+		"""
+
+		SpacegroupAnalyzer.load_disk_cache()
+
+		lattice_matrix, direct_positions, atomic_numbers = SpacegroupAnalyzer.get_spglib_cell(structure)
+		fingerprint = SpacegroupAnalyzer.get_fingerprint(lattice_matrix, direct_positions, structure.sites.get_species_list(), atomic_numbers)
+
+		spacegroup_strings = []
+		new_entries_list = []
+
+		for symprec in symprec_list:
+			key = (fingerprint, float(symprec))
+
+			if key in SpacegroupAnalyzer.cache:
+				spacegroup_string = SpacegroupAnalyzer.cache.pop(key)
+			else:
+				dataset = spglib.get_symmetry_dataset((lattice_matrix, direct_positions, atomic_numbers), symprec=symprec)
+
+				if dataset == None:
+					raise Exception("Spglib could not find the symmetry of structure at symprec", symprec, spglib.get_error_message())
+
+				spacegroup_string = str("%s (%d)" % (dataset['international'], dataset['number']))
+				new_entries_list.append((key, spacegroup_string))
+
+			SpacegroupAnalyzer.store_in_cache(key, spacegroup_string)
+			spacegroup_strings.append(spacegroup_string)
+
+		SpacegroupAnalyzer.append_to_disk_cache(new_entries_list)
+
+		return spacegroup_strings
+
+	@staticmethod
+	def get_spglib_cell(structure):
+		"""
+		Returns (lattice_matrix, direct_positions, atomic_numbers) arrays for structure. Atomic numbers are just species indices plus one - spglib
+		only needs to tell the species apart.
+		"""
+
+		lattice_matrix = structure.lattice.to_np_array()
+
+		direct_positions = np.array(structure.sites.get_positions_in_coordinate_mode('Direct', structure.lattice))
+
+		return (lattice_matrix, direct_positions, structure.sites.species_indices + 1)
+
+	@staticmethod
+	def get_fingerprint(lattice_matrix, direct_positions, species_list, atomic_numbers):
+		"""
+		Returns a hex digest identifying the structure. Positions are wrapped into [0, 1) and both positions and lattice are rounded to
+		fingerprint_decimals places, so structures differing only by periodic images or floating point noise share a fingerprint.
+		"""
+
+		decimals = SpacegroupAnalyzer.fingerprint_decimals
+
+		rounded_positions = np.round(direct_positions - np.floor(direct_positions), decimals)
+		rounded_positions -= np.floor(rounded_positions) #values that rounded up to 1.0 become 0.0
+		rounded_positions += 0.0 #turns -0.0 into 0.0
+
+		rounded_lattice = np.round(lattice_matrix, decimals) + 0.0
+
+		hasher = hashlib.sha1()
+		hasher.update(" ".join(species_list))
+		hasher.update(np.ascontiguousarray(atomic_numbers, dtype=np.int64).tostring())
+		hasher.update(np.ascontiguousarray(rounded_lattice, dtype=np.float64).tostring())
+		hasher.update(np.ascontiguousarray(rounded_positions, dtype=np.float64).tostring())
+
+		return hasher.hexdigest()
+
+	@staticmethod
+	def store_in_cache(key, spacegroup_string):
+		"""
+		Puts key at the most recently used end of the cache, evicting the least recently used entry if the cache is full.
+		"""
+
+		SpacegroupAnalyzer.cache[key] = spacegroup_string
+
+		while len(SpacegroupAnalyzer.cache) > SpacegroupAnalyzer.maximum_cache_size:
+			SpacegroupAnalyzer.cache.popitem(last=False)
+
+	@staticmethod
+	def clear_cache():
+		SpacegroupAnalyzer.cache.clear()
+		SpacegroupAnalyzer.disk_cache_loaded = False
+
+
+	@staticmethod
+	def set_disk_cache_path(disk_cache_path):
+		"""
+		Sets the text file results are persisted to (None turns the disk cache off). Entries already in the file are read on the next lookup.
+		"""
+
+		SpacegroupAnalyzer.disk_cache_path = disk_cache_path
+		SpacegroupAnalyzer.disk_cache_loaded = False
+
+	@staticmethod
+	def load_disk_cache():
+		if SpacegroupAnalyzer.disk_cache_path == None or SpacegroupAnalyzer.disk_cache_loaded:
+			return
+
+		SpacegroupAnalyzer.disk_cache_loaded = True
+
+		try:
+			disk_cache_file = open(SpacegroupAnalyzer.disk_cache_path, 'r')
+		except IOError:
+			return
+
+		with disk_cache_file:
+			for line in disk_cache_file:
+				line_components = line.strip().split(' ', 2)
+
+				if not line.endswith('\n') or len(line_components) != 3: #an entry still being written
+					continue
+
+				try:
+					symprec = float(line_components[1])
+				except ValueError:
+					continue
+
+				SpacegroupAnalyzer.store_in_cache((line_components[0], symprec), line_components[2])
+
+	@staticmethod
+	def append_to_disk_cache(entries_list):
+		if SpacegroupAnalyzer.disk_cache_path == None or not entries_list:
+			return
+
+		disk_cache_file_descriptor = os.open(SpacegroupAnalyzer.disk_cache_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0644)
+
+		try:
+			for (fingerprint, symprec), spacegroup_string in entries_list:
+				os.write(disk_cache_file_descriptor, fingerprint + ' ' + repr(symprec) + ' ' + spacegroup_string + '\n') #unbuffered, so the line is never split
+		finally:
+			os.close(disk_cache_file_descriptor)
@@ -4,8 +4,7 @@
 import numpy as np
 import copy
 import random
-from phonopy import Phonopy
-from phonopy.interface.vasp import read_vasp
+from phonopy.structure.atoms import PhonopyAtoms
 import math
 
 from fpctoolkit.io.file import File
@@ -13,6 +12,7 @@ from fpctoolkit.io.vasp.poscar import Poscar
 from fpctoolkit.structure.site import Site
 from fpctoolkit.structure.lattice import Lattice
 from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.spacegroup_analyzer import SpacegroupAnalyzer
 from fpctoolkit.util.math.vector import Vector
 from fpctoolkit.util.random_selector import RandomSelector
 from fpctoolkit.util.path import Path
@@ -44,6 +44,19 @@ class Structure(object):
 			self.sites = SiteCollection(sites)
 
 
+	def copy(self):
+		"""
+		Returns a copy of this structure that is much cheaper than copy.deepcopy. The lattice is copied (sharing its cached matrices) and the
+		sites are copied with a copy on write position array (see SiteCollection.copy).
+		"""
+
+		structure_copy = Structure.__new__(Structure)
+
+		structure_copy.lattice = self.lattice.copy()
+		structure_copy.sites = self.sites.copy()
+
+		return structure_copy
+
 	@staticmethod
 	def validate_constructor_arguments(file_path, lattice, sites):
 
@@ -84,33 +97,21 @@ class Structure(object):
 
 		poscar = Poscar(file_path)
 		self.lattice = Lattice(poscar.lattice)
-		self.sites = SiteCollection()
 
-		poscar_coordinate_mode = poscar.coordinate_mode
-		poscar_coordinates_list = poscar.coordinates
-
-		species_index = 0
+		types_list = []
 		for i, specie in enumerate(poscar.species_list):
-			for j in range(poscar.species_count_list[i]):
-				new_site = Site()
-				new_site['coordinate_mode'] = poscar_coordinate_mode
-				new_site['position'] = poscar_coordinates_list[species_index]
-				new_site['type'] = specie
-
-				self.sites.append(new_site)
+			types_list += [specie]*poscar.species_count_list[i]
 
-				species_index += 1
+		self.sites = SiteCollection.get_instance_from_arrays(poscar.coordinates, types_list, poscar.coordinate_mode)
 
 
 	def to_poscar_file_path(self, file_path):
 		lattice = self.lattice.to_array()
 		species_list = self.sites.get_species_list()
 		species_count_list = self.sites.get_species_count_list()
-		coordinate_mode = self.sites.get_sorted_list()[0]['coordinate_mode']
+		coordinate_mode = self.sites.get_coordinate_mode()
 		coordinates = self.sites.get_coordinates_list()
 
-		SiteCollection.validate_sites_all_have_same_coordinate_mode(self.sites)
-
 		poscar = Poscar(None, lattice, species_list, species_count_list, coordinate_mode, coordinates)
 		poscar.write_to_path(file_path)
 
@@ -159,8 +160,7 @@ class Structure(object):
 		its position and coordinate mode to be in cartesian coordinate system
 		"""
 
-		for site in self.sites:
-			site.convert_to_cartesian_coordinates(self.lattice)
+		self.sites.convert_to_cartesian_coordinates(self.lattice)
 
 	def convert_sites_to_direct_coordinates(self):
 		"""
@@ -168,8 +168,7 @@ class Structure(object):
 		its position and coordinate mode to be in direct coordinate system
 		"""
 
-		for site in self.sites:
-			site.convert_to_direct_coordinates(self.lattice)
+		self.sites.convert_to_direct_coordinates(self.lattice)
 
 
 	def randomly_displace_sites(self, max_displacement_magnitude=None, keep_first_site_at_origin=False, max_displacement_magnitude_array=None):
@@ -177,21 +176,16 @@ class Structure(object):
 		max_displacement_magnitude is the maximum displacement in a single cartesian direction (in angstroms)
 		"""
 
-		disp_array = []
-
 		if max_displacement_magnitude == None:
-			disp_array = copy.deepcopy(max_displacement_magnitude_array)
+			disp_array = np.array(max_displacement_magnitude_array, dtype=np.float64)
 		else:
-			disp_array = [max_displacement_magnitude]*len(self.sites)
+			disp_array = np.array([max_displacement_magnitude]*len(self.sites), dtype=np.float64)
 
 		original_coordinate_mode = self.sites.get_coordinate_mode()
 
 		self.convert_sites_to_cartesian_coordinates()
 
-		for j, site in enumerate(self.sites):
-			max_displacement_magnitude = disp_array[j]
-			for i in range(3):
-				site['position'][i] += random.uniform(-1.0*max_displacement_magnitude, max_displacement_magnitude)
+		self.sites.positions += np.random.uniform(-1.0, 1.0, size=(len(self.sites), 3))*disp_array.reshape(-1, 1)
 
 		if keep_first_site_at_origin:
 			self.shift_sites_so_first_atom_is_at_origin()
@@ -205,16 +199,10 @@ class Structure(object):
 
 		self.convert_sites_to_direct_coordinates()
 
-		origin = copy.deepcopy(self.sites[0]['position'])
-
-		for site in self.sites:
-			for i in range(3):
-				site['position'][i] -= origin[i]
+		positions = self.sites.positions
 
-				while site['position'][i] > 1.0:
-					site['position'][i] -= 1.0
-				while site['position'][i] < 0.0:
-					site['position'][i] += 1.0
+		positions -= positions[0].copy()
+		positions -= np.floor(positions) #brings every component into [0.0, 1.0)
 
 		self.convert_sites_to_coordinate_mode(original_coordinate_mode)
 
@@ -226,17 +214,16 @@ class Structure(object):
 		if self.sites.get_coordinate_mode() != other_structure.sites.get_coordinate_mode():
 			raise Exception("Coordinate modes are different - cannot compare the two structures.")
 
-		for i, lattice_vector in self.lattice.to_array():
-			for j in range(3):
-				if abs(lattice_vector[j]-other_structure.lattice[i][j]) > 0.00001:
-					return False
+		if np.any(np.abs(self.lattice.to_np_array() - other_structure.lattice.to_np_array()) > 0.00001):
+			return False
 
-		for i, site in enumerate(self.sites):
-			for j in range(3):
-				if abs(site['position'][j]-other_structure.sites[i]['position'][j]) > 0.00001:
-					return False
+		positions = self.sites.get_read_only_positions()
+		other_positions = other_structure.sites.get_read_only_positions()
 
-		return True
+		if positions.shape != other_positions.shape:
+			return False
+
+		return not np.any(np.abs(positions - other_positions) > 0.00001)
 
 	def get_spacegroup_string(self, symprec=0.001):
 		"""
@@ -245,33 +232,39 @@ class Structure(object):
 		symprec controls the symmetry tolerance for atomic positions (in Angstroms)
 		"""
 
-		unit_cell_phonopy_structure = self.convert_structure_to_phonopy_atoms()
-		supercell_dimensions_matrix = np.diag([1, 1, 1])
-
-		phonon = Phonopy(unitcell=unit_cell_phonopy_structure, supercell_matrix=supercell_dimensions_matrix, symprec=symprec)
+		return SpacegroupAnalyzer.get_spacegroup_string(self, symprec)
 
-		symmetry = phonon.get_symmetry()
+	def get_spacegroup_strings(self, symprec_list):
+		"""
+		Returns a list of spacegroup strings like ['Imma (74)', 'Imm2 (44)'], one for each symprec in symprec_list.
+		"""
 
-		return str(symmetry.get_international_table())
+		return SpacegroupAnalyzer.get_spacegroup_strings(self, symprec_list)
 
 	def convert_structure_to_phonopy_atoms(self):
 		"""
-		Returns a PhonopyAtoms class (phonopy's representation of selfs)
+		Returns a PhonopyAtoms class (phonopy's representation of structures) built directly from the lattice, positions, and types of self.
 		"""
 
-		temporary_write_path = Path.get_temporary_path()
-
 		Structure.validate(self)
 
-		Path.validate_does_not_exist(temporary_write_path)
-		Path.validate_writeable(temporary_write_path)
+		direct_positions = self.sites.get_positions_in_coordinate_mode('Direct', self.lattice)
+
+		return PhonopyAtoms(symbols=self.sites.get_types_list(), cell=self.lattice.to_np_array(), scaled_positions=direct_positions)
+
+	@staticmethod
+	def get_instance_from_phonopy_atoms(phonopy_atoms):
+		"""
+		Returns a Structure instance (in direct coordinates) built directly from phonopy_atoms, a PhonopyAtoms instance. Sites are grouped by type
+		in order of first appearance, as they would be in a poscar written by phonopy.
+		"""
 
-		self.to_poscar_file_path(temporary_write_path)
-		phonopy_structure = read_vasp(temporary_write_path)
+		structure = Structure(lattice=phonopy_atoms.get_cell().tolist(), sites=SiteCollection.get_instance_from_arrays(phonopy_atoms.get_scaled_positions(),
+			phonopy_atoms.get_chemical_symbols(), 'Direct'))
 
-		Path.remove(temporary_write_path)
+		Structure.validate(structure)
 
-		return phonopy_structure
+		return structure
 
 
 	def get_volume(self):
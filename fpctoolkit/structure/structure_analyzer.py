@@ -1,9 +1,11 @@
 #from fpctoolkit.structure.structure_analyzer import StructureAnalyzer
 
 import copy
+import numpy as np
 
 from fpctoolkit.structure.structure import Structure
 from fpctoolkit.util.math.vector import Vector
+from fpctoolkit.structure.periodic_cell_list import PeriodicCellList
 
 
 class StructureAnalyzer(object):
@@ -16,7 +18,7 @@ class StructureAnalyzer(object):
 		"""
 		Returns True if any two sites in this structure are within minimum_atomic_distance (angstroms) of each other.
 		Min distances is different for each type pair, as specified by the input dictionary.
-		nearest_neighbors_max controls how many nearest neighbor cell images to search.	
+		nearest_neighbors_max is no longer used - the cell images searched are found from the lattice.
 
 		minimum_atomic_distances_nested_dictionary_by_type is in angstroms and looks like:
 		{
@@ -28,25 +30,68 @@ class StructureAnalyzer(object):
 
 		Structure.validate(structure)
 
-		sites_list = structure.sites.get_sorted_list()
+		if len(structure.sites) < 2:
+			return False
 
-		for site_1_index in range(len(sites_list)):
-			for site_2_index in range(site_1_index+1, len(sites_list)):
-				site_1 = sites_list[site_1_index]
-				site_2 = sites_list[site_2_index]
+		species_pair_minimum_distances = StructureAnalyzer.get_species_pair_minimum_distance_array(structure, minimum_atomic_distances_nested_dictionary_by_type)
 
-				minimum_atomic_distance = minimum_atomic_distances_nested_dictionary_by_type[site_1['type']][site_2['type']]
+		if np.max(species_pair_minimum_distances) <= 0.0: #no distance can be below a minimum of zero - and a cell list needs a positive cutoff
+			return False
 
-				if StructureAnalyzer.site_pair_is_too_close(structure, site_1, site_2, minimum_atomic_distance, nearest_neighbors_max):
-					return True
+		cell_list = PeriodicCellList(structure, cutoff=np.max(species_pair_minimum_distances))
+		site_pairs = cell_list.get_pairs_within_cutoff(species_pair_cutoffs=species_pair_minimum_distances)[0]
 
-		return False
+		return len(site_pairs) > 0
+
+	@staticmethod
+	def get_direct_positions(structure):
+		"""
+		Returns a (read only) (N, 3) array of the site positions of structure in direct coordinates without changing the structure.
+		"""
+
+		return structure.sites.get_positions_in_coordinate_mode('Direct', structure.lattice)
+
+	@staticmethod
+	def get_minimum_image_distance_matrix(structure, site_index_list=None):
+		"""
+		Returns the (N, N) matrix of shortest periodic distances (angstroms) between all sites of structure, or the (len(site_index_list), N)
+		block of rows for the sites in site_index_list.
+		"""
+
+		direct_positions = StructureAnalyzer.get_direct_positions(structure)
+		row_positions = direct_positions if site_index_list == None else direct_positions[site_index_list]
+
+		return Vector.get_all_pairs_minimum_image_distances_and_vectors(row_positions, direct_positions, structure.lattice)[0]
+
+	@staticmethod
+	def get_species_pair_minimum_distance_array(structure, minimum_atomic_distances_nested_dictionary_by_type):
+		"""
+		Returns the (S, S) array of minimum allowed distances for each pair of types in structure, indexed like structure.sites.species_indices.
+		"""
+
+		species_list = structure.sites.species_list
+
+		return np.array([[minimum_atomic_distances_nested_dictionary_by_type[species_1][species_2] for species_2 in species_list] for species_1 in species_list], dtype=np.float64)
+
+	@staticmethod
+	def get_minimum_atomic_distance_matrix(structure, minimum_atomic_distances_nested_dictionary_by_type, site_index_list=None):
+		"""
+		Returns the (N, N) matrix of minimum allowed distances between all sites of structure, looked up from the nested type dictionary, or the
+		(len(site_index_list), N) block of rows for the sites in site_index_list.
+		"""
+
+		species_indices = structure.sites.species_indices
+		species_pair_distances = StructureAnalyzer.get_species_pair_minimum_distance_array(structure, minimum_atomic_distances_nested_dictionary_by_type)
+
+		row_species_indices = species_indices if site_index_list == None else species_indices[site_index_list]
+
+		return species_pair_distances[row_species_indices[:, np.newaxis], species_indices[np.newaxis, :]]
 
 	@staticmethod
 	def site_pair_is_too_close(structure, site_1, site_2, minimum_atomic_distance, nearest_neighbors_max=3):
 		"""
 		Returns true if site_1 position is within minimum_atomic_distance of site_2 position under periodic boundary conditions.
-		nearest_neighbors_max controls how many nearest neighbor cell images to search. Higher means higher accuracy in heavily sheared structures
+		nearest_neighbors_max is no longer used - the cell images searched are found from the lattice.
 		"""
 
 		site_1.convert_to_direct_coordinates(structure.lattice)
@@ -57,11 +102,14 @@ class StructureAnalyzer(object):
 		return (distance < minimum_atomic_distance)
 
 	@staticmethod
-	def get_indices_of_site_pairs_that_are_too_close_to_sites_list(structure, site_index_list, minimum_atomic_distances_nested_dictionary_by_type, nearest_neighbors_max=3):
+	def get_indices_of_site_pairs_that_are_too_close_to_sites_list(structure, site_index_list, minimum_atomic_distances_nested_dictionary_by_type, nearest_neighbors_max=3, cell_list=None):
 		"""
 		Returns list of site pair indices for sites that are within minimum_atomic_distance (angstroms) of each other for any site in sites_list.
 		Min distances is different for each type pair, as specified by the input dictionary.
-		nearest_neighbors_max controls how many nearest neighbor cell images to search.	
+		nearest_neighbors_max is no longer used - the cell images searched are found from the lattice.
+
+		cell_list can be a PeriodicCellList of structure (with cutoff at least the largest minimum distance) kept between calls. If only some
+		sites moved since the last call, update those sites in the cell list first - then only they are re-binned.
 
 		minimum_atomic_distances_nested_dictionary_by_type is in angstroms and looks like:
 		{
@@ -71,30 +119,28 @@ class StructureAnalyzer(object):
 		}
 		"""
 
-		site_pairs_list = []
+		if len(site_index_list) == 0 or len(structure.sites) < 2:
+			return []
 
-		pair_hash = {}
+		species_pair_minimum_distances = StructureAnalyzer.get_species_pair_minimum_distance_array(structure, minimum_atomic_distances_nested_dictionary_by_type)
 
-		all_sites_list = structure.sites.get_sorted_list()
+		if np.max(species_pair_minimum_distances) <= 0.0:
+			return []
 
-		for site_1_index in site_index_list:
-			for site_2_index in range(len(all_sites_list)):
-				hash_key = str(site_1_index)+"_"+str(site_2_index)
-				hash_key_mirror = str(site_2_index)+"_"+str(site_1_index)
+		if cell_list == None:
+			cell_list = PeriodicCellList(structure, cutoff=np.max(species_pair_minimum_distances))
 
-				site_1 = all_sites_list[site_1_index]
-				site_2 = all_sites_list[site_2_index]
+		site_pairs = cell_list.get_pairs_within_cutoff(site_index_list, species_pair_cutoffs=species_pair_minimum_distances)[0]
 
-				if pair_hash.has_key(hash_key) or site_1_index == site_2_index:
-					continue
-
-				pair_hash[hash_key] = True
-				pair_hash[hash_key_mirror] = True
+		site_pairs_list = []
+		found_pairs_set = set()
 
-				minimum_atomic_distance = minimum_atomic_distances_nested_dictionary_by_type[site_1['type']][site_2['type']]
+		for site_1_index, site_2_index in site_pairs.tolist():
+			if (site_1_index, site_2_index) not in found_pairs_set: #mirrored pair already found from the other site
+				found_pairs_set.add((site_1_index, site_2_index))
+				found_pairs_set.add((site_2_index, site_1_index))
 
-				if StructureAnalyzer.site_pair_is_too_close(structure, site_1, site_2, minimum_atomic_distance, nearest_neighbors_max):
-					site_pairs_list.append([site_1_index, site_2_index])
+				site_pairs_list.append([site_1_index, site_2_index])
 
 		return site_pairs_list
 
@@ -104,7 +150,7 @@ class StructureAnalyzer(object):
 		Returns True if any site in this structure is within minimum_atomic_distance (angstroms) of test_site.
 		Minimum distance is different for each type pair, as specified in minimum_atomic_distances_nested_dictionary_by_type
 		Ignores if test_site is the same object (address compared) as a site in the structure. 
-		nearest_neighbors_max controls how many nearest neighbor cell images to search. Higher means higher accuracy in heavily sheared structures
+		nearest_neighbors_max is no longer used - the cell images searched are found from the lattice.
 
 
 		minimum_atomic_distances_nested_dictionary_by_type is in angstroms and looks like:
@@ -1,9 +1,11 @@
 #from fpctoolkit.structure.structure_manipulator import StructureManipulator
 
 import copy
+import numpy as np
 
 from fpctoolkit.structure.structure import Structure
 from fpctoolkit.structure.structure_analyzer import StructureAnalyzer
+from fpctoolkit.structure.periodic_cell_list import PeriodicCellList
 from fpctoolkit.structure.site_collection import SiteCollection
 from fpctoolkit.util.math.vector import Vector
 from fpctoolkit.util.random_selector import RandomSelector
@@ -20,6 +22,8 @@ class StructureManipulator(object):
 		"""
 		Returns a new structure that is a supercell structure (structure is not modified)
 		Argument supercell_dimensions_list could look like [1,3,4].
+
+		Extra site properties (like 'force') are copied to every image of the site.
 		"""
 
 		Structure.validate(structure)
@@ -35,20 +39,23 @@ class StructureManipulator(object):
 		structure.convert_sites_to_direct_coordinates()
 
 		new_lattice = structure.lattice.get_super_lattice(supercell_dimensions_list)
-		new_sites = SiteCollection()
 
-		for original_site in structure.sites:
-			for a in range(supercell_dimensions_list[0]):
-				for b in range(supercell_dimensions_list[1]):
-					for c in range(supercell_dimensions_list[2]):
-						a_frac = float(a)/float(supercell_dimensions_list[0])
-						b_frac = float(b)/float(supercell_dimensions_list[1])
-						c_frac = float(c)/float(supercell_dimensions_list[2])
+		dimensions_array = np.array(supercell_dimensions_list, dtype=np.float64)
+		cell_offsets = np.array([[a, b, c] for a in range(supercell_dimensions_list[0]) for b in range(supercell_dimensions_list[1]) for c in range(supercell_dimensions_list[2])], dtype=np.float64)/dimensions_array
+		cell_count = len(cell_offsets)
+
+		#each original site is followed by its images in all cells of the supercell (ordered by a, then b, then c)
+		new_positions = (structure.sites.get_read_only_positions()[:, np.newaxis, :]/dimensions_array + cell_offsets[np.newaxis, :, :]).reshape(-1, 3)
+		new_types_list = [structure.sites.species_list[species_index] for species_index in structure.sites.species_indices for i in range(cell_count)]
+
+		new_sites = SiteCollection.get_instance_from_arrays(new_positions, new_types_list, 'Direct')
+
+		for index, site in enumerate(structure.sites.site_views):
+			extra_properties_dictionary = site.get_extra_properties_dictionary() if site != None else None
 
-						new_site = copy.deepcopy(original_site)
-						old_position = original_site['position']
-						new_site['position'] = [old_position[0]/supercell_dimensions_list[0]+a_frac, old_position[1]/supercell_dimensions_list[1]+b_frac, old_position[2]/supercell_dimensions_list[2]+c_frac]
-						new_sites.append(new_site)
+			if extra_properties_dictionary:
+				for image_index in range(index*cell_count, (index+1)*cell_count):
+					new_sites.get_site_view(image_index)._properties.update(copy.deepcopy(extra_properties_dictionary))
 
 
 		return Structure(lattice=new_lattice, sites=new_sites)
@@ -90,17 +97,25 @@ class StructureManipulator(object):
 
 		Structure.validate(structure)
 
-		original_structure = copy.deepcopy(structure)
-		original_sites_list = copy.deepcopy(structure.sites.get_sorted_list())
+		original_positions = structure.sites.get_read_only_positions().copy() #the coordinate mode of the structure is not changed below
 		new_sites_list = structure.sites.get_sorted_list()
 
 		sites_to_check_indices_list = range(len(new_sites_list)) #start with checking every index (looks like [0, 1, 2, ..., num_atoms-1])
 
 		StructureManipulator.displace_site_positions(structure, displacement_vector_distribution_function_dictionary_by_type)
 
+		#neighbor search grid kept across tries - only the sites moved in a try are re-binned and re-checked
+		species_pair_minimum_distances = StructureAnalyzer.get_species_pair_minimum_distance_array(structure, minimum_atomic_distances_nested_dictionary_by_type)
+
+		if np.max(species_pair_minimum_distances) <= 0.0: #no sites can be too close - and a cell list needs a positive cutoff
+			return
+
+		cell_list = PeriodicCellList(structure, cutoff=np.max(species_pair_minimum_distances))
+
 		for try_count in range(200):
 
-			indices_of_site_pairs_that_are_too_close_list = StructureAnalyzer.get_indices_of_site_pairs_that_are_too_close_to_sites_list(structure, sites_to_check_indices_list, minimum_atomic_distances_nested_dictionary_by_type)
+			indices_of_site_pairs_that_are_too_close_list = StructureAnalyzer.get_indices_of_site_pairs_that_are_too_close_to_sites_list(structure, sites_to_check_indices_list, minimum_atomic_distances_nested_dictionary_by_type,
+				cell_list=cell_list)
 			sites_to_check_indices_list = []
 			indices_to_displace_list = []
 
@@ -123,13 +138,14 @@ class StructureManipulator(object):
 						print "already in index list of sites that have been moved"
 						continue
 
-					new_sites_list[index_to_displace]['coordinate_mode'] = original_sites_list[index_to_displace]['coordinate_mode']
-					new_sites_list[index_to_displace]['position'] = copy.deepcopy(original_sites_list[index_to_displace]['position'])
+					new_sites_list[index_to_displace]['position'] = original_positions[index_to_displace].tolist()
 
 					new_sites_list[index_to_displace].randomly_displace(displacement_vector_distribution_function_dictionary_by_type[new_sites_list[index_to_displace]['type']], structure.lattice)
 					sites_to_check_indices_list.append(index_to_displace)
 					indices_to_displace_list.append(index_to_displace)
 
+				cell_list.update_sites(sites_to_check_indices_list)
+
 			else:
 				return
 
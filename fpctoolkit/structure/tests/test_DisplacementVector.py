@@ -0,0 +1,69 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.displacement_vector import DisplacementVector
+
+class Test(TestCase):
+
+	def setUp(self):
+		random_state = np.random.RandomState(11)
+
+		self.direct_displacements = random_state.uniform(-0.05, 0.05, size=(20, 3))
+
+		reference_positions = random_state.uniform(0.0, 1.0, size=(20, 3))
+		types_list = ['Sr']*5 + ['Ti']*5 + ['O']*10
+
+		self.reference_structure = Structure(lattice=[[7.0, 0.0, 0.0], [1.0, 8.0, 0.0], [-0.5, 0.5, 9.0]], sites=SiteCollection.get_instance_from_arrays(reference_positions, types_list, 'Direct'))
+
+		#sites wrapped to other periodic images must still give the short displacement
+		displaced_positions = reference_positions + self.direct_displacements + random_state.randint(-1, 2, size=(20, 3))
+		self.displaced_structure = Structure(lattice=self.reference_structure.lattice, sites=SiteCollection.get_instance_from_arrays(displaced_positions, types_list, 'Direct'))
+		self.displaced_structure.convert_sites_to_cartesian_coordinates()
+
+	def test_displacement_field(self):
+		direct_displacement_vector = DisplacementVector.get_instance_from_displaced_structure_relative_to_reference_structure(self.reference_structure, self.displaced_structure, coordinate_mode='Direct')
+		cartesian_displacement_vector = DisplacementVector.get_instance_from_displaced_structure_relative_to_reference_structure(self.reference_structure, self.displaced_structure)
+
+		self.assertTrue(direct_displacement_vector.reference_structure is self.reference_structure)
+		self.assertEqual(self.displaced_structure.sites.get_coordinate_mode(), 'Cartesian')
+
+		self.assertTrue(np.allclose(direct_displacement_vector.to_numpy_array(), self.direct_displacements.flatten()))
+		self.assertTrue(np.allclose(cartesian_displacement_vector.to_numpy_array(), self.reference_structure.lattice.get_cartesian_coordinates(self.direct_displacements).flatten()))
+
+		displaced_structure = cartesian_displacement_vector.get_displaced_structure()
+		self.assertTrue(np.allclose(displaced_structure.sites.positions, self.reference_structure.sites.positions + self.direct_displacements))
+
+	def test_displacement_fields(self):
+		shifted_structure = self.displaced_structure.copy()
+		shifted_structure.convert_sites_to_direct_coordinates()
+		shifted_structure.sites.shift_direct_coordinates([0.02, -0.01, 0.03])
+
+		displaced_structures_list = [self.displaced_structure, self.reference_structure, shifted_structure]
+
+		displacement_fields = DisplacementVector.get_displacement_fields(self.reference_structure, displaced_structures_list, coordinate_mode='Direct')
+
+		self.assertEqual(displacement_fields.shape, (3, 20, 3))
+
+		for k, displaced_structure in enumerate(displaced_structures_list):
+			self.assertTrue(np.allclose(displacement_fields[k], DisplacementVector.get_displacement_field(self.reference_structure, displaced_structure, coordinate_mode='Direct')))
+
+		self.assertTrue(np.allclose(displacement_fields[1], 0.0))
+		self.assertTrue(np.allclose(displacement_fields[2], self.direct_displacements + [0.02, -0.01, 0.03]))
+
+	def test_arithmetic(self):
+		displacement_vector = DisplacementVector.get_instance_from_displaced_structure_relative_to_reference_structure(self.reference_structure, self.displaced_structure)
+		components = displacement_vector.to_numpy_array()
+
+		negated_displacement_vector = -1.0*displacement_vector
+
+		self.assertTrue(isinstance(negated_displacement_vector, DisplacementVector))
+		self.assertTrue(negated_displacement_vector.reference_structure is self.reference_structure)
+		self.assertTrue(np.allclose(negated_displacement_vector.to_numpy_array(), -components))
+		self.assertTrue(np.allclose(displacement_vector.to_numpy_array(), components))
+
+		self.assertTrue(np.allclose(components.tolist() + displacement_vector, 2.0*components))
+
+		displacement_vector.normalize()
+		self.assertAlmostEqual(displacement_vector.magnitude, 1.0)
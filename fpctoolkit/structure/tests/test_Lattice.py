@@ -0,0 +1,64 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.lattice import Lattice
+from fpctoolkit.util.math.vector import Vector
+
+class Test(TestCase):
+
+	def setUp(self):
+		self.lattice = Lattice([[4.0, 0.0, 0.0], [1.0, 5.0, 0.0], [0.0, 0.5, 6.0]])
+
+	def test_matrix_cache(self):
+		matrix = self.lattice.get_matrix()
+		inverse_matrix = self.lattice.get_inverse_matrix()
+
+		self.assertTrue(matrix is self.lattice.get_matrix())
+		self.assertTrue(inverse_matrix is self.lattice.get_inverse_matrix())
+		self.assertTrue(np.allclose(np.dot(matrix, inverse_matrix), np.eye(3)))
+
+		self.lattice.strain([[1.1, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+		self.assertEqual(self.lattice.get_matrix()[0].tolist(), [4.4, 0.0, 0.0])
+		self.assertTrue(np.allclose(np.dot(self.lattice.get_matrix(), self.lattice.get_inverse_matrix()), np.eye(3)))
+
+		self.lattice[2][2] = 3.0 #in place change of a component
+		self.assertEqual(self.lattice.get_matrix()[2][2], 3.0)
+		self.assertTrue(np.allclose(np.dot(self.lattice.get_matrix(), self.lattice.get_inverse_matrix()), np.eye(3)))
+
+	def test_batched_conversion(self):
+		direct_coordinates = np.array([[0.1, 0.2, 0.3], [0.5, 0.5, 0.5], [0.0, -0.25, 1.0]])
+
+		cartesian_coordinates = self.lattice.get_cartesian_coordinates(direct_coordinates)
+		self.assertEqual(cartesian_coordinates.shape, (3, 3))
+		self.assertTrue(np.allclose(cartesian_coordinates[1], [2.5, 2.75, 3.0]))
+		self.assertTrue(np.allclose(self.lattice.get_direct_coordinates(cartesian_coordinates), direct_coordinates))
+
+		for i in range(3):
+			self.assertTrue(np.allclose(Vector.get_in_direct_coordinates(cartesian_coordinates[i], self.lattice).to_list(), direct_coordinates[i]))
+			self.assertTrue(np.allclose(Vector.get_in_direct_coordinates(cartesian_coordinates[i], self.lattice.to_array()).to_list(), direct_coordinates[i]))
+
+	def test_minimum_image_kernel(self):
+		sheared_lattice = Lattice([[4.0, 0.0, 0.0], [3.5, 2.0, 0.0], [-3.0, 1.5, 2.5]])
+
+		fractional_coordinates_1 = np.array([[0.1, 0.2, 0.3], [0.9, 0.95, 0.0], [-1.3, 2.2, 0.5]])
+		fractional_coordinates_2 = np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]])
+
+		distances, vectors = Vector.get_all_pairs_minimum_image_distances_and_vectors(fractional_coordinates_1, fractional_coordinates_2, sheared_lattice)
+
+		self.assertEqual(distances.shape, (3, 2))
+		self.assertEqual(vectors.shape, (3, 2, 3))
+
+		search_range = range(-6, 7)
+		image_shifts = np.array([[na, nb, nc] for na in search_range for nb in search_range for nc in search_range])
+
+		for i in range(3):
+			for j in range(2):
+				image_vectors = np.dot(fractional_coordinates_2[j] - fractional_coordinates_1[i] - image_shifts, sheared_lattice.get_matrix())
+
+				self.assertAlmostEqual(distances[i][j], np.min(np.linalg.norm(image_vectors, axis=1)))
+				self.assertAlmostEqual(distances[i][j], np.linalg.norm(sheared_lattice.get_cartesian_coordinates(vectors[i][j])))
+
+		paired_distances = Vector.get_paired_minimum_image_distances_and_vectors(fractional_coordinates_1[0:2], fractional_coordinates_2, sheared_lattice)[0]
+		self.assertTrue(np.allclose(paired_distances, [distances[0][0], distances[1][1]]))
+
+		self.assertAlmostEqual(Vector.get_minimum_distance_between_two_periodic_points([0.1, 0.2, 0.3], [0.5, 0.5, 0.5], sheared_lattice), distances[0][1])
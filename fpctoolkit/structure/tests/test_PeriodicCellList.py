@@ -0,0 +1,66 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.lattice import Lattice
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.structure_analyzer import StructureAnalyzer
+from fpctoolkit.structure.periodic_cell_list import PeriodicCellList
+
+class Test(TestCase):
+
+	def setUp(self):
+		random_state = np.random.RandomState(7)
+
+		lattice = Lattice([[9.0, 0.0, 0.0], [2.5, 8.0, 0.0], [-1.5, 2.0, 10.0]])
+		types_list = ['Ba']*40 + ['O']*80
+
+		self.structure = Structure(lattice=lattice, sites=SiteCollection.get_instance_from_arrays(random_state.uniform(-0.2, 1.2, size=(120, 3)), types_list, 'Direct'))
+		self.minimum_atomic_distances_nested_dictionary_by_type = {'Ba': {'Ba': 2.0, 'O': 1.6}, 'O': {'Ba': 1.6, 'O': 1.2}}
+
+	def get_pairs_by_brute_force(self, site_index_list, cutoff):
+		distance_matrix = StructureAnalyzer.get_minimum_image_distance_matrix(self.structure, site_index_list)
+
+		return [[site_index, j] for i, site_index in enumerate(site_index_list) for j in range(len(self.structure.sites)) if j != site_index and distance_matrix[i][j] < cutoff]
+
+	def test_pairs_within_cutoff(self):
+		cell_list = PeriodicCellList(self.structure, cutoff=1.8)
+
+		self.assertTrue(np.prod(cell_list.bin_counts) > 1)
+
+		pairs, distances = cell_list.get_pairs_within_cutoff()
+		self.assertEqual(pairs.tolist(), self.get_pairs_by_brute_force(range(120), 1.8))
+		self.assertTrue(np.all(distances < 1.8))
+
+		site_index_list = [5, 90, 17]
+		self.assertEqual(cell_list.get_pairs_within_cutoff(site_index_list)[0].tolist(), self.get_pairs_by_brute_force(site_index_list, 1.8))
+
+	def test_incremental_update(self):
+		cell_list = PeriodicCellList(self.structure, cutoff=1.8)
+
+		self.structure.sites.positions[[3, 50]] += [0.31, -0.22, 0.47]
+		cell_list.update_sites([3, 50])
+
+		self.assertEqual(cell_list.get_pairs_within_cutoff([3, 50])[0].tolist(), self.get_pairs_by_brute_force([3, 50], 1.8))
+		self.assertEqual(cell_list.get_pairs_within_cutoff()[0].tolist(), self.get_pairs_by_brute_force(range(120), 1.8))
+
+	def test_structure_analyzer(self):
+		minimum_distances = self.minimum_atomic_distances_nested_dictionary_by_type
+		site_index_list = range(0, 120, 7)
+
+		distance_matrix = StructureAnalyzer.get_minimum_image_distance_matrix(self.structure, site_index_list)
+		minimum_distance_matrix = StructureAnalyzer.get_minimum_atomic_distance_matrix(self.structure, minimum_distances, site_index_list)
+
+		expected_pairs_list = []
+		for i, site_1_index in enumerate(site_index_list):
+			for site_2_index in range(120):
+				if site_1_index != site_2_index and distance_matrix[i][site_2_index] < minimum_distance_matrix[i][site_2_index] and [site_2_index, site_1_index] not in expected_pairs_list:
+					expected_pairs_list.append([site_1_index, site_2_index])
+
+		self.assertEqual(StructureAnalyzer.get_indices_of_site_pairs_that_are_too_close_to_sites_list(self.structure, site_index_list, minimum_distances), expected_pairs_list)
+		self.assertTrue(StructureAnalyzer.any_sites_are_too_close(self.structure, minimum_distances))
+		self.assertFalse(StructureAnalyzer.any_sites_are_too_close(self.structure, {'Ba': {'Ba': 0.01, 'O': 0.01}, 'O': {'Ba': 0.01, 'O': 0.01}}))
+
+		zero_minimum_distances = {'Ba': {'Ba': 0.0, 'O': 0.0}, 'O': {'Ba': 0.0, 'O': 0.0}}
+		self.assertFalse(StructureAnalyzer.any_sites_are_too_close(self.structure, zero_minimum_distances))
+		self.assertEqual(StructureAnalyzer.get_indices_of_site_pairs_that_are_too_close_to_sites_list(self.structure, site_index_list, zero_minimum_distances), [])
@@ -0,0 +1,149 @@
+import copy
+import gc
+import cPickle
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.site import Site
+from fpctoolkit.structure.site_collection import SiteCollection
+
+class Test(TestCase):
+
+	def setUp(self):
+		self.sites_list = [Site({'position': [0.1, 0.2, 0.3], 'coordinate_mode': 'Direct', 'type': 'Ba'}),
+			Site({'position': [0.5, 0.5, 0.5], 'coordinate_mode': 'Direct', 'type': 'Ti'}),
+			Site({'position': [0.0, 0.5, 0.5], 'coordinate_mode': 'Direct', 'type': 'Ba'})]
+
+	def test_init(self):
+		site_collection = SiteCollection(self.sites_list)
+
+		self.assertEqual(len(site_collection), 3)
+		self.assertEqual(site_collection.keys(), ['Ba', 'Ti'])
+		self.assertEqual(site_collection.get_species_count_list(), [2, 1])
+		self.assertEqual(site_collection.get_coordinate_mode(), 'Direct')
+		self.assertEqual(site_collection.positions.shape, (3, 3))
+		self.assertEqual(site_collection.positions.dtype, np.float64)
+		self.assertEqual(site_collection.get_coordinates_list(), [[0.1, 0.2, 0.3], [0.0, 0.5, 0.5], [0.5, 0.5, 0.5]])
+		self.assertEqual([site['type'] for site in site_collection], ['Ba', 'Ba', 'Ti'])
+		self.assertEqual(site_collection['Ba'][1]['position'], [0.0, 0.5, 0.5])
+
+		self.assertTrue(site_collection[1] is self.sites_list[2]) #free sites become views
+
+		with self.assertRaises(Exception):
+			SiteCollection(self.sites_list + [Site({'position': [0.0, 0.0, 0.0], 'coordinate_mode': 'Cartesian', 'type': 'O'})])
+
+		site_collection_from_arrays = SiteCollection.get_instance_from_arrays([[0.1, 0.2, 0.3], [0.5, 0.5, 0.5], [0.0, 0.5, 0.5]], ['Ba', 'Ti', 'Ba'], 'Direct')
+		self.assertEqual(site_collection_from_arrays.get_coordinates_list(), site_collection.get_coordinates_list())
+		self.assertEqual(site_collection_from_arrays.site_views, [None, None, None])
+
+	def test_site_views(self):
+		site_collection = SiteCollection(self.sites_list)
+
+		site_collection[2]['position'][1] += 0.25
+		self.assertEqual(site_collection.positions[2].tolist(), [0.5, 0.75, 0.5])
+
+		self.sites_list[0]['position'] = [0.2, 0.2, 0.2]
+		self.assertEqual(site_collection.positions[0].tolist(), [0.2, 0.2, 0.2])
+
+		with self.assertRaises(Exception):
+			site_collection[0]['coordinate_mode'] = 'Cartesian'
+
+		copied_site_collection = SiteCollection(site_collection)
+		copied_site_collection[0]['position'][0] = 0.9
+		self.assertEqual(site_collection[0]['position'][0], 0.2)
+
+		new_site = Site({'position': [0.5, 0.0, 0.5], 'coordinate_mode': 'Direct', 'type': 'O'})
+		site_collection.append(new_site)
+		self.assertEqual(site_collection.keys(), ['Ba', 'Ti', 'O'])
+		self.assertTrue(site_collection[3] is new_site)
+
+		site_collection.remove(self.sites_list[1])
+		self.assertEqual(site_collection.keys(), ['Ba', 'O'])
+		self.assertEqual(site_collection[2]['type'], 'O')
+		self.assertEqual(self.sites_list[1]['position'], [0.5, 0.75, 0.5]) #removed site keeps its values
+		self.assertFalse(self.sites_list[1].is_in_site_collection())
+
+	def test_copy(self):
+		site_collection = SiteCollection(self.sites_list)
+		site_collection[1]['force'] = [0.0, 0.0, 1.0]
+
+		site_collection_copy = copy.deepcopy(site_collection)
+		site_collection_copy[1]['position'][0] = 0.7
+		site_collection_copy[1]['force'][2] = 2.0
+
+		self.assertEqual(site_collection[1]['position'][0], 0.0)
+		self.assertEqual(site_collection[1]['force'], [0.0, 0.0, 1.0])
+
+		sites_list_copy = copy.deepcopy(site_collection.get_sorted_list())
+		self.assertTrue(sites_list_copy[0]._site_collection is sites_list_copy[2]._site_collection)
+		self.assertFalse(sites_list_copy[0]._site_collection is site_collection)
+
+		pickled_site_collection = cPickle.loads(cPickle.dumps(site_collection, 2))
+		self.assertEqual(pickled_site_collection.get_coordinates_list(), site_collection.get_coordinates_list())
+		self.assertEqual(pickled_site_collection[1]['force'], [0.0, 0.0, 1.0])
+
+	def test_conversion(self):
+		lattice = [[4.0, 0.0, 0.0], [1.0, 5.0, 0.0], [0.0, 0.5, 6.0]]
+		site_collection = SiteCollection(self.sites_list)
+
+		site_collection.convert_to_cartesian_coordinates(lattice)
+		self.assertEqual(site_collection.get_coordinate_mode(), 'Cartesian')
+		self.assertEqual(self.sites_list[0]['coordinate_mode'], 'Cartesian')
+		self.assertTrue(np.allclose(site_collection[2]['position'], [2.5, 2.75, 3.0]))
+
+		site_collection.convert_to_direct_coordinates(lattice)
+		self.assertTrue(np.allclose(site_collection.positions, [[0.1, 0.2, 0.3], [0.0, 0.5, 0.5], [0.5, 0.5, 0.5]]))
+
+		site_collection.shift_direct_coordinates([0.1, 0.0, 0.0], reverse=True)
+		self.assertTrue(np.allclose(site_collection.positions[:, 0], [0.0, -0.1, 0.4]))
+
+		site_collection.shift_direct_coordinates_by_type({'Ba': [0.0, 0.1, 0.0], 'Ti': [0.0, 0.0, 0.0]})
+		self.assertTrue(np.allclose(site_collection.positions[:, 1], [0.3, 0.6, 0.5]))
+
+	def test_copy_on_write(self):
+		site_collection = SiteCollection(self.sites_list)
+		site_collection[1]['force'] = [0.0, 0.0, 1.0]
+
+		site_collection_copy = site_collection.copy()
+
+		self.assertTrue(site_collection_copy.get_read_only_positions().base is site_collection.get_read_only_positions().base) #shared until written
+		self.assertEqual(site_collection_copy.site_views[0], None)
+		self.assertEqual(site_collection_copy[1]['force'], [0.0, 0.0, 1.0])
+
+		site_collection_copy[1]['force'][2] = 2.0
+		site_collection_copy[0]['position'][0] = 0.7
+
+		self.assertEqual(site_collection[0]['position'][0], 0.1)
+		self.assertEqual(site_collection[1]['force'], [0.0, 0.0, 1.0])
+
+		site_collection_copy_2 = site_collection.copy()
+		site_collection.positions[2] = [0.9, 0.9, 0.9]
+		site_collection_copy_2.append(Site({'position': [0.5, 0.0, 0.5], 'coordinate_mode': 'Direct', 'type': 'O'}))
+
+		self.assertEqual(site_collection_copy_2.get_coordinates_list(), [[0.1, 0.2, 0.3], [0.0, 0.5, 0.5], [0.5, 0.5, 0.5], [0.5, 0.0, 0.5]])
+		self.assertEqual(site_collection.keys(), ['Ba', 'Ti'])
+
+		with self.assertRaises(ValueError):
+			site_collection.get_read_only_positions()[0][0] = 0.5
+
+		lattice = [[4.0, 0.0, 0.0], [1.0, 5.0, 0.0], [0.0, 0.5, 6.0]]
+		self.assertTrue(np.allclose(site_collection_copy_2.get_positions_in_coordinate_mode('Cartesian', lattice)[2], [2.5, 2.75, 3.0]))
+		self.assertEqual(site_collection_copy_2.get_coordinate_mode(), 'Direct')
+
+	def test_copy_on_write_reads(self):
+		site_collection = SiteCollection(self.sites_list)
+		site_collection_copy = site_collection.copy()
+		shared_positions = site_collection.get_read_only_positions().base
+
+		self.assertEqual(site_collection[0]['position'][0], 0.1)
+		self.assertEqual(site_collection_copy[2]['position'].to_list(), [0.5, 0.5, 0.5])
+		self.assertTrue(np.allclose(np.array(site_collection[1]['position']), [0.0, 0.5, 0.5]))
+		self.assertEqual(list(site_collection_copy[1]['position']), [0.0, 0.5, 0.5])
+
+		self.assertTrue(site_collection.get_read_only_positions().base is shared_positions) #reads never unshare
+		self.assertTrue(site_collection_copy.get_read_only_positions().base is shared_positions)
+
+		del site_collection_copy
+		gc.collect()
+
+		self.assertTrue(site_collection.positions is shared_positions) #the only collection left sharing the buffer writes to it in place
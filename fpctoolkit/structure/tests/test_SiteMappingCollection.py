@@ -0,0 +1,68 @@
+import itertools
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.lattice import Lattice
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.site_mapping_collection import SiteMappingCollection
+
+class Test(TestCase):
+
+	def setUp(self):
+		random_state = np.random.RandomState(3)
+
+		self.lattice = Lattice([[8.0, 0.0, 0.0], [1.5, 7.0, 0.0], [-1.0, 0.5, 9.0]])
+		types_list = ['Ba']*12 + ['O']*24
+
+		initial_positions = random_state.uniform(0.0, 1.0, size=(36, 3))
+
+		#each species' final sites are its initial sites shuffled, nudged, and some moved to a periodic image
+		self.permutation = np.concatenate([random_state.permutation(12), 12 + random_state.permutation(24)])
+		final_positions = initial_positions[self.permutation] + random_state.uniform(-0.01, 0.01, size=(36, 3)) + random_state.randint(-1, 2, size=(36, 3))
+
+		self.site_collection_initial = SiteCollection.get_instance_from_arrays(initial_positions, types_list, 'Direct')
+		self.site_collection_final = SiteCollection.get_instance_from_arrays(final_positions, types_list, 'Direct')
+
+	def test_mapping(self):
+		site_mapping_collection = SiteMappingCollection(self.site_collection_initial, self.site_collection_final, self.lattice)
+
+		for type_string, offset in [('Ba', 0), ('O', 12)]:
+			site_mapping_list = site_mapping_collection.mapping_dictionary[type_string]
+
+			self.assertEqual([site_mapping.initial_index for site_mapping in site_mapping_list], range(len(site_mapping_list)))
+
+			for site_mapping in site_mapping_list:
+				self.assertEqual(self.permutation[offset + site_mapping.final_index] - offset, site_mapping.initial_index)
+				self.assertTrue(site_mapping.distance < 0.3) #nudges are at most 0.01 in direct coordinates
+
+				self.assertTrue(np.allclose(site_mapping.final_site['position'], self.site_collection_final[offset + site_mapping.final_index]['position']))
+
+	def test_assignment_is_optimal(self):
+		distance_matrix = np.random.RandomState(5).uniform(0.0, 3.0, size=(7, 7))
+
+		row_indices, column_indices = SiteMappingCollection.get_optimal_assignment(distance_matrix)
+		minimum_total_distance = min(np.sum(distance_matrix[range(7), list(permutation)]) for permutation in itertools.permutations(range(7)))
+
+		self.assertEqual(list(row_indices), range(7))
+		self.assertEqual(sorted(column_indices), range(7))
+		self.assertAlmostEqual(np.sum(distance_matrix[row_indices, column_indices]), minimum_total_distance)
+
+	def test_interpolated_structures_generator(self):
+		site_mapping_collection = SiteMappingCollection(self.site_collection_initial, self.site_collection_final, self.lattice)
+
+		structures_generator = site_mapping_collection.get_interpolated_structures_generator([0.0, 0.5, 1.0], chunk_size=2)
+		initial_structure, halfway_structure, final_structure = list(structures_generator)
+
+		initial_positions = self.site_collection_initial.get_read_only_positions()
+		final_positions = self.site_collection_final.get_read_only_positions()
+
+		self.assertTrue(np.allclose(initial_structure.sites.positions, initial_positions))
+		self.assertTrue(np.allclose(2.0*halfway_structure.sites.positions - initial_positions, final_structure.sites.positions))
+
+		#the final image lands on the matched final sites up to periodic images
+		for site_mapping_list, offset in [(site_mapping_collection.mapping_dictionary['Ba'], 0), (site_mapping_collection.mapping_dictionary['O'], 12)]:
+			for site_mapping in site_mapping_list:
+				difference = final_structure.sites.positions[offset + site_mapping.initial_index] - final_positions[offset + site_mapping.final_index]
+				self.assertTrue(np.allclose(difference, np.round(difference)))
+
+		self.assertEqual(len(site_mapping_collection.get_interpolated_structure_list(0.25)), 5)
@@ -0,0 +1,86 @@
+import os
+from unittest2 import TestCase
+
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.spacegroup_analyzer import SpacegroupAnalyzer
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	def setUp(self):
+		SpacegroupAnalyzer.clear_cache()
+		SpacegroupAnalyzer.set_disk_cache_path(None)
+
+		self.structure = Structure(lattice=[[4.0, 0.0, 0.0], [0.0, 4.0, 0.0], [0.0, 0.0, 4.0]], sites=SiteCollection.get_instance_from_arrays(
+			[[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [0.5, 0.5, 0.0], [0.5, 0.0, 0.5], [0.0, 0.5, 0.5]], ['Sr', 'Ti', 'O', 'O', 'O'], 'Direct'))
+
+	def tearDown(self):
+		SpacegroupAnalyzer.clear_cache()
+		SpacegroupAnalyzer.set_disk_cache_path(None)
+
+	def test_spacegroup_strings(self):
+		self.assertEqual(self.structure.get_spacegroup_string(), 'Pm-3m (221)')
+
+		self.structure.sites.positions[1][2] += 0.01 #ferroelectric displacement of Ti along z
+
+		self.assertEqual(self.structure.get_spacegroup_strings([0.1, 0.001]), ['Pm-3m (221)', 'P4mm (99)'])
+
+		self.structure.convert_sites_to_cartesian_coordinates()
+		self.assertEqual(self.structure.get_spacegroup_string(0.001), 'P4mm (99)')
+
+	def test_cache(self):
+		self.structure.get_spacegroup_strings([0.1, 0.001])
+		self.assertEqual(len(SpacegroupAnalyzer.cache), 2)
+
+		shifted_structure = Structure(lattice=self.structure.lattice, sites=self.structure.sites)
+		shifted_structure.sites.positions[0] += [1.0, -1.0, 0.0]
+
+		self.assertEqual(shifted_structure.get_spacegroup_strings([0.001, 0.01]), ['Pm-3m (221)', 'Pm-3m (221)'])
+		self.assertEqual(len(SpacegroupAnalyzer.cache), 3) #periodic image shares the fingerprint
+		self.assertEqual(SpacegroupAnalyzer.cache.keys()[-1][1], 0.01)
+
+		original_maximum_cache_size = SpacegroupAnalyzer.maximum_cache_size
+
+		try:
+			SpacegroupAnalyzer.maximum_cache_size = 2
+			self.structure.get_spacegroup_string(0.1)
+
+			self.assertEqual([key[1] for key in SpacegroupAnalyzer.cache.keys()], [0.01, 0.1])
+		finally:
+			SpacegroupAnalyzer.maximum_cache_size = original_maximum_cache_size
+
+	def test_disk_cache(self):
+		disk_cache_path = Path.get_temporary_path()
+
+		try:
+			SpacegroupAnalyzer.set_disk_cache_path(disk_cache_path)
+			self.structure.get_spacegroup_strings([0.1, 0.001])
+
+			SpacegroupAnalyzer.clear_cache()
+			SpacegroupAnalyzer.load_disk_cache()
+
+			self.assertEqual(SpacegroupAnalyzer.cache.values(), ['Pm-3m (221)', 'Pm-3m (221)'])
+			self.assertEqual(self.structure.get_spacegroup_string(0.1), 'Pm-3m (221)')
+			self.assertEqual(len(open(disk_cache_path).readlines()), 2)
+		finally:
+			os.remove(disk_cache_path)
+
+	def test_disk_cache_with_torn_lines(self):
+		disk_cache_path = Path.get_temporary_path()
+
+		try:
+			SpacegroupAnalyzer.set_disk_cache_path(disk_cache_path)
+			self.structure.get_spacegroup_string(0.1)
+
+			with open(disk_cache_path, 'a') as disk_cache_file:
+				disk_cache_file.write('0123abcd 0.0x1 Pm-3m (221)\n') #garbled symprec
+				disk_cache_file.write('0123abcd 0.00') #entry cut short
+
+			SpacegroupAnalyzer.clear_cache()
+			SpacegroupAnalyzer.load_disk_cache()
+
+			self.assertEqual(SpacegroupAnalyzer.cache.values(), ['Pm-3m (221)'])
+			self.assertEqual(self.structure.get_spacegroup_string(0.001), 'Pm-3m (221)')
+		finally:
+			os.remove(disk_cache_path)
@@ -1,6 +1,7 @@
 import os
 import os
 import os
+import numpy as np
 from unittest2 import TestCase
 
 from fpctoolkit.structure.site import Site
@@ -61,4 +62,25 @@ class Test(TestCase):
 
 		for i in range(len(structure.sites)):
 			for j in range(3):
-				self.assertTrue(structure.sites[i]['position'][j] - structure_2.sites[i]['position'][j] < 0.00000000001)
\ No newline at end of file
+				self.assertTrue(structure.sites[i]['position'][j] - structure_2.sites[i]['position'][j] < 0.00000000001)
+
+	def test_phonopy_atoms_conversion(self):
+		lattice = [[4.0, 0.0, 0.0], [0.0, 4.0, 0.0], [0.0, 0.0, 4.0]]
+		structure = Structure(lattice=lattice, sites=SiteCollection.get_instance_from_arrays([[0.5, 0.5, 0.5], [0.0, 0.0, 0.0], [0.5, 0.5, 0.0], [0.5, 0.0, 0.5], [0.0, 0.5, 0.5]],
+			['Ti', 'Sr', 'O', 'O', 'O'], 'Direct'))
+
+		phonopy_atoms = structure.convert_structure_to_phonopy_atoms()
+
+		self.assertEqual(phonopy_atoms.get_chemical_symbols(), ['Ti', 'Sr', 'O', 'O', 'O'])
+		self.assertEqual(phonopy_atoms.get_cell().tolist(), lattice)
+		self.assertEqual(phonopy_atoms.get_scaled_positions().tolist(), structure.get_coordinates_list())
+		self.assertEqual(structure.get_spacegroup_string(), 'Pm-3m (221)')
+
+		phonopy_atoms.set_chemical_symbols(['O', 'Sr', 'O', 'Ti', 'O'])
+		converted_structure = Structure.get_instance_from_phonopy_atoms(phonopy_atoms)
+
+		self.assertEqual(converted_structure.get_species_list(), ['O', 'Sr', 'Ti'])
+		self.assertEqual(converted_structure.get_coordinates_list(), [[0.5, 0.5, 0.5], [0.5, 0.5, 0.0], [0.0, 0.5, 0.5], [0.0, 0.0, 0.0], [0.5, 0.0, 0.5]])
+
+		structure.convert_sites_to_cartesian_coordinates()
+		self.assertTrue(np.allclose(structure.convert_structure_to_phonopy_atoms().get_scaled_positions(), phonopy_atoms.get_scaled_positions()))
@@ -0,0 +1,40 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.structure_manipulator import StructureManipulator
+
+class Test(TestCase):
+
+	def setUp(self):
+		lattice = [[4.0, 0.0, 0.0], [0.0, 4.0, 0.0], [0.0, 0.0, 4.0]]
+		sites = SiteCollection.get_instance_from_arrays([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]], ['Ba', 'Ti'], 'Direct')
+
+		self.structure = Structure(lattice=lattice, sites=sites)
+
+	def test_supercell(self):
+		self.structure.sites[1]['force'] = [0.0, 0.1, 0.2]
+
+		supercell = StructureManipulator.get_supercell(self.structure, [2, 1, 3])
+
+		self.assertEqual(len(supercell.sites), 12)
+		self.assertEqual(supercell.sites.get_types_list(), ['Ba']*6 + ['Ti']*6)
+		self.assertTrue(np.allclose(supercell.sites.positions[7], [0.25, 0.5, 0.5]))
+
+		#extra properties are copied to every image of the site
+		for index in range(6):
+			self.assertEqual(supercell.sites[6 + index]['force'], [0.0, 0.1, 0.2])
+			self.assertFalse('force' in supercell.sites[index].get_extra_properties_dictionary())
+
+		supercell.sites[6]['force'][0] = 1.0
+		self.assertEqual(supercell.sites[7]['force'], [0.0, 0.1, 0.2])
+		self.assertEqual(self.structure.sites[1]['force'], [0.0, 0.1, 0.2])
+
+	def test_displace_with_zero_minimum_distances(self):
+		original_positions = self.structure.sites.get_read_only_positions().copy()
+		zero_minimum_distances = {'Ba': {'Ba': 0.0, 'Ti': 0.0}, 'Ti': {'Ba': 0.0, 'Ti': 0.0}}
+
+		StructureManipulator.displace_site_positions_with_minimum_distance_constraints(self.structure, {'Ti': lambda: [0.1, 0.0, 0.0]}, zero_minimum_distances)
+
+		self.assertTrue(np.allclose(self.structure.sites.positions, original_positions + [[0.0, 0.0, 0.0], [0.025, 0.0, 0.0]]))
@@ -122,7 +122,7 @@ class GADriver(object):
 
 		individuals_list = self.selection_function(population=population_of_last_generation, number_of_individuals_to_return=2)
 
-		self.parent_structures_list = [copy.deepcopy(individual.final_structure) for individual in individuals_list]
+		self.parent_structures_list = [individual.final_structure.copy() for individual in individuals_list]
 		self.parent_paths_list = [individual.calculation_set.path for individual in individuals_list]
 
 		return self.structure_mating_function(self.parent_structures_list[0], self.parent_structures_list[1])
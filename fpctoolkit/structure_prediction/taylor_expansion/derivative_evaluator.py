@@ -86,9 +86,7 @@ class DerivativeEvaluator(object):
 		"""
 		displacement_indices_list = []
 
-		sorted_eigen_pair_list = self.hessian.get_sorted_hessian_eigen_pairs_list()
-
-		for i, eigen_pair in enumerate(sorted_eigen_pair_list):
+		for i, eigen_pair in enumerate(self.eigen_pairs_list):
 			if eigen_pair.is_unstable():
 				if len(displacement_indices_list) < self.max_displacement_variables: ####################################hardcoded!
 					displacement_indices_list.append(i)
@@ -272,7 +270,7 @@ class DerivativeEvaluator(object):
 
 			eigen_chromosomes_list.append(eigen_chromosome)
 
-		return [self.get_distorted_structure_from_eigen_chromosome(eigen_chromosome) for eigen_chromosome in eigen_chromosomes_list]
+		return self.get_distorted_structures_list_from_eigen_chromosomes(eigen_chromosomes_list)
 
 
 	def get_pure_strain_structures_list(self, strain_variable_index):
@@ -290,7 +288,7 @@ class DerivativeEvaluator(object):
 
 			eigen_chromosomes_list.append(eigen_chromosome)
 
-		return [self.get_distorted_structure_from_eigen_chromosome(eigen_chromosome) for eigen_chromosome in eigen_chromosomes_list]
+		return self.get_distorted_structures_list_from_eigen_chromosomes(eigen_chromosomes_list)
 
 
 	def get_distorted_structure_from_eigen_chromosome(self, eigen_chromosome):
@@ -299,6 +297,11 @@ class DerivativeEvaluator(object):
 		eigen_structure.set_eigen_chromosome(eigen_chromosome)
 		return eigen_structure.get_distorted_structure()
 
+	def get_distorted_structures_list_from_eigen_chromosomes(self, eigen_chromosomes_list):
+
+		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
+		return eigen_structure.get_distorted_structures_list(eigen_chromosomes_list)
+
 
 
 
@@ -306,10 +309,9 @@ class DerivativeEvaluator(object):
 
 		eigen_chromosome_pure_components_list = []
 
-		for distorted_structure in distorted_structures_list:
-			eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian, distorted_structure=distorted_structure)
+		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
 
-			eigen_chromosome = eigen_structure.get_list_representation()
+		for eigen_chromosome in eigen_structure.get_eigen_chromosomes_from_distorted_structures(distorted_structures_list).tolist():
 
 			if np.count_nonzero(eigen_chromosome) > 1:
 				raise Exception("There should only be one non-zero component")
@@ -0,0 +1,222 @@
+#from fpctoolkit.structure_prediction.taylor_expansion.minima_finder import MinimaFinder
+
+import multiprocessing
+import numpy as np
+
+from fpctoolkit.io.file import File
+
+
+
+
+class MinimaFinder(object):
+	"""
+	Finds the local minima of a fitted taylor expansion by multi-start local minimization. Thousands of random starting points inside a box
+	around the reference are each relaxed with a saddle-free newton method (steps use the absolute value of the hessian eigenvalues, so
+	starting points near saddles and maxima still go downhill), batched over points with a TaylorExpansionEvaluator. Batches of starting points
+	are spread over a multiprocessing pool.
+
+	Relaxations that do not reach a point of zero gradient inside the box (for example ones that run into the box edge along a direction the
+	expansion is unbounded in) are dropped. The rest are clustered - minima closer than distance_tolerance in variable space and energy_tolerance
+	in energy are one minimum - and sorted by energy.
+
+	The minima can be written in the eigen chromosome energy pairs format MinimaRelaxer reads.
+
+	Usage:
+		minima_finder = MinimaFinder(TaylorExpansionEvaluator(taylor_expansion), variable_bounds_dictionary={'strain': 0.05, 'displacement': 1.5})
+		minima_finder.find_minima(starting_point_count=5000, seed=0)
+		minima_finder.write_eigen_chromosome_energy_pairs_file(file_path)
+	"""
+
+	def __init__(self, taylor_expansion_evaluator, variable_bounds_dictionary, gradient_tolerance=1e-6, distance_tolerance=1e-3, energy_tolerance=1e-5, maximum_iteration_count=200):
+		"""
+		variable_bounds_dictionary should look like {'strain': 0.05, 'displacement': 1.5}. Each variable of that type is searched over [-bound, bound].
+		"""
+
+		self.taylor_expansion_evaluator = taylor_expansion_evaluator
+
+		self.upper_bounds = np.array([float(variable_bounds_dictionary[variable.type_string]) for variable in taylor_expansion_evaluator.variables_list])
+		self.lower_bounds = -self.upper_bounds
+
+		self.gradient_tolerance = gradient_tolerance
+		self.distance_tolerance = distance_tolerance
+		self.energy_tolerance = energy_tolerance
+		self.maximum_iteration_count = maximum_iteration_count
+
+		self.minima_energies = np.zeros(0)
+		self.minima_variable_values = np.zeros((0, taylor_expansion_evaluator.variable_count))
+
+
+	def get_random_starting_variable_values(self, starting_point_count, seed=None):
+		"""
+		Returns (starting_point_count, V) points drawn uniformly from the search box.
+		"""
+
+		random_state = np.random.RandomState(seed)
+
+		return random_state.uniform(self.lower_bounds, self.upper_bounds, size=(starting_point_count, len(self.upper_bounds)))
+
+	def find_minima(self, starting_variable_values=None, starting_point_count=1000, seed=None, process_count=None):
+		"""
+		Relaxes each starting point (random ones from get_random_starting_variable_values if starting_variable_values is None) and stores the
+		clustered minima, lowest energy first, in self.minima_energies (M,) and self.minima_variable_values (M, V). Returns the energies.
+
+		process_count is the number of worker processes (all cpus if None). With process_count=1 everything runs in this process.
+		"""
+
+		if starting_variable_values is None:
+			starting_variable_values = self.get_random_starting_variable_values(starting_point_count, seed)
+
+		starting_variable_values = np.asarray(starting_variable_values, dtype=np.float64)
+
+		if process_count == None:
+			process_count = multiprocessing.cpu_count()
+
+		chunk_count = min(len(starting_variable_values), 4*process_count) #a few chunks per process evens out uneven chunks
+		arguments_list = [(self, chunk) for chunk in np.array_split(starting_variable_values, max(1, chunk_count))]
+
+		if process_count == 1:
+			results_list = map(relax_starting_points, arguments_list)
+		else:
+			pool = multiprocessing.Pool(process_count)
+
+			try:
+				results_list = pool.map(relax_starting_points, arguments_list)
+			finally:
+				pool.close()
+				pool.join()
+
+		energies = np.concatenate([result[0] for result in results_list])
+		variable_values = np.concatenate([result[1] for result in results_list]).reshape(-1, len(self.upper_bounds))
+
+		representative_indices = self.get_cluster_representative_indices(energies, variable_values)
+
+		self.minima_energies = energies[representative_indices]
+		self.minima_variable_values = variable_values[representative_indices]
+
+		return self.minima_energies
+
+	def relax(self, variable_values):
+		"""
+		Relaxes the (K, V) variable_values with saddle-free newton steps and a backtracking line search, all points at once. Returns
+		(energies, variable_values) of the points that converged to zero gradient with no negative curvature.
+		"""
+
+		evaluator = self.taylor_expansion_evaluator
+
+		variable_values = np.clip(np.array(variable_values, dtype=np.float64), self.lower_bounds, self.upper_bounds)
+		energies = evaluator.get_energies(variable_values)
+
+		active = np.ones(len(variable_values), dtype=bool)
+
+		minimum_curvature = 1e-8
+		maximum_step_sizes = 0.25*(self.upper_bounds - self.lower_bounds)
+
+		for iteration in range(self.maximum_iteration_count):
+			active_indices = np.nonzero(active)[0]
+
+			if len(active_indices) == 0:
+				break
+
+			x = variable_values[active_indices]
+			gradients = evaluator.get_gradients(x)
+
+			is_converged = (np.max(np.abs(gradients), axis=1) < self.gradient_tolerance)
+			active[active_indices[is_converged]] = False
+
+			active_indices = active_indices[~is_converged]
+			x = x[~is_converged]
+			gradients = gradients[~is_converged]
+
+			if len(active_indices) == 0:
+				break
+
+			eigenvalues, eigenvectors = np.linalg.eigh(evaluator.get_hessians(x))
+
+			gradient_components = np.einsum('kvm,kv->km', eigenvectors, gradients)
+			steps = -np.einsum('kvm,km->kv', eigenvectors, gradient_components/np.maximum(np.abs(eigenvalues), minimum_curvature))
+			steps *= np.minimum(1.0, np.min(maximum_step_sizes/np.maximum(np.abs(steps), 1e-300), axis=1))[:, np.newaxis] #caps each step at a quarter of the box
+
+			step_scales = np.ones(len(active_indices))
+			accepted = np.zeros(len(active_indices), dtype=bool)
+
+			for backtrack in range(30):
+				trial_indices = np.nonzero(~accepted)[0]
+
+				if len(trial_indices) == 0:
+					break
+
+				trial_x = np.clip(x[trial_indices] + step_scales[trial_indices, np.newaxis]*steps[trial_indices], self.lower_bounds, self.upper_bounds)
+				trial_energies = evaluator.get_energies(trial_x)
+
+				is_lower = (trial_energies < energies[active_indices[trial_indices]])
+
+				variable_values[active_indices[trial_indices[is_lower]]] = trial_x[is_lower]
+				energies[active_indices[trial_indices[is_lower]]] = trial_energies[is_lower]
+
+				accepted[trial_indices[is_lower]] = True
+				step_scales[trial_indices[~is_lower]] *= 0.5
+
+			active[active_indices[~accepted]] = False #no lower point along the step - stuck against the box edge or at a flat point
+
+		converged = (np.max(np.abs(evaluator.get_gradients(variable_values)), axis=1) < self.gradient_tolerance)
+
+		if np.any(converged):
+			converged[converged] = (np.linalg.eigvalsh(evaluator.get_hessians(variable_values[converged]))[:, 0] > -minimum_curvature) #drop saddle points
+
+		return (energies[converged], variable_values[converged])
+
+	def get_cluster_representative_indices(self, energies, variable_values):
+		"""
+		Returns indices of one point per cluster of (energies, variable_values), lowest energy first. Points join the cluster of the first lower
+		energy representative within distance_tolerance and energy_tolerance of them.
+		"""
+
+		representative_indices = []
+
+		for index in np.argsort(energies, kind='mergesort'):
+			if representative_indices:
+				distances = np.linalg.norm(variable_values[representative_indices] - variable_values[index], axis=1)
+				energy_differences = np.abs(energies[representative_indices] - energies[index])
+
+				if np.any((distances < self.distance_tolerance) & (energy_differences < self.energy_tolerance)):
+					continue
+
+			representative_indices.append(index)
+
+		return np.array(representative_indices, dtype=int)
+
+	def get_eigen_chromosome_energy_pairs_list(self, chromosome_length=None):
+		"""
+		Returns [[energy, eigen_chromosome], ...] for the minima, lowest energy first.
+		"""
+
+		eigen_chromosomes = self.taylor_expansion_evaluator.get_eigen_chromosomes(self.minima_variable_values, chromosome_length)
+
+		return [[self.minima_energies[i], eigen_chromosomes[i].tolist()] for i in range(len(self.minima_energies))]
+
+	def write_eigen_chromosome_energy_pairs_file(self, file_path, chromosome_length=None):
+		"""
+		Writes the minima to file_path with lines like
+
+			-0.0123, 0.0 0.0 0.0081 0.0 0.0 0.0 0.213 0.0
+
+		which is the eigen_chromosome_energy_pairs_file_path format MinimaRelaxer reads.
+		"""
+
+		file = File()
+
+		for energy, eigen_chromosome in self.get_eigen_chromosome_energy_pairs_list(chromosome_length):
+			file += repr(float(energy)) + ', ' + ' '.join(repr(component) for component in eigen_chromosome)
+
+		file.write_to_path(file_path)
+
+
+
+def relax_starting_points(arguments):
+	"""
+	Pool worker - arguments is (minima_finder, starting_variable_values). Lives at module level so multiprocessing can pickle it.
+	"""
+
+	minima_finder, starting_variable_values = arguments
+
+	return minima_finder.relax(starting_variable_values)
@@ -71,15 +71,15 @@ class MinimaRelaxer(object):
 		if not Path.exists(guesses_log_path):
 			file = File()
 
-			sorted_hessian_eigen_pairs_list = hessian.get_sorted_hessian_eigen_pairs_list()
 			total = len(sorted_eigen_chromosome_energy_pairs_list)
 			eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
 
+			initial_structures_list = eigen_structure.get_distorted_structures_list([eigen_chromosome_energy_pair[1] for eigen_chromosome_energy_pair in sorted_eigen_chromosome_energy_pairs_list])
+
 			for i, eigen_chromosome_energy_pair in enumerate(sorted_eigen_chromosome_energy_pairs_list):
 				print "Writing guess log " + str(i+1) + " of " + str(total)
-				eigen_structure.set_eigen_chromosome(eigen_chromosome_energy_pair[1])
 
-				initial_structure = eigen_structure.get_distorted_structure()
+				initial_structure = initial_structures_list[i]
 
 				spg = initial_structure.get_spacegroup_string(0.001)
 
@@ -155,18 +155,16 @@ class MinimaRelaxer(object):
 
 		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
 
-		for i, eigen_chromosome in enumerate(self.eigen_chromosomes_list):
+		eigen_chromosomes_list = self.eigen_chromosomes_list if (self.max_minima == None) else self.eigen_chromosomes_list[:self.max_minima]
+		initial_structures_list = eigen_structure.get_distorted_structures_list(eigen_chromosomes_list) if eigen_chromosomes_list else []
 
-			if (self.max_minima != None) and (i >= self.max_minima):
-				break
+		for i, eigen_chromosome in enumerate(eigen_chromosomes_list):
 
 			if (i % (len(self.eigen_chromosomes_list)/10) == 0):
 				mx = self.max_minima if self.max_minima else len(self.eigen_chromosomes_list)
 				print str(i) + "/" + str(mx)
 
-			eigen_structure.set_eigen_chromosome(eigen_chromosome)
-
-			initial_structure = eigen_structure.get_distorted_structure()
+			initial_structure = initial_structures_list[i]
 
 			self.vasp_relaxations_list.append(VaspRelaxation(path=self.get_extended_path("rank_" + str(i) + "_" + "_".join(str(x) for x in eigen_chromosome)), initial_structure=initial_structure, input_dictionary=self.vasp_relaxation_inputs_dictionary))
 
@@ -178,7 +176,8 @@ class MinimaRelaxer(object):
 		self.completed_relaxations_data_list = []
 
 
-		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
+		completed_indices_list = []
+
 		for i, vasp_relaxation in enumerate(self.vasp_relaxations_list):
 
 			vasp_relaxation.update()
@@ -186,10 +185,23 @@ class MinimaRelaxer(object):
 			print "Updating minima relaxation at " + vasp_relaxation.path + "  Status is " + vasp_relaxation.get_status_string()
 
 			if vasp_relaxation.complete:
-				# eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian, distorted_structure=vasp_relaxation.final_structure)
-				eigen_structure.set_strains_and_amplitudes_from_distorted_structure(vasp_relaxation.final_structure)
+				completed_indices_list.append(i)
+
+		final_eigen_chromosomes_list = self.get_final_eigen_chromosomes_list(completed_indices_list)
+
+		for i, final_eigen_chromosome in zip(completed_indices_list, final_eigen_chromosomes_list):
+			self.completed_relaxations_data_list.append([self.vasp_relaxations_list[i], self.eigen_chromosomes_list[i], final_eigen_chromosome])
+
+	def get_final_eigen_chromosomes_list(self, relaxation_indices_list):
+		"""
+		Returns the list of eigen chromosomes (as lists) of the final structures of the (complete) relaxations at relaxation_indices_list, decomposed all at once.
+		"""
+
+		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
+
+		final_structures_list = [self.vasp_relaxations_list[i].final_structure for i in relaxation_indices_list]
 
-				self.completed_relaxations_data_list.append([vasp_relaxation, self.eigen_chromosomes_list[i], eigen_structure.get_list_representation()])
+		return eigen_structure.get_eigen_chromosomes_from_distorted_structures(final_structures_list).tolist()
 
 
 
@@ -204,7 +216,10 @@ class MinimaRelaxer(object):
 		file += ""
 
 		reference_energy = self.reference_completed_vasp_relaxation_run.get_final_energy(per_atom=False)
-		eigen_structure = EigenStructure(reference_structure=self.reference_structure, hessian=self.hessian)
+
+		completed_indices_list = [i for i, vasp_relaxation in enumerate(self.vasp_relaxations_list) if vasp_relaxation.complete]
+		final_eigen_chromosomes_dictionary = dict(zip(completed_indices_list, self.get_final_eigen_chromosomes_list(completed_indices_list)))
+
 		for i, vasp_relaxation in enumerate(self.vasp_relaxations_list):
 
 			mx = len(self.vasp_relaxations_list)
@@ -216,14 +231,12 @@ class MinimaRelaxer(object):
 			file += ''
 
 			if vasp_relaxation.complete:
-				eigen_structure.set_strains_and_amplitudes_from_distorted_structure(vasp_relaxation.final_structure)
-
-				eigen_structure_list_representation = eigen_structure.get_list_representation()
+				eigen_structure_list_representation = final_eigen_chromosomes_dictionary[i]
 
 				self.completed_relaxations_data_list.append([vasp_relaxation, self.eigen_chromosomes_list[i], eigen_structure_list_representation])
 
 				file += "DFT Energy Change        " + str(vasp_relaxation.get_final_energy(per_atom=False)-reference_energy)
-				file += "Space Group " + " ".join([vasp_relaxation.final_structure.get_spacegroup_string(symprec) for symprec in spg_symprecs])
+				file += "Space Group " + " ".join(vasp_relaxation.final_structure.get_spacegroup_strings(spg_symprecs))
 				file += "Guessed Energy Change  " + str(self.predicted_energies_list[i])
 				file += "Guessed Chromosome"
 				file += misc.get_formatted_chromosome_string(self.eigen_chromosomes_list[i])
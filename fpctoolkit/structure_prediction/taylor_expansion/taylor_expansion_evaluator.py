@@ -0,0 +1,179 @@
+#from fpctoolkit.structure_prediction.taylor_expansion.taylor_expansion_evaluator import TaylorExpansionEvaluator
+
+import numpy as np
+
+
+
+
+class TaylorExpansionEvaluator(object):
+	"""
+	Numeric evaluator for a taylor expansion whose derivative coefficients are known. The accepted terms are compiled once into an exponent matrix
+	(one row per term, one column per variable, holding each term's derivative_array) and a coefficient vector (term coefficient times derivative
+	coefficient). Energies, gradients and hessians are then evaluated for whole batches of points with numpy.
+
+	Each compiled table row is stored as the list of variable columns it multiplies together (u_1^2*e_3 becomes [u_1, u_1, e_3, 1]), so a
+	monomial costs at most four multiplies per point whatever the number of variables. The gradient and hessian tables are built the same way by
+	differentiating each row analytically.
+
+	Points are given as variable values arrays of shape (K, V), ordered as taylor_expansion.variables_list. Use get_variable_values to pull
+	them out of eigen chromosomes (strain variable i is chromosome component i, displacement variable i is component 6+i) and
+	get_eigen_chromosomes to go back.
+
+	Usage:
+		evaluator = TaylorExpansionEvaluator(taylor_expansion)
+		energies = evaluator.get_energies(evaluator.get_variable_values(eigen_chromosomes))
+	"""
+
+	chunk_size = 20000 #points evaluated at once - bounds the (chunk_size, table rows, order) gather
+
+	def __init__(self, taylor_expansion, derivative_coefficients_list=None):
+		"""
+		derivative_coefficients_list, if given, holds the fitted derivative coefficient of each term in taylor_expansion.expansion_terms_list.
+		Otherwise each term's derivative_coefficient attribute is used, and all of them must be set.
+		"""
+
+		self.variables_list = taylor_expansion.variables_list
+		self.variable_count = len(self.variables_list)
+
+		expansion_terms_list = taylor_expansion.expansion_terms_list
+
+		if derivative_coefficients_list == None:
+			derivative_coefficients_list = [expansion_term.derivative_coefficient for expansion_term in expansion_terms_list]
+
+		if len(derivative_coefficients_list) != len(expansion_terms_list):
+			raise Exception("Number of derivative coefficients does not match number of expansion terms.", len(derivative_coefficients_list), len(expansion_terms_list))
+
+		for i, derivative_coefficient in enumerate(derivative_coefficients_list):
+			if derivative_coefficient == None:
+				raise Exception("Derivative coefficient of expansion term is not set.", str(expansion_terms_list[i]))
+
+		self.exponent_matrix = np.array([expansion_term.derivative_array for expansion_term in expansion_terms_list], dtype=int).reshape(-1, self.variable_count)
+		self.coefficients = np.array([expansion_term.coefficient for expansion_term in expansion_terms_list], dtype=np.float64)*np.array(derivative_coefficients_list, dtype=np.float64)
+
+		self.chromosome_indices = np.array([variable.index + (6 if variable.type_string == 'displacement' else 0) for variable in self.variables_list], dtype=int)
+
+		self.energy_table = self.get_compiled_table(self.exponent_matrix, self.coefficients, np.zeros(len(self.coefficients), dtype=int), 1)
+
+		gradient_exponent_matrix, gradient_coefficients, gradient_output_indices = self.get_differentiated_rows(self.exponent_matrix, self.coefficients, np.zeros(len(self.coefficients), dtype=int))
+		self.gradient_table = self.get_compiled_table(gradient_exponent_matrix, gradient_coefficients, gradient_output_indices, self.variable_count)
+
+		hessian_exponent_matrix, hessian_coefficients, hessian_output_indices = self.get_differentiated_rows(gradient_exponent_matrix, gradient_coefficients, gradient_output_indices)
+		self.hessian_table = self.get_compiled_table(hessian_exponent_matrix, hessian_coefficients, hessian_output_indices, self.variable_count**2)
+
+
+	def get_differentiated_rows(self, exponent_matrix, coefficients, output_indices):
+		"""
+		Differentiates each row (coefficient*prod x_v^exponent_v, summed into output output_indices) with respect to every variable it contains.
+		Returns (exponent_matrix, coefficients, output_indices) of the derivative rows, where the row for d/dx_v lands in output
+		output_indices*variable_count + v.
+		"""
+
+		row_indices, variable_indices = np.nonzero(exponent_matrix)
+
+		differentiated_exponent_matrix = exponent_matrix[row_indices].copy()
+		differentiated_exponent_matrix[np.arange(len(row_indices)), variable_indices] -= 1
+
+		differentiated_coefficients = coefficients[row_indices]*exponent_matrix[row_indices, variable_indices]
+		differentiated_output_indices = output_indices[row_indices]*self.variable_count + variable_indices
+
+		return (differentiated_exponent_matrix, differentiated_coefficients, differentiated_output_indices)
+
+	def get_compiled_table(self, exponent_matrix, coefficients, output_indices, output_count):
+		"""
+		Returns (factor_indices, scatter_matrix) for the rows. factor_indices is (R, maximum order) and lists the variable column each row multiplies
+		by, padded with column variable_count (which always holds 1.0). scatter_matrix is (R, output_count) and adds coefficient*monomial of each
+		row into its output.
+		"""
+
+		maximum_order = max(1, int(np.max(np.sum(exponent_matrix, axis=1)))) if len(exponent_matrix) > 0 else 1
+
+		factor_indices = np.full((len(exponent_matrix), maximum_order), self.variable_count, dtype=int)
+
+		for r, exponents in enumerate(exponent_matrix):
+			row_factor_indices = np.repeat(np.arange(self.variable_count), exponents)
+			factor_indices[r, :len(row_factor_indices)] = row_factor_indices
+
+		scatter_matrix = np.zeros((len(exponent_matrix), output_count))
+		np.add.at(scatter_matrix, (np.arange(len(exponent_matrix)), output_indices), coefficients)
+
+		return (factor_indices, scatter_matrix)
+
+	def evaluate_table(self, table, variable_values):
+		"""
+		Returns the (K, output_count) sums of the table's rows evaluated at each of the (K, V) variable_values.
+		"""
+
+		factor_indices, scatter_matrix = table
+
+		variable_values = self.get_validated_variable_values(variable_values)
+
+		outputs = np.zeros((len(variable_values), scatter_matrix.shape[1]))
+
+		for start in range(0, len(variable_values), self.chunk_size):
+			padded_values = np.ones((len(variable_values[start:start+self.chunk_size]), self.variable_count + 1))
+			padded_values[:, :self.variable_count] = variable_values[start:start+self.chunk_size]
+
+			monomials = np.prod(padded_values[:, factor_indices], axis=2)
+
+			outputs[start:start+len(padded_values)] = np.dot(monomials, scatter_matrix)
+
+		return outputs
+
+	def get_validated_variable_values(self, variable_values):
+		variable_values = np.asarray(variable_values, dtype=np.float64)
+
+		if variable_values.ndim != 2 or variable_values.shape[1] != self.variable_count:
+			raise Exception("Variable values should have shape (K, number of variables).", variable_values.shape, self.variable_count)
+
+		return variable_values
+
+
+	def get_energies(self, variable_values):
+		"""
+		Returns the (K,) energies of the expansion at each row of the (K, V) variable_values.
+		"""
+
+		return self.evaluate_table(self.energy_table, variable_values)[:, 0]
+
+	def get_gradients(self, variable_values):
+		"""
+		Returns the (K, V) gradients of the energy with respect to the variables.
+		"""
+
+		return self.evaluate_table(self.gradient_table, variable_values)
+
+	def get_hessians(self, variable_values):
+		"""
+		Returns the (K, V, V) second derivatives of the energy with respect to the variables.
+		"""
+
+		return self.evaluate_table(self.hessian_table, variable_values).reshape(-1, self.variable_count, self.variable_count)
+
+
+	def get_variable_values(self, eigen_chromosomes):
+		"""
+		Returns the (K, V) variable values held in the (K, C) eigen_chromosomes. Components past the end of a short chromosome are taken as zero.
+		"""
+
+		eigen_chromosomes = np.atleast_2d(np.asarray(eigen_chromosomes, dtype=np.float64))
+
+		padded_eigen_chromosomes = np.zeros((len(eigen_chromosomes), max(eigen_chromosomes.shape[1], np.max(self.chromosome_indices) + 1)))
+		padded_eigen_chromosomes[:, :eigen_chromosomes.shape[1]] = eigen_chromosomes
+
+		return padded_eigen_chromosomes[:, self.chromosome_indices]
+
+	def get_eigen_chromosomes(self, variable_values, chromosome_length=None):
+		"""
+		Returns (K, chromosome_length) eigen chromosomes with the variable values in their components and zeros elsewhere. chromosome_length
+		defaults to the shortest length holding every variable.
+		"""
+
+		variable_values = self.get_validated_variable_values(variable_values)
+
+		if chromosome_length == None:
+			chromosome_length = np.max(self.chromosome_indices) + 1
+
+		eigen_chromosomes = np.zeros((len(variable_values), chromosome_length))
+		eigen_chromosomes[:, self.chromosome_indices] = variable_values
+
+		return eigen_chromosomes
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure_prediction.taylor_expansion.variable import Variable
+from fpctoolkit.structure_prediction.taylor_expansion.taylor_expansion import TaylorExpansion
+from fpctoolkit.structure_prediction.taylor_expansion.taylor_expansion_evaluator import TaylorExpansionEvaluator
+from fpctoolkit.structure_prediction.taylor_expansion.minima_finder import MinimaFinder
+from fpctoolkit.io.file import File
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	def setUp(self):
+		taylor_expansion = TaylorExpansion([Variable('displacement', 0), Variable('displacement', 1)], lambda expansion_term: expansion_term.order > 1)
+
+		#double well in each variable: -u_1^2 - u_2^2 + u_1^4 + u_2^4, with four minima at u_1, u_2 = +-1/sqrt(2)
+		energy_coefficients_dictionary = {(2, 0): -1.0, (0, 2): -1.0, (4, 0): 1.0, (0, 4): 1.0}
+
+		for expansion_term in taylor_expansion.expansion_terms_list:
+			energy_coefficient = energy_coefficients_dictionary.get(tuple(expansion_term.derivative_array), 0.0)
+			expansion_term.derivative_coefficient = energy_coefficient/expansion_term.coefficient
+
+		self.minima_finder = MinimaFinder(TaylorExpansionEvaluator(taylor_expansion), variable_bounds_dictionary={'displacement': 1.5})
+		self.expected_minima = np.array([[a, b] for a in [-1.0, 1.0] for b in [-1.0, 1.0]])/np.sqrt(2.0)
+
+		self.temporary_directory_path = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.temporary_directory_path)
+
+	def get_sorted_rows(self, array):
+		return array[np.lexsort(np.round(array, 6).T[::-1])]
+
+	def test_find_minima(self):
+		energies = self.minima_finder.find_minima(starting_point_count=200, seed=0, process_count=1)
+
+		self.assertEqual(len(energies), 4)
+		self.assertTrue(np.allclose(energies, -0.5))
+		self.assertTrue(np.allclose(self.get_sorted_rows(self.minima_finder.minima_variable_values), self.expected_minima, atol=1e-6))
+
+		starting_variable_values = self.minima_finder.get_random_starting_variable_values(200, seed=0)
+		pool_energies = self.minima_finder.find_minima(starting_variable_values, process_count=2)
+
+		self.assertTrue(np.allclose(pool_energies, energies))
+		self.assertTrue(np.allclose(self.get_sorted_rows(self.minima_finder.minima_variable_values), self.expected_minima, atol=1e-6))
+
+		#starting on the maximum and on saddles gives no minima
+		self.assertEqual(len(self.minima_finder.relax([[0.0, 0.0], [0.0, 1.0/np.sqrt(2.0)]])[0]), 0)
+
+	def test_eigen_chromosome_energy_pairs_file(self):
+		self.minima_finder.find_minima(starting_point_count=100, seed=1, process_count=1)
+
+		file_path = Path.join(self.temporary_directory_path, 'minima')
+		self.minima_finder.write_eigen_chromosome_energy_pairs_file(file_path)
+
+		eigen_chromosome_energy_pairs_list = []
+
+		for line in File(file_path): #parsed as MinimaRelaxer does
+			energy_difference = float((line.strip()).split(',')[0])
+			eigen_chromosome = [float(x) for x in (line.strip()).split(',')[1].split(' ')[1:]]
+
+			eigen_chromosome_energy_pairs_list.append([energy_difference, eigen_chromosome])
+
+		self.assertEqual(len(eigen_chromosome_energy_pairs_list), 4)
+
+		for i, (energy_difference, eigen_chromosome) in enumerate(eigen_chromosome_energy_pairs_list):
+			self.assertEqual(energy_difference, self.minima_finder.minima_energies[i])
+			self.assertEqual(len(eigen_chromosome), 8)
+			self.assertEqual(eigen_chromosome[:6], [0.0]*6)
+			self.assertEqual(eigen_chromosome[6:], self.minima_finder.minima_variable_values[i].tolist())
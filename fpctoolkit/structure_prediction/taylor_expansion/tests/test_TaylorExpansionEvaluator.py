@@ -0,0 +1,88 @@
+import numpy as np
+from unittest2 import TestCase
+
+from fpctoolkit.structure_prediction.taylor_expansion.variable import Variable
+from fpctoolkit.structure_prediction.taylor_expansion.taylor_expansion import TaylorExpansion
+from fpctoolkit.structure_prediction.taylor_expansion.taylor_expansion_evaluator import TaylorExpansionEvaluator
+
+class Test(TestCase):
+
+	def setUp(self):
+		variables_list = [Variable('strain', 2), Variable('strain', 3)] + [Variable('displacement', i, centrosymmetry=True) for i in range(3)]
+
+		def term_acceptance_function(expansion_term):
+			if expansion_term.order == 1:
+				return False
+			if expansion_term.is_pure_type('strain') and expansion_term.order > 2:
+				return False
+			if expansion_term.is_centrosymmetric():
+				return False
+			if expansion_term.order == 4 and not expansion_term.has_single_variable():
+				return False
+
+			return True
+
+		self.taylor_expansion = TaylorExpansion(variables_list, term_acceptance_function)
+
+		random_state = np.random.RandomState(0)
+
+		for expansion_term in self.taylor_expansion.expansion_terms_list:
+			expansion_term.derivative_coefficient = random_state.uniform(-1.0, 1.0)
+
+		self.evaluator = TaylorExpansionEvaluator(self.taylor_expansion)
+		self.variable_values = random_state.uniform(-1.0, 1.0, size=(6, 5))
+
+	def get_energy_by_direct_sum(self, variable_values):
+		energy = 0.0
+
+		for expansion_term in self.taylor_expansion.expansion_terms_list:
+			monomial = np.prod([variable_values[i]**exponent for i, exponent in enumerate(expansion_term.derivative_array)])
+			energy += expansion_term.coefficient*expansion_term.derivative_coefficient*monomial
+
+		return energy
+
+	def test_energies(self):
+		energies = self.evaluator.get_energies(self.variable_values)
+
+		self.assertEqual(energies.shape, (6,))
+		self.assertTrue(np.allclose(energies, [self.get_energy_by_direct_sum(x) for x in self.variable_values]))
+
+		derivative_coefficients_list = [2.0*expansion_term.derivative_coefficient for expansion_term in self.taylor_expansion.expansion_terms_list]
+		self.assertTrue(np.allclose(TaylorExpansionEvaluator(self.taylor_expansion, derivative_coefficients_list).get_energies(self.variable_values), 2.0*energies))
+
+		with self.assertRaises(Exception):
+			self.evaluator.get_energies(self.variable_values[:, :4])
+
+	def test_gradients_and_hessians(self):
+		step = 1e-5
+		steps = step*np.eye(5)
+
+		gradients = self.evaluator.get_gradients(self.variable_values)
+		hessians = self.evaluator.get_hessians(self.variable_values)
+
+		self.assertEqual(gradients.shape, (6, 5))
+		self.assertEqual(hessians.shape, (6, 5, 5))
+
+		for k, x in enumerate(self.variable_values):
+			finite_difference_gradient = [(self.get_energy_by_direct_sum(x + steps[v]) - self.get_energy_by_direct_sum(x - steps[v]))/(2.0*step) for v in range(5)]
+			finite_difference_hessian = (self.evaluator.get_gradients(x + steps) - self.evaluator.get_gradients(x - steps))/(2.0*step)
+
+			self.assertTrue(np.allclose(gradients[k], finite_difference_gradient, atol=1e-6))
+			self.assertTrue(np.allclose(hessians[k], finite_difference_hessian, atol=1e-6))
+
+		self.assertTrue(np.allclose(hessians, hessians.transpose(0, 2, 1)))
+
+	def test_eigen_chromosomes(self):
+		eigen_chromosomes = self.evaluator.get_eigen_chromosomes(self.variable_values)
+
+		self.assertEqual(eigen_chromosomes.shape, (6, 9))
+		self.assertTrue(np.all(eigen_chromosomes[:, [0, 1, 4, 5]] == 0.0))
+		self.assertTrue(np.allclose(eigen_chromosomes[:, [2, 3, 6, 7, 8]], self.variable_values))
+
+		self.assertTrue(np.allclose(self.evaluator.get_variable_values(eigen_chromosomes), self.variable_values))
+		self.assertEqual(self.evaluator.get_eigen_chromosomes(self.variable_values, chromosome_length=12).shape, (6, 12))
+
+		#components past the end of a short chromosome are zero
+		short_variable_values = self.evaluator.get_variable_values(eigen_chromosomes[:, :8])
+		self.assertTrue(np.allclose(short_variable_values[:, :4], self.variable_values[:, :4]))
+		self.assertTrue(np.all(short_variable_values[:, 4] == 0.0))
@@ -1,6 +1,7 @@
 #from fpctoolkit.util.math.vector import Vector
 
 import numpy as np
+import math
 
 
 
@@ -71,15 +72,19 @@ class Vector(object):
 		No clipping is performed to keep in unit cell.
 		"""
 
-		a = lattice[0]
-		b = lattice[1]
-		c = lattice[2]
-
-		A = np.array([[a[0], b[0], c[0]], [a[1], b[1], c[1]], [a[2], b[2], c[2]]])
 		X = np.array([cartesian_vector[0], cartesian_vector[1], cartesian_vector[2]])
 
-		A_inverse = np.linalg.inv(A)
-		d = np.dot(A_inverse, X)
+		if hasattr(lattice, 'get_inverse_matrix'): #Lattice instances cache the inverse
+			d = np.dot(X, lattice.get_inverse_matrix())
+		else:
+			a = lattice[0]
+			b = lattice[1]
+			c = lattice[2]
+
+			A = np.array([[a[0], b[0], c[0]], [a[1], b[1], c[1]], [a[2], b[2], c[2]]])
+
+			A_inverse = np.linalg.inv(A)
+			d = np.dot(A_inverse, X)
 
 		return Vector([d[0], d[1], d[2]])
 
@@ -123,10 +128,10 @@ class Vector(object):
 		"""
 
 		for i in range(3):
-			while coordinate[i] >= 1.0:
+			coordinate[i] -= math.floor(coordinate[i])
+
+			if coordinate[i] >= 1.0: #guards against x - floor(x) rounding up to 1.0 for tiny negative x
 				coordinate[i] -= 1.0
-			while coordinate[i] < 0.0:
-				coordinate[i] += 1.0
 
 	@staticmethod
 	def put_fractional_coordinate_nearest_to_origin(coordinate):
@@ -135,79 +140,141 @@ class Vector(object):
 		"""
 
 		for i in range(3):
-			while coordinate[i] > 0.5:
-				coordinate[i] -= 1.0
-			while coordinate[i] <= -0.5:
-				coordinate[i] += 1.0
+			coordinate[i] -= math.ceil(coordinate[i] - 0.5)
 
 	@staticmethod
-	def get_minimum_distance_between_two_periodic_points(fractional_coordinate_1, fractional_coordinate_2, lattice, N_max=3, return_vector=False):
+	def get_lattice_matrix(lattice):
+		"""
+		Returns the 3x3 numpy lattice matrix (lattice vectors as rows) for a Lattice instance (cached) or a 3x3 2D array.
 		"""
-		Given periodic boundary conditions specified by lattice and positions 1 and 2 in 
-		fractional coordinates, return the shortest distance between these two points
 
-		N_max controls how many images out to search - in general, need a higher N max for lattices with larger a*c b*c and a*b dot products
-		Scales (2.0*N_max)^3 in computing time though!
+		if hasattr(lattice, 'get_matrix'):
+			return lattice.get_matrix()
+		else:
+			return np.array([lattice[0], lattice[1], lattice[2]], dtype=np.float64)
 
-		If return_vector, (min_dist_float, min_dist_vector_in_direct_coords) tuple is returned
+	@staticmethod
+	def get_image_shift_table(lattice):
 		"""
+		Returns a (K, 3) numpy array of the integer lattice translations that can hold the minimum image of any fractional difference vector
+		already wrapped into [-0.5, 0.5] (in each component). The table is found from the lattice instead of a fixed N_max, so it is exact for
+		heavily sheared cells and small for nearly orthogonal ones:
 
-		#first, normalize fractional coordinate components to be within 0.0 and 1.0
-		Vector.normalize_fractional_coordinate(fractional_coordinate_1)
-		Vector.normalize_fractional_coordinate(fractional_coordinate_2)
+		A wrapped difference has cartesian length at most R, the longest half-diagonal of the cell. The minimum image is no longer than that,
+		so along lattice direction i it is at most R*|column i of L^-1| in fractional units, which bounds |n_i|. Translations n with |n.L| > 2R
+		are then dropped, since d - n.L is longer than R for every wrapped d.
+		"""
+
+		lattice_matrix = Vector.get_lattice_matrix(lattice)
+		inverse_lattice_matrix = np.linalg.inv(lattice_matrix)
+
+		corner_signs = np.array([[sa, sb, sc] for sa in [-0.5, 0.5] for sb in [-0.5, 0.5] for sc in [-0.5, 0.5]])
+		half_diagonal_length = np.max(np.linalg.norm(np.dot(corner_signs, lattice_matrix), axis=1))
+
+		N_maxes = np.floor(0.5 + half_diagonal_length*np.linalg.norm(inverse_lattice_matrix, axis=0) + 1e-8).astype(int)
+
+		image_shifts = np.array([[na, nb, nc] for na in range(-N_maxes[0], N_maxes[0]+1) for nb in range(-N_maxes[1], N_maxes[1]+1) for nc in range(-N_maxes[2], N_maxes[2]+1)], dtype=np.float64)
+
+		shift_lengths = np.linalg.norm(np.dot(image_shifts, lattice_matrix), axis=1)
+
+		return image_shifts[shift_lengths <= 2.0*half_diagonal_length + 1e-8]
+
+	@staticmethod
+	def get_minimum_image_distances_and_vectors_of_fractional_differences(fractional_differences, lattice, image_shift_table=None, maximum_chunk_size=1000000):
+		"""
+		For an (..., 3) array of fractional (direct) difference vectors, returns (distances, vectors), where distances (...) holds the cartesian
+		length of the shortest periodic image of each difference and vectors (..., 3) holds that image in direct coordinates.
+
+		The work is done in chunks of rows so that at most about maximum_chunk_size (row, image) pairs are held at once.
+		"""
+
+		lattice_matrix = Vector.get_lattice_matrix(lattice)
+
+		if image_shift_table is None:
+			if hasattr(lattice, 'get_image_shift_table'): #Lattice instances cache the table
+				image_shift_table = lattice.get_image_shift_table()
+			else:
+				image_shift_table = Vector.get_image_shift_table(lattice)
+
+		cartesian_image_shift_table = np.dot(image_shift_table, lattice_matrix)
+
+		fractional_differences = np.asarray(fractional_differences, dtype=np.float64)
+		output_shape = fractional_differences.shape[:-1]
+
+		wrapped_differences = fractional_differences.reshape(-1, 3)
+		wrapped_differences = wrapped_differences - np.round(wrapped_differences)
+		cartesian_wrapped_differences = np.dot(wrapped_differences, lattice_matrix)
+
+		row_count = len(wrapped_differences)
+		chunk_size = max(1, maximum_chunk_size//len(image_shift_table))
 
-		#Now, both coordinates are contained within the same cell
+		distances = np.empty(row_count)
+		minimum_image_indices = np.empty(row_count, dtype=int)
 
-		d = np.array([fractional_coordinate_2[0] - fractional_coordinate_1[0], fractional_coordinate_2[1] - fractional_coordinate_1[1], fractional_coordinate_2[2] - fractional_coordinate_1[2]])
+		for start_index in range(0, row_count, chunk_size):
+			cartesian_chunk = cartesian_wrapped_differences[start_index:start_index+chunk_size]
 
-		# print "Original d: ", d
+			candidate_distances_squared = np.sum((cartesian_chunk[:, np.newaxis, :] - cartesian_image_shift_table[np.newaxis, :, :])**2, axis=2)
 
-		Vector.put_fractional_coordinate_nearest_to_origin(d) #Want to center the relative distance vector
+			chunk_minimum_image_indices = np.argmin(candidate_distances_squared, axis=1)
 
-		# print "Shifted d: ", d
+			minimum_image_indices[start_index:start_index+chunk_size] = chunk_minimum_image_indices
+			distances[start_index:start_index+chunk_size] = np.sqrt(candidate_distances_squared[np.arange(len(cartesian_chunk)), chunk_minimum_image_indices])
 
-		a = np.array(lattice[0])
-		b = np.array(lattice[1])
-		c = np.array(lattice[2])
+		vectors = wrapped_differences - image_shift_table[minimum_image_indices]
 
-		A = np.dot(a, a)
-		B = np.dot(b, b)
-		C = np.dot(c, c)
+		return (distances.reshape(output_shape), vectors.reshape(output_shape + (3,)))
 
-		D = 2*np.dot(a, b)
-		E = 2*np.dot(a, c)
-		F = 2*np.dot(b, c)
+	@staticmethod
+	def get_all_pairs_minimum_image_distances_and_vectors(fractional_coordinates_1, fractional_coordinates_2, lattice):
+		"""
+		fractional_coordinates_1 is (N, 3) and fractional_coordinates_2 is (M, 3) (direct coordinates). Returns (distances, vectors), where
+		distances[i][j] (N, M) is the shortest periodic distance from point i of the first set to point j of the second, and vectors[i][j]
+		(N, M, 3) is the corresponding shortest vector (pointing from 1 to 2) in direct coordinates.
+		"""
+
+		fractional_coordinates_1 = np.asarray(fractional_coordinates_1, dtype=np.float64).reshape(-1, 3)
+		fractional_coordinates_2 = np.asarray(fractional_coordinates_2, dtype=np.float64).reshape(-1, 3)
 
-		#This gives magnitude squared of distance vector as a function of fractional coordinates (fa, fb, fc)
-		def G(fa, fb, fc): return A*fa**2 + B*fb**2 + C*fc**2 + D*fa*fb + E*fa*fc + F*fb*fc
+		fractional_differences = fractional_coordinates_2[np.newaxis, :, :] - fractional_coordinates_1[:, np.newaxis, :]
 
-		fa = d[0]
-		fb = d[1]
-		fc = d[2]
+		return Vector.get_minimum_image_distances_and_vectors_of_fractional_differences(fractional_differences, lattice)
 
-		minimum_distance_squared = G(fa - N_max, fb - N_max, fc - N_max)
-		minimum_distance_vector_in_direct_coordinates = [fa - N_max, fb - N_max, fc - N_max]
-		#min_set = [N_max]*3
+	@staticmethod
+	def get_paired_minimum_image_distances_and_vectors(fractional_coordinates_1, fractional_coordinates_2, lattice):
+		"""
+		Like get_all_pairs_minimum_image_distances_and_vectors, but only pairs row i of fractional_coordinates_1 with row i of
+		fractional_coordinates_2 (both (N, 3)). Returns (N,) distances and (N, 3) direct vectors.
+		"""
 
-		for Na in range(-N_max, N_max + 1):
-			for Nb in range(-N_max, N_max + 1):
-				for Nc in range(-N_max, N_max + 1):
-					distance_squared = G(fa - Na, fb - Nb, fc - Nc)
+		fractional_differences = np.asarray(fractional_coordinates_2, dtype=np.float64).reshape(-1, 3) - np.asarray(fractional_coordinates_1, dtype=np.float64).reshape(-1, 3)
 
-					if distance_squared < minimum_distance_squared:
-						minimum_distance_squared = distance_squared
-						minimum_distance_vector_in_direct_coordinates = [fa - Na, fb - Nb, fc - Nc]
-						#min_set = [Na, Nb, Nc]
+		return Vector.get_minimum_image_distances_and_vectors_of_fractional_differences(fractional_differences, lattice)
 
+	@staticmethod
+	def get_minimum_distance_between_two_periodic_points(fractional_coordinate_1, fractional_coordinate_2, lattice, N_max=3, return_vector=False):
+		"""
+		Given periodic boundary conditions specified by lattice and positions 1 and 2 in 
+		fractional coordinates, return the shortest distance between these two points
+
+		N_max is no longer used - the images searched are found from the lattice (see get_image_shift_table), which is exact for any shear.
+		For many points, use get_all_pairs_minimum_image_distances_and_vectors.
+
+		If return_vector, (min_dist_float, min_dist_vector_in_direct_coords) tuple is returned
+		"""
+
+		#first, normalize fractional coordinate components to be within 0.0 and 1.0
+		Vector.normalize_fractional_coordinate(fractional_coordinate_1)
+		Vector.normalize_fractional_coordinate(fractional_coordinate_2)
 
+		d = [fractional_coordinate_2[i] - fractional_coordinate_1[i] for i in range(3)]
 
-		#print A, B, C, D, E, F
-		#print "Min set ", min_set
+		distances, vectors = Vector.get_minimum_image_distances_and_vectors_of_fractional_differences(d, lattice)
 
 		if return_vector:
-			return (minimum_distance_squared**0.5, minimum_distance_vector_in_direct_coordinates)
+			return (float(distances), vectors.tolist())
 		else:
-			return minimum_distance_squared**0.5
+			return float(distances)
 
 
 
@@ -2,6 +2,8 @@
 
 from datetime import datetime
 
+import numpy as np
+
 """
 Functions in this file operate on strings as auxiliary methods.
 """
@@ -90,3 +92,29 @@ def get_number_list_from_string(string_of_numbers):
 	return number_list
 
 
+def get_number_array_from_lines(lines_list, column_count, skipped_column_count=0):
+	"""
+	Parses a block of lines, each containing column_count numbers separated by whitespace, into a numpy array of
+	shape (len(lines_list), column_count) in one call. The first skipped_column_count whitespace-separated tokens
+	of each line (row labels like '1X' or 'ion') are dropped before parsing.
+
+	["  1X   -9.12   0.0", "  1Y   0.0   -9.12"] with column_count=2, skipped_column_count=1 returns array([[-9.12, 0.0], [0.0, -9.12]])
+
+	Raises an exception if the number of values parsed does not match the expected shape.
+	"""
+
+	if skipped_column_count > 0:
+		stripped_lines_list = []
+
+		for line in lines_list:
+			components_list = line.split(None, skipped_column_count)
+			stripped_lines_list.append(components_list[skipped_column_count] if len(components_list) > skipped_column_count else '')
+
+		lines_list = stripped_lines_list
+
+	number_array = np.fromstring(" ".join(lines_list), dtype=np.float64, sep=' ')
+
+	if number_array.size != len(lines_list)*column_count:
+		raise Exception("Cannot coerce lines to a numerical array of shape", (len(lines_list), column_count), "- found", number_array.size, "values.")
+
+	return number_array.reshape(len(lines_list), column_count)
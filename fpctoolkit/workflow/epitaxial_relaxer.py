@@ -150,8 +150,8 @@ class EpitaxialRelaxer(object):
 						self.data_dictionaries[structure_tag][misfit_strain][-1]['path'] = relaxation.path + '/static'
 						self.data_dictionaries[structure_tag][misfit_strain][-1]['lattice_parameters'] = final_structure.get_magnitudes_and_angles()
 
-						for symprec in spg_symprecs:
-							self.data_dictionaries[structure_tag][misfit_strain][-1]['spg_' + str(symprec)] = final_structure.get_spacegroup_string(symprec)
+						for symprec, spacegroup_string in zip(spg_symprecs, final_structure.get_spacegroup_strings(spg_symprecs)):
+							self.data_dictionaries[structure_tag][misfit_strain][-1]['spg_' + str(symprec)] = spacegroup_string
 
 				print 
 
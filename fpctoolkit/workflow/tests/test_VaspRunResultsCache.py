@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from unittest2 import TestCase
+
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.workflow.vasp_run_results_cache import VaspRunResultsCache
+from fpctoolkit.util.path import Path
+
+class Test(TestCase):
+
+	io_data_path = Path.clean(os.path.dirname(__file__), '..', '..', 'io', 'vasp', 'tests')
+
+	def setUp(self):
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+
+		self.run_path = tempfile.mkdtemp()
+
+		shutil.copy(Path.join(self.__class__.io_data_path, 'data_Outcar', 'outcar'), Path.join(self.run_path, 'OUTCAR'))
+		shutil.copy(Path.join(self.__class__.io_data_path, 'data_Poscar', 'poscar_small'), Path.join(self.run_path, 'CONTCAR'))
+
+		self.results_cache = VaspRunResultsCache(self.run_path)
+
+	def tearDown(self):
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+		shutil.rmtree(self.run_path)
+
+	def test_round_trip(self):
+		outcar = Outcar(Path.join(self.run_path, 'OUTCAR'))
+		contcar_structure = Structure(Path.join(self.run_path, 'CONTCAR'))
+
+		results_dictionary = self.results_cache.get_results()
+
+		self.assertTrue(Path.exists(self.results_cache.cache_path))
+		self.assertEqual(results_dictionary['energy'], outcar.energy)
+		self.assertEqual(results_dictionary['forces_list'], outcar.final_forces_list)
+		self.assertEqual(results_dictionary['species_list'], contcar_structure.get_species_list())
+
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+
+		self.assertEqual(self.results_cache.read_from_sidecar(self.results_cache.get_source_signature()), results_dictionary)
+		self.assertEqual(self.results_cache.get_results(), results_dictionary)
+
+		final_structure = self.results_cache.get_final_structure()
+		self.assertEqual(final_structure.get_coordinates_list(), contcar_structure.get_coordinates_list())
+		self.assertEqual(final_structure.lattice.to_array(), contcar_structure.lattice.to_array())
+
+	def test_invalidation(self):
+		results_dictionary = self.results_cache.get_results()
+
+		#a restarted run changes the OUTCAR size and modification time
+		outcar_path = Path.join(self.run_path, 'OUTCAR')
+		with open(outcar_path, 'ab') as file:
+			file.write(" \n")
+		os.utime(outcar_path, (0.0, 0.0))
+
+		source_signature = self.results_cache.get_source_signature()
+
+		self.assertEqual(self.results_cache.read_from_sidecar(source_signature), None)
+		self.assertEqual(self.results_cache.get_results()['energy'], results_dictionary['energy'])
+		self.assertEqual(self.results_cache.read_from_sidecar(source_signature)['energy'], results_dictionary['energy']) #rewritten
+
+	def test_incomplete_run(self):
+		outcar_path = Path.join(self.run_path, 'OUTCAR')
+		lines = open(outcar_path).readlines()
+
+		with open(outcar_path, 'wb') as file:
+			file.write("".join(lines[0:len(lines)/2]))
+
+		self.assertEqual(self.results_cache.get_results(), None)
+		self.assertEqual(self.results_cache.get_final_structure(), None)
+		self.assertFalse(Path.exists(self.results_cache.cache_path))
+
+	def test_corrupt_sidecar(self):
+		energy = self.results_cache.get_results()['energy']
+
+		with open(self.results_cache.cache_path, 'r+b') as file:
+			file.truncate(1000)
+
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+
+		self.assertEqual(self.results_cache.read_from_sidecar(self.results_cache.get_source_signature()), None)
+		self.assertEqual(self.results_cache.get_results()['energy'], energy)
+		self.assertEqual(self.results_cache.read_from_sidecar(self.results_cache.get_source_signature())['energy'], energy) #rewritten
+
+		with open(self.results_cache.cache_path, 'wb') as file:
+			file.write("not an npz file")
+
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+
+		self.assertEqual(self.results_cache.get_results()['energy'], energy)
+
+	def test_unwritable_sidecar(self):
+		os.mkdir(self.results_cache.cache_path + '.tmp') #opening the temporary file for writing fails
+
+		VaspRunResultsCache.loaded_results_dictionary.clear()
+
+		self.assertEqual(self.results_cache.get_results()['energy'], Outcar(Path.join(self.run_path, 'OUTCAR')).energy)
+		self.assertFalse(Path.exists(self.results_cache.cache_path))
@@ -9,6 +9,7 @@ from fpctoolkit.io.vasp.poscar import Poscar
 from fpctoolkit.io.vasp.incar import Incar
 from fpctoolkit.structure.structure import Structure
 from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.workflow.vasp_run_results_cache import VaspRunResultsCache
 from fpctoolkit.util.path import Path
 from fpctoolkit.util.queue_adapter import QueueAdapter, QueueStatus
 import fpctoolkit.util.string_util as su
@@ -158,12 +159,7 @@ class VaspCalculation(object):
 
 	@property
 	def complete(self):
-		outcar = self.outcar
-
-		if outcar:
-			return outcar.complete
-		else:
-			return False
+		return Outcar.is_complete_at_path(Path.clean(self.path, 'OUTCAR'))
 
 	@property
 	def queue_properties(self):
@@ -194,16 +190,10 @@ class VaspCalculation(object):
 
 	@property
 	def final_structure(self):
-		if Path.exists(self.get_extended_path('./CONTCAR')) and self.complete:
-			return Structure(self.get_extended_path('./CONTCAR'))
-		else:
-			return None
+		return VaspRunResultsCache(self.path).get_final_structure()
 
 	def get_final_structure(self):
-		if Path.exists(self.get_extended_path('./CONTCAR')) and self.complete:
-			return Structure(self.get_extended_path('./CONTCAR'))
-		else:
-			return None
+		return VaspRunResultsCache(self.path).get_final_structure()
 
 	@property
 	def incar(self):
@@ -237,12 +227,20 @@ class VaspCalculation(object):
 		else:
 			return None
 
+	@property
+	def results_dictionary(self):
+		"""Parsed final results of the run (see VaspRunResultsCache.get_results), or None if the run is not complete"""
+
+		return VaspRunResultsCache(self.path).get_results()
+
 	def get_final_energy(self, per_atom=True):
-		if self.complete:
+		results_dictionary = self.results_dictionary
+
+		if results_dictionary:
 			if per_atom:
-				return self.outcar.energy_per_atom
+				return results_dictionary['energy_per_atom']
 			else:
-				return self.outcar.energy
+				return results_dictionary['energy']
 		else:
 			return None
 
@@ -251,8 +249,10 @@ class VaspCalculation(object):
 		Returns list of forces - one for each x, y, z component of each atom, ordered by poscar position.
 		"""
 
-		if self.complete:
-			return self.outcar.final_forces_list
+		results_dictionary = self.results_dictionary
+
+		if results_dictionary and results_dictionary['forces_list'] != None:
+			return list(results_dictionary['forces_list'])
 		else:
 			return None
 
@@ -261,8 +261,10 @@ class VaspCalculation(object):
 	def total_time(self):
 		"""Defaults to cpu*hours for now (best measure of total resources used)"""
 		
-		if self.complete:
-			return self.outcar.get_calculation_time_in_core_hours()
+		results_dictionary = self.results_dictionary
+
+		if results_dictionary:
+			return results_dictionary['total_time']
 		else:
 			return None
 
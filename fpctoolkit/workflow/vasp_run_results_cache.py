@@ -0,0 +1,227 @@
+#from fpctoolkit.workflow.vasp_run_results_cache import VaspRunResultsCache
+
+import os
+import zipfile
+import zlib
+import numpy as np
+
+from fpctoolkit.io.vasp.outcar import Outcar
+from fpctoolkit.structure.structure import Structure
+from fpctoolkit.structure.site_collection import SiteCollection
+from fpctoolkit.structure.site import Site
+from fpctoolkit.util.path import Path
+
+class VaspRunResultsCache(object):
+	"""
+	Compact binary (.npz) sidecar holding the parsed results of a completed vasp run directory, so that the OUTCAR and CONTCAR
+	only ever have to be parsed once. The sidecar is written the first time results are asked for after the run completes and
+	holds the final energy, forces, stresses, lattice, positions, species, and timing of the run.
+
+	The sidecar records the modification time and size of the OUTCAR and CONTCAR it was made from. If either file changes
+	(for instance, the run is restarted), the sidecar is ignored and rewritten. Results loaded in this process are also kept in
+	memory, so repeated lookups on an unchanged run only stat two files.
+
+	The sidecar is only a cache: one that cannot be read (truncated, corrupt) or written (read only directory, full disk) is treated as
+	missing, and the output files are parsed instead.
+
+	Usage:
+		results_cache = VaspRunResultsCache(run_path)
+		results_dictionary = results_cache.get_results() #None if run is not complete
+		results_dictionary['energy'], results_dictionary['forces_list'], ...
+		final_structure = results_cache.get_final_structure()
+	"""
+
+	file_basename = '.run_results.npz'
+	loaded_results_dictionary = {} #maps cache path to (source signature, results dictionary)
+
+	def __init__(self, run_path):
+		self.run_path = Path.clean(run_path)
+		self.cache_path = Path.join(self.run_path, VaspRunResultsCache.file_basename)
+		self.outcar_path = Path.join(self.run_path, 'OUTCAR')
+		self.contcar_path = Path.join(self.run_path, 'CONTCAR')
+
+
+	def get_source_signature(self):
+		"""
+		Returns [outcar_mtime, outcar_size, contcar_mtime, contcar_size]. Missing files contribute -1.0 for both values.
+		"""
+
+		signature = []
+
+		for file_path in [self.outcar_path, self.contcar_path]:
+			try:
+				file_stat = os.stat(file_path)
+				signature += [float(file_stat.st_mtime), float(file_stat.st_size)]
+			except OSError:
+				signature += [-1.0, -1.0]
+
+		return signature
+
+	def get_results(self):
+		"""
+		Returns a dictionary of results for the run, or None if the run is not complete. The dictionary looks like:
+
+		{'energy': total energy (eV), 'energy_per_atom': ..., 'forces_list': [f_1x, f_1y, ..., f_Nz] or None, 'stresses_list': [XX, YY, ZZ, YZ, XZ, XY] or None,
+		 'lattice': 3x3 list or None, 'positions': Nx3 list or None, 'species_list': ['Ba', 'Ti', 'O'], 'species_count_list': [1, 1, 3],
+		 'coordinate_mode': 'Direct', 'total_time': core hours or None}
+
+		Lattice, positions, and species come from the CONTCAR and are None if the run has no CONTCAR.
+		"""
+
+		source_signature = self.get_source_signature()
+
+		if self.cache_path in VaspRunResultsCache.loaded_results_dictionary:
+			loaded_signature, results_dictionary = VaspRunResultsCache.loaded_results_dictionary[self.cache_path]
+
+			if loaded_signature == source_signature:
+				return results_dictionary
+
+		results_dictionary = self.read_from_sidecar(source_signature)
+
+		if results_dictionary == None:
+			if not Outcar.is_complete_at_path(self.outcar_path):
+				return None
+
+			results_dictionary = self.get_results_from_output_files()
+			self.write_to_sidecar(results_dictionary, source_signature)
+
+		VaspRunResultsCache.loaded_results_dictionary[self.cache_path] = (source_signature, results_dictionary)
+
+		return results_dictionary
+
+	def get_final_structure(self):
+		"""
+		Returns the final (CONTCAR) structure rebuilt from the cached results, or None if the run is not complete or has no CONTCAR.
+		"""
+
+		results_dictionary = self.get_results()
+
+		if results_dictionary == None or results_dictionary['positions'] == None:
+			return None
+
+		sites = []
+		position_index = 0
+
+		for species, species_count in zip(results_dictionary['species_list'], results_dictionary['species_count_list']):
+			for i in range(species_count):
+				sites.append(Site({'position': list(results_dictionary['positions'][position_index]), 'coordinate_mode': results_dictionary['coordinate_mode'], 'type': species}))
+				position_index += 1
+
+		return Structure(lattice=results_dictionary['lattice'], sites=SiteCollection(sites))
+
+
+	def get_results_from_output_files(self):
+		"""
+		Parses the OUTCAR and CONTCAR of the completed run into a results dictionary (see get_results).
+		"""
+
+		outcar = Outcar(self.outcar_path)
+
+		results_dictionary = {}
+		results_dictionary['energy'] = outcar.energy
+		results_dictionary['energy_per_atom'] = outcar.energy_per_atom
+		results_dictionary['total_time'] = outcar.get_calculation_time_in_core_hours()
+
+		if outcar.get_line_offsets_containing_string(Outcar.forces_string):
+			results_dictionary['forces_list'] = outcar.final_forces_list
+		else:
+			results_dictionary['forces_list'] = None
+
+		if outcar.get_line_offsets_containing_string(Outcar.stresses_string):
+			results_dictionary['stresses_list'] = outcar.final_stresses_list
+		else:
+			results_dictionary['stresses_list'] = None
+
+		results_dictionary['lattice'] = None
+		results_dictionary['positions'] = None
+		results_dictionary['species_list'] = []
+		results_dictionary['species_count_list'] = []
+		results_dictionary['coordinate_mode'] = 'Direct'
+
+		if Path.exists(self.contcar_path):
+			contcar_structure = Structure(self.contcar_path)
+
+			results_dictionary['lattice'] = contcar_structure.lattice.to_array()
+			results_dictionary['positions'] = contcar_structure.get_coordinates_list()
+			results_dictionary['species_list'] = contcar_structure.get_species_list()
+			results_dictionary['species_count_list'] = contcar_structure.get_species_count_list()
+			results_dictionary['coordinate_mode'] = contcar_structure.sites.get_coordinate_mode()
+
+		return results_dictionary
+
+	def write_to_sidecar(self, results_dictionary, source_signature):
+		"""
+		Writes results_dictionary to the .npz sidecar. None values are stored as empty arrays (or nan for scalars). The sidecar is written to a
+		temporary file and renamed into place, so a reader never sees a partly written sidecar. Returns False (leaving no sidecar) if it cannot be
+		written.
+		"""
+
+		def array_or_empty(value):
+			return np.array(value, dtype=np.float64) if value != None else np.zeros(0)
+
+		temporary_path = self.cache_path + '.tmp'
+
+		try:
+			with open(temporary_path, 'wb') as file:
+				np.savez(file,
+					source_signature=np.array(source_signature),
+					energy=np.array(results_dictionary['energy']),
+					energy_per_atom=np.array(results_dictionary['energy_per_atom']),
+					total_time=np.array(results_dictionary['total_time'] if results_dictionary['total_time'] != None else np.nan),
+					forces_list=array_or_empty(results_dictionary['forces_list']),
+					stresses_list=array_or_empty(results_dictionary['stresses_list']),
+					lattice=array_or_empty(results_dictionary['lattice']),
+					positions=array_or_empty(results_dictionary['positions']),
+					species_list=np.array(results_dictionary['species_list'], dtype=str),
+					species_count_list=np.array(results_dictionary['species_count_list'], dtype=int),
+					coordinate_mode=np.array(results_dictionary['coordinate_mode']))
+
+			os.rename(temporary_path, self.cache_path)
+		except (IOError, OSError):
+			if Path.exists(temporary_path):
+				try:
+					os.remove(temporary_path)
+				except OSError:
+					pass
+
+			return False
+
+		return True
+
+	def read_from_sidecar(self, source_signature):
+		"""
+		Returns the results dictionary stored in the sidecar, or None if there is no sidecar, it was made from different output files, or it cannot be read.
+		"""
+
+		if not Path.exists(self.cache_path):
+			return None
+
+		def list_or_none(array):
+			return array.tolist() if array.size > 0 else None
+
+		try:
+			npz_file = np.load(self.cache_path)
+		except (IOError, OSError, ValueError, zipfile.BadZipfile):
+			return None
+
+		try:
+			if npz_file['source_signature'].tolist() != source_signature:
+				return None
+
+			results_dictionary = {}
+			results_dictionary['energy'] = float(npz_file['energy'])
+			results_dictionary['energy_per_atom'] = float(npz_file['energy_per_atom'])
+			results_dictionary['total_time'] = float(npz_file['total_time']) if not np.isnan(npz_file['total_time']) else None
+			results_dictionary['forces_list'] = list_or_none(npz_file['forces_list'])
+			results_dictionary['stresses_list'] = list_or_none(npz_file['stresses_list'])
+			results_dictionary['lattice'] = list_or_none(npz_file['lattice'])
+			results_dictionary['positions'] = list_or_none(npz_file['positions'])
+			results_dictionary['species_list'] = npz_file['species_list'].tolist()
+			results_dictionary['species_count_list'] = npz_file['species_count_list'].tolist()
+			results_dictionary['coordinate_mode'] = str(npz_file['coordinate_mode'])
+		except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile, zlib.error):
+			return None
+		finally:
+			npz_file.close()
+
+		return results_dictionary